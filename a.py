@@ -1,283 +1,126 @@
-from enum import Enum
-
-import bpy
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from genhouse import blender
+from genhouse import cutter
+from genhouse import diskcache
+from genhouse import footprint
+from genhouse import incremental
+from genhouse import mesh
+from genhouse import profiler
+from genhouse import samples
+from genhouse import shapes
+from genhouse import workers
 
 B_E = 0.001
 
-class Hole:
-	def __init__(self, size, location, parent):
-		self.size = size
-		self.location = location
-		self.parent = parent
-
-
-class Wall:
-	def __init__(self, parent, size=(1,1,1)):
-		self.length = size[0]
-		self.width = size[1]
-		self.height = size[2]
-		self.holes = []
-		self.parent = parent
-		
-	@property
-	def size(self):
-		return (self.length, self.width, self.height)
-		
-	def add_hole(self, size, location):
-		self.holes.append(Hole(size=size, location=location, parent=self))
-		
-	def add_l_hole(self, relative, length, height, base_height=0):
-		s = (length, self.width, height)
-		l = (self.length/2*relative, 0, base_height+(height-self.height)/2)	
-		return self.add_hole(size=s, location=l)
-		
-	def add_w_hole(self, relative, width, height, base_height=0):
-		s = (self.length, width, height)
-		l = (0, self.width/2*relative, base_height+(height-self.height)/2)	
-		return self.add_hole(size=s, location=l)
-		
 
-class TheWall:
-	def __init__(self, wall, parent, location=(0,0,0)):
-		self.wall = wall
-		self.location = location
-		self.parent = parent
-	
-	
-class Floor:
-	class WallType(Enum):
-		none = 0
-		external = 1
-		internal = 2
-		thin = 3
-		
-
-	def __init__(self, parent, length=None, width=None, height=None, external_wall=None, internal_wall=None, thin_wall=None):
-		self.length = length if length else parent.length
-		self.width = width if width else parent.width
-		self.height = height if height else parent.height
-		self.external_wall = external_wall if external_wall else parent.external_wall
-		self.internal_wall = internal_wall if internal_wall else parent.internal_wall
-		self.thin_wall = thin_wall if thin_wall else parent.thin_wall
-		self.walls = []
-		
-		w = Wall(size=(1,1,1), parent=self)
-		w.add_hole(size=(1,1,1), location=(0,0,0))
-		self.add_wall(wall=w, location=(0,0,0))
-		
-	@property
-	def in_length(self):
-		return self.length-2*self.external_wall
-		
-	@property
-	def in_width(self):
-		return self.width-2*self.external_wall
-		
-	def wall(self, wall_type=WallType.none):
-		if wall_type == Floor.WallType.external:
-			return self.external_wall
-		elif wall_type == Floor.WallType.internal:
-			return self.internal_wall
-		elif wall_type == Floor.WallType.thin:
-			return self.thin_wall
-		else:
-			raise NotImplementedError
-
-		
-	def add_wall(self, wall, location):
-		return self.walls.append(TheWall(wall=wall, location=location, parent=self))
-		
-	def add_l_wall(self, relative, size=(-1,1), wall_type=WallType.internal):
-		wall = self.wall(wall_type)
-
-		if wall_type == Floor.WallType.internal or wall_type == Floor.WallType.thin:
-			s = (self.in_length*(size[1]-size[0])/2, wall, self.height)
-			l = (self.in_length*(size[1]+size[0])/4, self.in_width/2*relative, 0)
-		elif wall_type == Floor.WallType.external:
-			s = (self.length*(size[1]-size[0])/2, wall, self.height)
-			l = (self.length*(size[1]+size[0])/4, (self.width-wall)/2*relative, 0)	
-		else:
-			raise NotImplementedError
-		
-		w = Wall(size=s, parent=self)
-		self.add_wall(wall=w, location=l)
-		return w
-		
-	def add_w_wall(self, relative, size=(-1,1), wall_type=WallType.internal):
-		wall = self.wall(wall_type)
-	
-		if wall_type == Floor.WallType.internal or wall_type == Floor.WallType.thin:
-			s = (wall, self.in_width*(size[1]-size[0])/2, self.height)
-			l = (self.in_length/2*relative, self.in_width*(size[1]+size[0])/4, 0)
-		elif wall_type == Floor.WallType.external:
-			s = (wall, self.width*(size[1]-size[0])/2, self.height)
-			l = ((self.length-wall)/2*relative, self.width*(size[1]+size[0])/4, 0)
-		else:
-			raise NotImplementedError
-		
-		w = Wall(size=s, parent=self)
-		self.add_wall(wall=w, location=l)
-		return w
-		
-	def add_w_walls(self, relative, sizes, wall_type=WallType.internal):
-		for size in sizes:
-			self.add_w_wall(relative, size, wall_type)
-			
-	def add_l_walls(self, relative, sizes, wall_type=WallType.internal):
-		for size in sizes:
-			self.add_l_wall(relative, size, wall_type)
-			
-
-class TheFloor:
-	def __init__(self, floor, parent, location=(0,0,0)):
-		self.floor = floor
-		self.location = location
-	
-
-class House:
-
-	def __init__(self, 
-			length=9, width=6, height=3, plate=0.2, plate_dw=-0.1, floors=1,
-			external_wall=0.4, internal_wall=0.2, thin_wall=0.1,
-			window_length = 2.08, window_height = 1.42, window_base = 0.5,
-			generate=False):
-		self.length = length
-		self.width = width
-		self.plate = plate
-		self.height = height
-		self.external_wall = external_wall
-		self.internal_wall = internal_wall
-		self.thin_wall = thin_wall
-		self.plate_dw = plate_dw
-		self.floors = floors
-		self.window_length = window_length
-		self.window_height = window_height
-		self.window_base = window_base
-		
-		self.the_floors = {}
-		for n_floor in range(1, floors+1):
-			f = Floor(parent=self)
-			
-			l_walls = [
-				f.add_l_wall(-1, wall_type=Floor.WallType.external),
-				f.add_l_wall(1, wall_type=Floor.WallType.external)
-				]
-			r_walls = [
-				f.add_w_wall(-1, wall_type=Floor.WallType.external),
-				f.add_w_wall(1, wall_type=Floor.WallType.external)
-				]
-			
-			if generate:
-				for w in l_walls:
-					for i in (-0.66, 0, 0.66):
-						w.add_l_hole(i, self.window_length, self.window_height, self.window_base)
-				for w in r_walls:
-					for i in (0.66, 0, -0.66):
-						w.add_w_hole(i, self.window_height, self.window_height, self.window_base)
-			
-			self.the_floors[n_floor] = TheFloor(
-				floor=f, 
-				location=(0, 0, self.plate*n_floor+self.height*(n_floor-0.5)),
-				parent=self
-				)
-	
-	@property
-	def plate_scale(self):
-		return (self.length/2+self.plate_dw/2, self.width/2+self.plate_dw/2, self.plate/2)
-	
-	def get_plate_location(self, floor):
-		return (0, 0, self.plate/2 + floor*(self.plate+self.height) )
-				
-		
 def bpy_add_cube(scale, location, name=None):
-	bpy.ops.mesh.primitive_cube_add(location=location)
-	bco = bpy.context.object
+	size = (scale[0]*2, scale[1]*2, scale[2]*2)
 	if name is not None:
-		bco.name = name 
-	bco.scale = scale
-	return bco
+		# named cubes are found again on the next run instead of doubled
+		return blender.bpy_keyed_object(name, incremental.digest(size), lambda: mesh.box(size), location)[0]
+	return blender.bpy_add_box(size=size, location=location)
+
+
+def bpy_add_cubes(scales, locations):
+	return blender.bpy_add_boxes(
+		sizes=[(s[0]*2, s[1]*2, s[2]*2) for s in scales],
+		locations=locations
+		)
 
 	
 def bpy_obj_minus_obj(object, deleter, delete_deleter=True):
-	mod_bool = object.modifiers.new('modifier', 'BOOLEAN')
-	mod_bool.operation = 'DIFFERENCE'
-	mod_bool.object = deleter
-	
-	bpy.context.scene.objects.active = object
-	bpy.ops.object.modifier_apply(modifier = 'modifier')
-
-	if delete_deleter:
-		deleter.select = True
-		bpy.ops.object.delete()
+	blender.bpy_boolean_difference(object, deleter, delete_deleter)
 
 
 def bpy_obj_plus_obj(object, addition):
-	obs = [object, addition]
-	ctx = bpy.context.copy()
-	ctx['active_object'] = obs[0]
-	ctx['selected_objects'] = obs
-	ctx['selected_editable_bases'] = [bpy.context.scene.object_bases[ob.name] for ob in obs]
-	bpy.ops.object.join(ctx)
+	blender.bpy_join([object, addition])
+
 
-		
 class WallBlender:
-	def __init__(self, wall, location):
+	def __init__(self, wall, location, name=None):
 		self.wall = wall
 		self.location = location
-		self.b_wall = None
+		self.name = name
+		self.mesh = None
 	
 	def render(self):
-		b_wall = bpy_add_cube(
-			scale=(self.wall.size[0]/2, self.wall.size[1]/2, self.wall.size[2]/2),
-			location=(0,0,0)
-			)
-		
-		for hole in self.wall.holes:
-			h = bpy_add_cube(
-				scale=(hole.size[0]/2+B_E, hole.size[1]/2+B_E, hole.size[2]/2+B_E),
-				location=(hole.location)
-			)
+		m = cutter.wall_mesh(self.wall.size, shapes.holes(self.wall))
+		if m is None:
+			m = self.render_boolean()
+		self.mesh = m
+		return m
+	
+	def render_boolean(self):
+		scales = [(self.wall.size[0]/2, self.wall.size[1]/2, self.wall.size[2]/2)]
+		locations = [(0,0,0)]
+		for size, location in shapes.holes(self.wall):
+			scales.append((size[0]/2+B_E, size[1]/2+B_E, size[2]/2+B_E))
+			locations.append(location)
+		
+		b_wall, *holes = bpy_add_cubes(scales, locations)
+		for h in holes:
 			bpy_obj_minus_obj(object=b_wall, deleter=h)
-			
-		b_wall.location = self.location
-		self.b_wall = b_wall
+		m = blender.bpy_mesh_data(b_wall.data)
+		blender.bpy_remove_object(b_wall)
+		return m
 		
 		
 class FloorBlender:
-	def __init__(self, floor, location, name):
+	def __init__(self, floor, location, name, merged=False):
 		self.floor = floor
 		self.location = location
 		self.name = name
+		self.merged = merged
 		self.b_floor = None
 		
 	def render(self):
-		first = None
+		key = incremental.digest(self.merged, [
+			(incremental.wall_hash(the_wall.wall), the_wall.location)
+			for the_wall in self.floor.walls
+			])
+		build = self.render_footprint if self.merged else self.render_walls
+		self.b_floor = blender.bpy_keyed_object(self.name, key, build, self.location)[0]
+		return self.b_floor
+	
+	def render_footprint(self):
+		# one union of the walls, nothing left inside where they cross
+		return footprint.floor_meshes([(None, the_wall.wall, the_wall.location) for the_wall in self.floor.walls])[None]
+	
+	def render_walls(self):
+		parts = []
+		n = 0
 		for the_wall in self.floor.walls:
-			wb = WallBlender(wall=the_wall.wall, location=the_wall.location)
+			n += 1
+			wb = WallBlender(wall=the_wall.wall, location=the_wall.location, name='%s.%i' % (self.name, n))
 			wb.render()
-			if first is None:
-				first = wb.b_wall
-				first.name = self.name
-			else:
-				bpy_obj_plus_obj(object=first, addition=wb.b_wall)
-		first.location = self.location
-		self.b_floor = first
+			parts.append((wb.mesh, wb.location))
+		return mesh.concat(parts)
 
 
 class HouseBlender():
 
-	def __init__(self, house):
+	def __init__(self, house, merged=False):
 		self.house = house
+		self.merged = merged
+		self.floors = ()
 		self.plates = {}
 		self.walls = {}
 		
-	def render(self):
+	def render(self, floors=None):
+		# floors: numbers of the floors to render with the plates under them,
+		# every floor when None
+		self.floors = range(1, self.house.floors+1) if floors is None else floors
 		self.render_plates()
 		self.render_walls()
 	
 	def render_plates(self):
-		for floor in range(0, self.house.floors):
-			self.render_plates_floor(floor)
+		for n_floor in self.floors:
+			self.render_plates_floor(n_floor-1)
 			
 	def render_plates_floor(self, floor):
 		self.plates[floor] = bpy_add_cube(
@@ -287,76 +130,41 @@ class HouseBlender():
 			)
 	
 	def render_walls(self):
-		for n_floor in range(1, self.house.floors+1):
+		for n_floor in self.floors:
 			self.render_walls_floor(self.house.the_floors[n_floor], 'floor%i' % (n_floor))
 					
 	def render_walls_floor(self, the_floor, the_name):
-		fb = FloorBlender(the_floor.floor, the_floor.location, the_name)
+		fb = FloorBlender(the_floor.floor, the_floor.location, the_name, self.merged)
 		fb.render()
 
-'''
-h_params = {
-	'length': 12,
-	'width': 12,
-	'wall': 0.4,
-	'height': 3,
-	'floors': 1,
-}
-H = House(generate=True, **h_params)
-w = H.the_floors[1].floor.add_l_wall(0.5, (0,1), 0.2)
-w.add_l_hole(0, 1, 2)	
-w.add_l_hole(1, 1, 2)
-w.add_l_hole(-1, 1, 2)
-
-w = H.the_floors[1].floor.add_w_wall(0, (-1,1), 0.2)
-w.add_w_hole(0, 1, 2)	
-w.add_w_hole(0.5, 1, 2)
-w.add_w_hole(-0.5, 1, 2)
-'''
-
-h_params = {
-	'length': 10.5,
-	'width': 12.5,
-	'height': 3,
-	'floors': 2,
-}
-
-H = House(generate=True, **h_params)
-
-w = H.the_floors[1].floor.add_w_wall(0, (-1,1))
-w.add_w_hole(-0.8, 1, 2)
-w.add_w_hole(-0.5, 1, 2)
-w.add_w_hole(0.2, 1, 2)
-
-w = H.the_floors[1].floor.add_w_wall(-0.5, (-1, 0.33))
-w.add_w_hole(-0.8, 1, 2)
-w.add_w_hole(0.8, 1, 2)
-
-w = H.the_floors[1].floor.add_l_wall(0.33, (-1,1))
-w.add_l_hole(-0.8, 1, 2)
-w.add_l_hole(0.2, 1.5, 2)
-w.add_l_hole(0.7, 2, 2)
 
-w = H.the_floors[1].floor.add_l_wall(-0.33, (-1,1))
-w.add_l_hole(-0.25, 2, 2)
-w.add_l_hole(0.2, 1, 2)
-
-H.the_floors[2].floor.add_w_walls(0, [(-1,-0.33), (0.33,1)])
-
-w = H.the_floors[2].floor.add_l_wall(0.33, (-1, 1))
-w.add_l_hole(-0.2, 1, 2)
-w.add_l_hole(0.2, 1, 2)
-
-H.the_floors[2].floor.add_l_wall(-0.33, (-1, -0.5))
-w = H.the_floors[2].floor.add_l_wall(-0.33, (0, 1))
-w.add_l_hole(-0.6, 1, 2)
-
-w = H.the_floors[2].floor.add_w_wall(-0.5, (-0.6, 0.33))
-w.add_w_hole(-0.7, 1, 2)
-w.add_w_hole(0.7, 1, 2)
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='blender -P a.py --')
+	parser.add_argument('--merged', action='store_true', help='every floor as one union of its walls')
+	parser.add_argument('-j', '--jobs', type=int, default=0, help='render the floors on background Blenders')
+	args = parser.parse_args(blender.script_args() if argv is None else argv)
+	
+	profiler.instrument(blender)
+	profiler.instrument(globals(), ['bpy_add_cube', 'bpy_add_cubes', 'bpy_obj_minus_obj', 'bpy_obj_plus_obj'])
+	for cls in (WallBlender, FloorBlender, HouseBlender):
+		profiler.instrument(cls)
+	
+	with profiler.phase('model'):
+		H = samples.a_house()
+	
+	bpy_add_cube(name='human', scale=(0.2/2, 0.5/2, 1.78/2), location=(0, 0, 1.78/2+H.plate))
+	bpy_add_cube(name='ground', scale=(15,15,B_E), location=(0,0,0))
+	
+	if args.jobs:
+		workers.render_here({'sample': 'a', 'merged': args.merged}, args.jobs)
+	else:
+		HB = HouseBlender(H, merged=args.merged)
+		HB.render()
+	
+	if diskcache.cache is not None:
+		print(diskcache.cache.report())
+	profiler.finish()
 
-bpy_add_cube(name='human', scale=(0.2/2, 0.5/2, 1.78/2), location=(0, 0, 1.78/2+H.plate))
-bpy_add_cube(name='ground', scale=(15,15,B_E), location=(0,0,0))
 
-HB = HouseBlender(H)
-HB.render()
+if __name__ == '__main__':
+	main()
@@ -1,355 +1,396 @@
-import bpy
+import argparse
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from genhouse import blender
+from genhouse.blender import bpy
+from genhouse import cutter
+from genhouse import diskcache
+from genhouse import district
+from genhouse import footprint
+from genhouse import incremental
+from genhouse import lod
+from genhouse import mesh
+from genhouse import openings
+from genhouse import profiler
+from genhouse import samples
+from genhouse import shapes
+from genhouse import spatial
+from genhouse import workers
+
+def get_material(name):
+	# looked up on use rather than created when the script is imported
+	return blender.bpy_material(name, shapes.MATERIALS[name])
 
-m_exwalls = bpy.data.materials.new(name="m_exwalls")
-m_exwalls.diffuse_color = (0.720, 0.800, 0.361, 1.0)
 
-m_inwalls = bpy.data.materials.new(name="m_inwalls")
-m_inwalls.diffuse_color = (0.267, 0.800, 0.484, 1.0)
-
-m_foundation = bpy.data.materials.new(name="m_foundation")
-m_foundation.diffuse_color = (0.142, 0.142, 0.142, 1.0)
-
-class House:
-	class Foundation:
-		def __init__(self, height, shift):
-			self.height = height
-			self.shift = shift
-
-	class Overlap:
-		def __init__(self, height, shift, altitude):
-			self.height = height
-			self.shift = shift
-			self.altitude = altitude
-			
-	class Floor:
-		class Wall:
-			class Hole:
-				def __init__(self, size, location):
-					self.size = size
-					self.location = location
-
-			def __init__(self, size, location):
-				self.size = size
-				self.location = location
-				self.holes = []
-				
-			@property
-			def bound_left(self):
-				return self.location[0]-self.size[0]/2
-			
-			@property
-			def bound_right(self):
-				return self.location[0]+self.size[0]/2
-			
-			@property
-			def bound_back(self):
-				return self.location[1]+self.size[1]/2
-			
-			@property
-			def bound_front(self):
-				return self.location[1]-self.size[1]/2
-			
-			def add_hole(self, size, location):
-				hole = House.Floor.Wall.Hole(size, location)
-				self.holes.append(hole)
-				return hole
-			
-			def add_w3_hole(self, gap_wall, gap, pos, width, height, base_height):
-				size = (width, self.size[1], height)
-				if pos > 0:
-					location_0 = gap_wall.bound_left - self.location[0] - gap - width/2
-				else:
-					location_0 = gap_wall.bound_right - self.location[0] + gap + width/2
-				location = (location_0, 0, base_height+(height-self.size[2])/2)
-				return self.add_hole(size, location)
-			
-			def add_d3_hole(self, gap_wall, gap, pos, depth, height, base_height):
-				size = (self.size[0], depth, height)
-				if pos > 0:
-					location_1 = gap_wall.bound_front - self.location[1] - gap - depth/2
-				else:
-					location_1 = gap_wall.bound_back - self.location[1] + gap + depth/2
-				location = (0, location_1, base_height+(height-self.size[2])/2)
-				return self.add_hole(size, location)
-			
-	
-		def __init__(self, height, thickness, altitude, width, depth):
-			self.height = height
-			self.thickness = thickness
-			self.altitude = altitude
-			self.width = width
-			self.depth = depth
-			self.walls = {}
-			
-			self.add_d_wall((-1,1), -1+thickness/width, thickness, "left")
-			self.add_d_wall((-1,1),  1-thickness/width, thickness, "right")
-			self.add_w2_wall("left", "right",  1-thickness/depth, thickness, "back")
-			self.add_w2_wall("left", "right", -1+thickness/depth, thickness, "front")
-			
-		def add_wall(self, size, location, name):
-			wall = House.Floor.Wall(size, location)
-			self.walls[name] = wall
-			return wall
-			
-		def add_w_wall(self, relative_width, relative_depth, thickness, name):
-			size = (self.width*(relative_width[1]-relative_width[0])/2, thickness, self.height)
-			location = (self.width*(relative_width[1]+relative_width[0])/4, self.depth/2*relative_depth, 0)
-			return self.add_wall(size, location, name)
-			
-		def add_d_wall(self, relative_depth, relative_width, thickness, name):
-			size = (thickness, self.depth*(relative_depth[1]-relative_depth[0])/2, self.height)
-			location = (self.width/2*relative_width, self.depth*(relative_depth[1]+relative_depth[0])/4, 0)
-			return self.add_wall(size, location, name)
-			
-		def add_w2_wall(self, left, right, relative_depth, thickness, name):
-			left_wall = self.walls[left]
-			right_wall = self.walls[right]
-			size = (right_wall.bound_left-left_wall.bound_right, thickness, self.height)
-			location = ((right_wall.bound_left+left_wall.bound_right)/2, self.depth/2*relative_depth, 0)
-			return self.add_wall(size, location, name)
-		
-		def add_d2_wall(self, front, back, relative_width, thickness, name):
-			front_wall = self.walls[front]
-			back_wall = self.walls[back]
-			size = (thickness, back_wall.bound_front-front_wall.bound_back, self.height)
-			location = (self.width/2*relative_width, (back_wall.bound_front+front_wall.bound_back)/2, 0)
-			return self.add_wall(size, location, name)
-		
-	def __init__(self, width, depth):
-		self.width = width
-		self.depth = depth
-		self.foundation = None
-		self.floors = []
-		self.overlaps = []
-		self.altitude = 0
-	
-	def add_foundation(self, height, shift):
-		self.foundation = House.Foundation(height, shift)
-		self.altitude += height
-	
-	def add_floor(self, height, thickness):
-		floor = House.Floor(height, thickness, self.altitude, self.width, self.depth)
-		self.floors.append(floor)
-		self.altitude += height
-		return floor
-		
-	def add_overlap(self, height, shift):
-		overlap = House.Overlap(height, shift, self.altitude)
-		self.overlaps.append(overlap)
-		self.altitude += height
-		return overlap
-
-		
 B_E = 0.001
 
 def bpy_add_cube(size, location, name=None):
-	bpy.ops.mesh.primitive_cube_add(location=location)
-	bco = bpy.context.object
-	if name is not None:
-		bco.name = name
-	
-	bco.scale = (size[0]/2, size[1]/2, size[2]/2)
-	return bco
+	return blender.bpy_add_box(size, location, name=name)
 
 
 def bpy_obj_minus_obj(object, deleter, delete_deleter=True):
-	mod_bool = object.modifiers.new('modifier', 'BOOLEAN')
-	mod_bool.operation = 'DIFFERENCE'
-	mod_bool.object = deleter
-	
-	# bpy.context.scene.objects.active = object
-	bpy.context.view_layer.objects.active = object
-	bpy.ops.object.modifier_apply(modifier = mod_bool.name)
-	
-	if delete_deleter:
-		bpy.context.view_layer.objects.active = deleter
-		bpy.ops.object.delete()
+	blender.bpy_boolean_difference(object, deleter, delete_deleter)
+
 
-		
 def bpy_obj_plus_obj(object, addition):
-	obs = [object, addition]
-	c = {}
-	c['object'] = c['active_object'] = obs[0]
-	c['selected_objects'] = c['selected_editable_objects'] = obs
-	# ctx['selected_editable_bases'] = [bpy.context.scene.object_bases[ob.name] for ob in obs]
-	bpy.ops.object.join(c)
-	
+	blender.bpy_join([object, addition])
+
+
+def bpy_add_tray(name, size, location, inner_size, inner_location, material=None):
+	# box minus box, the boolean only runs when the sizes change
+	def build():
+		ob = bpy_add_cube(size, (0,0,0))
+		inner = (inner_location[0]-location[0], inner_location[1]-location[1], inner_location[2]-location[2])
+		bpy_obj_minus_obj(ob, bpy_add_cube(inner_size, inner))
+		m = blender.bpy_mesh_data(ob.data)
+		blender.bpy_remove_object(ob)
+		return m
 	
+	key = incremental.digest(size, location, inner_size, inner_location)
+	ob, built = blender.bpy_keyed_object(name, key, build, location)
+	if built and material is not None:
+		ob.data.materials.append(material)
+	return ob
+
+
 class BlenderHouse:
-	def __init__(self, house):
+	def __init__(self, house, name='house', lod=0, merged=False):
 		self.house = house
+		self.name = name
+		self.lod = lod
+		# merged: the walls of a floor as one union, no faces inside junctions
+		self.merged = merged
+		self.rendered = []
+		self.rebuilt = []
+		self.collections = []
+		self.collection = None
+		self.floors = None
+		self.purged = 0
 	
-	def render(self):
-		self.render_foundation()
+	def render(self, floors=None):
+		# floors: numbers of the floors to render, 0 for the parts of the whole
+		# house, everything when None; workers each render a few
+		before = blender.bpy_mesh_names()
+		self.floors = floors
+		self.rendered = []
+		self.rebuilt = []
+		self.collections = []
+		whole = floors is None or 0 in floors
+		self.use_lod(0)
+		if whole:
+			self.render_foundation()
 		self.render_floors()
-		self.render_overlaps()
+		if whole:
+			self.render_overlaps()
+		self.render_openings()
+		self.use_lod(1)
+		self.render_shells()
+		self.use_lod(2)
+		if whole:
+			self.render_massing()
+		if floors is None:
+			blender.bpy_remove_stale(self.name, self.rendered)
+		self.purged = blender.bpy_purge_meshes(before)
+		self.show_lod(self.lod)
+	
+	def use_lod(self, level):
+		self.collection = blender.bpy_child_collection('%s.lod%i' % (self.name, level))
+		self.collections.append(self.collection)
+	
+	def show_lod(self, level):
+		# every LOD stays in the file, only the shown one is drawn and rendered
+		self.lod = level
+		blender.bpy_show_collection(self.collections, self.collections[level])
+	
+	def render_part(self, name, key, build, material, location):
+		ob, built = blender.bpy_keyed_object(name, key, build, location, owner=self.name, collection=self.collection)
+		blender.bpy_move_object(ob, self.collection)
+		if built:
+			with profiler.phase('materials'):
+				ob.data.materials.append(material)
+			self.rebuilt.append(name)
+		self.rendered.append(name)
+		return ob
 	
 	def render_foundation(self):
+		house = self.house
 		if not house.foundation:
 			return
 		
-		f = bpy_add_cube(
-			size=(house.width - 2*house.foundation.shift, house.depth - 2*house.foundation.shift, house.foundation.height), 
-			location=(0,0,house.foundation.height/2), 
-			name='foundation'
+		size = (house.width - 2*house.foundation.shift, house.depth - 2*house.foundation.shift, house.foundation.height)
+		self.render_part(
+			'foundation', incremental.digest(size), lambda: mesh.box(size),
+			get_material('m_foundation'), (0,0,house.foundation.height/2)
 			)
-		f.data.materials.append(m_foundation)
+	
+	def house_floors(self):
+		for n, floor in enumerate(self.house.floors, 1):
+			if self.floors is None or n in self.floors:
+				yield n, floor
 	
 	def render_floors(self):
-		n = 0
-		for floor in house.floors:
-			n += 1
-			fin = bpy_add_cube(
-				size=(1, 1, 1),
-				location=(0,0, floor.altitude+floor.height/2),
-				name='floor-walls%i' % n
-				)
-			ein = bpy_add_cube(size=(1+B_E, 1+B_E, 1+B_E), location=(0,0, floor.altitude+floor.height/2))
-			bpy_obj_minus_obj(fin, ein)
-			fin.data.materials.append(m_inwalls)
-
-			fout = bpy_add_cube(
-				size=(1, 1, 1),
-				location=(0,0, floor.altitude+floor.height/2),
-				name='floor%i' % n
+		for n, floor in self.house_floors():
+			self.render_floor(floor, ('floor-walls%i' % n, 'floor%i' % n), (0,0, floor.altitude+floor.height/2))
+	
+	def render_floor(self, floor, names, location):
+		if self.merged:
+			return self.render_footprint(floor, names, location)
+		groups = {'m_exwalls': [], 'm_inwalls': []}
+		for name, wall, l in shapes.floor_walls(floor):
+			groups[shapes.wall_material(name)].append((name, wall, l, incremental.wall_hash(wall)))
+		
+		for name, material in zip(names, ('m_inwalls', 'm_exwalls')):
+			walls = groups[material]
+			key = incremental.digest([(l, key) for name, wall, l, key in walls])
+			self.render_part(name, key, lambda: self.render_walls(walls), get_material(material), location)
+	
+	def render_footprint(self, floor, names, location):
+		walls = [(shapes.wall_material(name), wall, l) for name, wall, l in shapes.floor_walls(floor)]
+		key = incremental.digest('footprint', [(material, l, incremental.wall_hash(wall)) for material, wall, l in walls])
+		# both materials come out of one union, built when the first is rebuilt
+		meshes = {}
+		def build(material):
+			if not meshes:
+				meshes.update(footprint.floor_meshes(walls))
+			return meshes.get(material, mesh.Mesh())
+		
+		for name, material in zip(names, ('m_inwalls', 'm_exwalls')):
+			self.render_part(name, incremental.digest(key, material), lambda: build(material), get_material(material), location)
+	
+	def render_walls(self, walls):
+		# unchanged walls come out of the memo, only edited ones are cut again
+		return mesh.concat([
+			(incremental.wall_meshes.get(key, lambda: self.render_wall(name, wall)), l)
+			for name, wall, l, key in walls
+			])
+	
+	def render_wall(self, name, wall):
+		m = cutter.wall_mesh(wall.size, shapes.holes(wall))
+		if m is None:
+			m = self.render_boolean(wall)
+		return m
+	
+	def render_boolean(self, wall):
+		w = blender.bpy_add_box(wall.size, (0,0,0))
+		for size, location in shapes.holes(wall):
+			bpy_obj_minus_obj(w, self.render_cutter(size, location))
+		m = blender.bpy_mesh_data(w.data)
+		blender.bpy_remove_object(w)
+		return m
+	
+	def render_cutter(self, size, location):
+		# equal openings cut with one shared cutter mesh
+		size = (size[0]+B_E, size[1]+B_E, size[2]+B_E)
+		key = incremental.digest(size)
+		me = blender.bpy_shared_mesh('cutter-%s' % key[:8], key, lambda: mesh.box(size))
+		ob = bpy.data.objects.new('cutter', me)
+		ob.location = location
+		return blender.bpy_link_objects([ob])[0]
+	
+	def render_opening_mesh(self, kind, part, key, build, material):
+		name = '%s-%s-%s' % (kind.name, part, key[:8])
+		me = blender.bpy_shared_mesh(name, key, build)
+		if not me.materials:
+			me.materials.append(material)
+		return me
+	
+	def render_openings(self):
+		for n, floor in self.house_floors():
+			self.render_opening_instances(openings.floor_instances(floor, 'floor%i' % n, floor.altitude))
+	
+	def render_opening_instances(self, instances):
+		# every opening of a type and size shows the same frame and glass meshes
+		for name, kind, width, height, location, rotation in instances:
+			key = incremental.digest(kind.name, width, height)
+			parts = [('frame', self.render_opening_mesh(
+				kind, 'frame', key, lambda: kind.frame_mesh(width, height), get_material('m_frame')))]
+			if kind.glass:
+				parts.append(('glass', self.render_opening_mesh(
+					kind, 'glass', key, lambda: kind.glass_mesh(width, height), get_material('m_glass'))))
+			for part, me in parts:
+				ob_name = '%s.%s' % (name, part)
+				ob = blender.bpy_instance(ob_name, me, location, rotation, owner=self.name, collection=self.collection)
+				blender.bpy_move_object(ob, self.collection)
+				self.rendered.append(ob_name)
+	
+	def render_shells(self):
+		# LOD1: external walls only, foundation and overlaps shared with LOD0
+		for ob in bpy.data.objects:
+			if ob.get(blender.OWNER) == self.name and (ob.name == 'foundation' or ob.name.startswith('overlap')):
+				if self.collection.objects.get(ob.name) is None:
+					self.collection.objects.link(ob)
+		for n, floor in self.house_floors():
+			walls = [(name, wall, l, incremental.wall_hash(wall)) for name, wall, l in lod.shell_walls(floor)]
+			key = incremental.digest([(l, key) for name, wall, l, key in walls])
+			self.render_part(
+				'lod1.floor%i' % n, key, lambda: self.render_walls(walls),
+				get_material('m_exwalls'), (0,0, floor.altitude+floor.height/2)
 				)
-			eout = bpy_add_cube(size=(1+B_E, 1+B_E, 1+B_E), location=(0,0, floor.altitude+floor.height/2))
-			bpy_obj_minus_obj(fout, eout)
-			fout.data.materials.append(m_exwalls)
-			
-			for name,wall in floor.walls.items():
-				w = bpy_add_cube(
-					size=wall.size,
-					location=(wall.location[0], wall.location[1], floor.altitude + wall.size[2]/2)
-					)
-					
-				for hole in wall.holes:
-					h = bpy_add_cube(
-						size=(hole.size[0]+B_E, hole.size[1]+B_E, hole.size[2]+B_E),
-						location=(w.location[0]+hole.location[0], w.location[1]+hole.location[1], w.location[2]+hole.location[2])
-						)
-					bpy_obj_minus_obj(w, h)
-				
-				if name in ['left', 'right', 'front', 'back']:
-					bpy_obj_plus_obj(fout, w)
-				else:
-					bpy_obj_plus_obj(fin, w)	
+	
+	def render_massing(self):
+		size = lod.massing_size(self.house)
+		self.render_part(
+			'lod2.house', incremental.digest(size), lambda: mesh.box(size),
+			get_material('m_exwalls'), (0,0,size[2]/2)
+			)
 	
 	def render_overlaps(self):
+		house = self.house
 		n = 0
 		for overlap in house.overlaps:
 			n += 1
-			o = bpy_add_cube(
-				size=(house.width - 2*overlap.shift, house.depth - 2*overlap.shift, overlap.height),
-				location=(0,0,overlap.altitude+overlap.height/2),
-				name='overlap%i' % n
-			)
-			o.data.materials.append(m_foundation)
-
-
-# house configuration
-house = House(width=10.130, depth=12.340)
-house.add_foundation(height=0.3, shift=0.1)
-f1 = house.add_floor(height=3, thickness=0.38)
-house.add_overlap(height=0.3, shift=0.1)
-f2 = house.add_floor(height=3, thickness=0.25)
-
-#6.17
-IWT = 0.38
-
-f1.add_d2_wall("front", "back", 0, IWT, "f1d0")
-f1.add_w2_wall("f1d0", "right", 0.34, IWT, "f1w1")
-f1.add_w2_wall("left", "f1d0", 0.34, IWT, "f1w2")
-f1.add_d2_wall("front", "f1w1", 0.55, IWT, "f1d3")
-f1.add_w2_wall("left", "f1d0", -0.24, IWT, "f1w4")
-f1.add_w2_wall("f1d3", "right", -0.24, IWT, "f1w5")
-
-IWT = 0.25
-
-H_WND_S = (0.5, 1.5, 0.9)
-H_WND_M = (1, 1.5, 0.9)
-H_WND_L = (1.5, 1.5, 0.9)
-H_WND_XL = (2, 1.5, 0.9)
-
-H_DR_M = (1, 2, 0)
-H_DR_L = (1.5, 2, 0)
-
-f1.walls['front'].add_w3_hole(f1.walls['right'], 0.3, 1, *H_WND_L)
-f1.walls['front'].add_w3_hole(f1.walls['f1d3'], 0.1, 1, *H_WND_S)
-f1.walls['front'].add_w3_hole(f1.walls['f1d0'], 0.5, -1, *H_DR_M)
-f1.walls['front'].add_w3_hole(f1.walls['f1d0'], 0.5, 1, *H_WND_M)
-
-f1.walls['right'].add_d3_hole(f1.walls['f1w5'], 0.7, 1, *H_DR_M)
-f1.walls['right'].add_d3_hole(f1.walls['f1w5'], 0.2, -1, *H_WND_M)
-f1.walls['right'].add_d3_hole(f1.walls['f1w1'], 0.1, 1, *H_WND_M)
-f1.walls['right'].add_d3_hole(f1.walls['f1w1'], 0.5, -1, *H_WND_XL)
-
-f1.walls['back'].add_w3_hole(f1.walls['f1d0'], 0.5, 1, *H_WND_M)
-f1.walls['back'].add_w3_hole(f1.walls['f1d0'], 0.5, -1, *H_WND_M)
-
-f1.walls['left'].add_d3_hole(f1.walls['f1w2'], 1, 1, *H_WND_XL)
-f1.walls['left'].add_d3_hole(f1.walls['f1w2'], 0.5, -1, *H_WND_XL)
-f1.walls['left'].add_d3_hole(f1.walls['f1w4'], 0.5, 1, *H_WND_XL)
-
-f1.walls['f1d3'].add_d3_hole(f1.walls['front'], 0.2, -1, *H_DR_M)
-f1.walls['f1d3'].add_d3_hole(f1.walls['f1w1'], 0, 1, *H_DR_L)
-f1.walls['f1d0'].add_d3_hole(f1.walls['f1w1'], 0, 1, *H_DR_L)
-f1.walls['f1d0'].add_d3_hole(f1.walls['f1w4'], 0.2, 1, *H_DR_M)
-
-f1.walls['f1w1'].add_w3_hole(f1.walls['right'], 0.2, 1, *H_DR_M)
-f1.walls['f1w4'].add_w3_hole(f1.walls['f1d0'], 0.2, 1, *H_DR_M)
-f1.walls['f1w2'].add_w3_hole(f1.walls['f1d0'], 0, 1, *H_DR_M)
-f1.walls['f1w2'].add_w3_hole(f1.walls['left'], 0.4, -1, 3, 1.5, 0.5)
-
-f2.add_w2_wall("left", "right", 0.34, IWT, "f2w0")
-f2.add_d2_wall("f2w0", "back", 0, IWT, "f2d1")
-f2.add_d2_wall("front", "f2w0", 0.55, IWT, "f2d2")
-
-
-f2.add_w2_wall("f2d2", "right", 0.1, IWT, "f2w3")
-f2.add_w2_wall("left", "f2d2", -0.24, IWT, "f2w4")
-f2.add_w2_wall("f2d2", "right", -0.66, IWT, "f2w5")
-
-f2.add_d2_wall("front", "f2w4", 0, IWT, "f2d6")
-f2.add_w2_wall("f2d2", "right", -0.24, IWT, "f2w7")
-
-f2.walls['front'].add_w3_hole(f2.walls['f2d1'], 0.5, -1, *H_WND_XL)
-f2.walls['front'].add_w3_hole(f2.walls['f2d1'], 0.5, 1, *H_WND_M)
-
-f2.walls['right'].add_d3_hole(f2.walls['f2w7'], 0.2, -1, *H_WND_M)
-f2.walls['right'].add_d3_hole(f2.walls['f2w7'], 0.7, 1, *H_WND_M)
-f2.walls['right'].add_d3_hole(f2.walls['f2w0'], 0.1, 1, *H_WND_M)
-f2.walls['right'].add_d3_hole(f2.walls['f2w0'], 0.5, -1, *H_WND_XL)
-
-f2.walls['left'].add_d3_hole(f2.walls['f2w0'], 0.5, -1, *H_WND_XL)
-f2.walls['left'].add_d3_hole(f2.walls['f2w0'], 1, 1, *H_WND_XL)
-f2.walls['left'].add_d3_hole(f2.walls['f2w7'], 0.5, 1, *H_WND_XL)
-
-f2.walls['f2w0'].add_w3_hole(f2.walls['f2d1'], 0.2, -1, *H_DR_M)
-f2.walls['f2w0'].add_w3_hole(f2.walls['f2d1'], 0.2, 1, *H_DR_M)
-f2.walls['f2w4'].add_w3_hole(f2.walls['f2d6'], 0.2, 1, *H_DR_M)
-f2.walls['f2w4'].add_w3_hole(f2.walls['f2d6'], 0, -1, 3, 10, 0)
-f2.walls['f2d2'].add_d3_hole(f2.walls['f2w0'], 0.1, 1, *H_DR_M)
-f2.walls['f2d2'].add_d3_hole(f2.walls['f2w5'], 0.2, -1, *H_DR_M)
-f2.walls['f2d2'].add_d3_hole(f2.walls['f2w5'], 0, 1, 3, 10, 0)
-f2.walls['f2w3'].add_w3_hole(f2.walls['f2d2'], 0.2, -1, *H_DR_M)
-
-f2.walls['back'].add_w3_hole(f2.walls['f2d1'], 0.5, 1, *H_WND_M)
-f2.walls['back'].add_w3_hole(f2.walls['f2d1'], 0.5, -1, *H_WND_M)
-
+			size = (house.width - 2*overlap.shift, house.depth - 2*overlap.shift, overlap.height)
+			self.render_part(
+				'overlap%i' % n, incremental.digest(size), lambda: mesh.box(size),
+				get_material('m_foundation'), (0,0,overlap.altitude+overlap.height/2)
+				)
 
-#render ground
-g = bpy_add_cube(name='ground', size=(27,54,2.5), location=(0,0,1.25))
-e = bpy_add_cube(size=(26.9,53.9,2.5), location=(0,0,1.26))
-bpy_obj_minus_obj(g, e)
 
-#render cars
-p = bpy_add_cube(name='cars', size=(7, 10, 3.5), location=(8, -15, 1.75))
-e1 = bpy_add_cube(size=(6.8, 9.8, 3.3), location=(8, -16, 1.7))
-bpy_obj_minus_obj(p, e1)
-p.data.materials.append(m_exwalls)
+class BlenderDistrict(BlenderHouse):
+	# every distinct floor and house is built once into a collection kept out
+	# of the scene, placements and stacked floors are collection instances
+	def __init__(self, district, name='district', merged=False, packed=False):
+		BlenderHouse.__init__(self, None, name, merged=merged)
+		self.district = district
+		# packed: a draft of the whole district out of soa.WallStore arrays
+		self.packed = packed
+		self.designs = {}
+	
+	def render(self):
+		if self.packed:
+			return self.render_packed()
+		before = blender.bpy_mesh_names()
+		self.rendered = []
+		self.rebuilt = []
+		floors = dict(
+			(key, self.render_floor_design(key, floor))
+			for key, floor in self.district.floor_designs().items()
+			)
+		self.designs = dict(
+			(key, self.render_house_design(key, house, floors))
+			for key, house in self.district.designs().items()
+			)
+		
+		self.collection = blender.bpy_child_collection(self.name)
+		n = 0
+		for p in self.district.placements:
+			n += 1
+			name = p.name or '%s.%i' % (self.name, n)
+			blender.bpy_collection_instance(
+				name, self.designs[self.district.fingerprint(p.house)], p.location, (0,0,p.rotation),
+				owner=self.name, parent=self.collection
+				)
+			self.rendered.append(name)
+			self.rebuilt.append(name)
+		blender.bpy_remove_stale(self.name, self.rendered)
+		self.purged = blender.bpy_purge_meshes(before)
+	
+	def render_packed(self):
+		# every wall a box and every opening a glass box sticking out of it,
+		# two meshes for all placements built in one pass over the arrays
+		from genhouse import soa # NumPy only when asked for
+		before = blender.bpy_mesh_names()
+		placements = self.district.placements
+		store = soa.WallStore.from_models(
+			[p.house for p in placements], [p.location for p in placements], [p.rotation for p in placements])
+		self.collection = blender.bpy_child_collection(self.name)
+		self.rendered = []
+		self.rebuilt = []
+		for part, vertices, houses, material in (
+			('walls', store.wall_vertices(), store.wall_house, 'm_exwalls'),
+			('openings', store.hole_vertices(2*B_E), store.wall_house[store.hole_wall], 'm_glass'),
+			):
+			name = '%s.%s' % (self.name, part)
+			ob = blender.bpy_add_packed_object(name, soa.packed_boxes(vertices), collection=self.collection)
+			blender.bpy_move_object(ob, self.collection)
+			ob[blender.OWNER] = self.name
+			ob.data.materials.append(get_material(material))
+			# faces keep the index of their placement
+			blender.bpy_face_ints(ob.data, 'house', houses.repeat(len(soa.FACES)))
+			self.rendered.append(name)
+			self.rebuilt.append(name)
+		blender.bpy_remove_stale(self.name, self.rendered)
+		self.purged = blender.bpy_purge_meshes(before)
+	
+	def render_floor_design(self, key, floor):
+		# built with the base of the floor at the origin
+		prefix = 'floor-%s' % key[:8]
+		self.collection = blender.bpy_design_collection(prefix)
+		self.render_floor(floor, ('%s.inwalls' % prefix, '%s.exwalls' % prefix), (0,0,floor.height/2))
+		self.render_opening_instances(openings.floor_instances(floor, prefix, 0))
+		return self.collection
+	
+	def render_house_design(self, key, house, floors):
+		prefix = 'house-%s' % key[:8]
+		self.collection = blender.bpy_design_collection(prefix)
+		self.house = house
+		for name, material, m in itertools.chain(shapes.foundation_parts(house), shapes.overlap_parts(house)):
+			self.render_part('%s.%s' % (prefix, name), incremental.digest(m.verts), lambda: m, get_material(material), (0,0,0))
+		n = 0
+		for floor in house.floors:
+			n += 1
+			name = '%s.floor%i' % (prefix, n)
+			ob = blender.bpy_collection_instance(
+				name, floors[district.floor_fingerprint(floor)], (0,0,floor.altitude),
+				owner=self.name, parent=self.collection
+				)
+			blender.bpy_move_object(ob, self.collection)
+			self.rendered.append(name)
+		self.house = None
+		return self.collection
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='blender -P b.py --')
+	parser.add_argument('copies', nargs='?', type=int, default=0, help='also lay out copies of the house as a district')
+	parser.add_argument('--merged', action='store_true', help='every floor as one union of its walls')
+	parser.add_argument('--packed', action='store_true', help='the district as a draft of wall and opening boxes')
+	parser.add_argument('-j', '--jobs', type=int, default=0, help='render the floors on background Blenders')
+	args = parser.parse_args(blender.script_args() if argv is None else argv)
+	
+	profiler.instrument(blender)
+	profiler.instrument(globals(), ['bpy_add_cube', 'bpy_obj_minus_obj', 'bpy_obj_plus_obj'])
+	profiler.instrument(BlenderHouse)
+	profiler.instrument(BlenderDistrict)
+	
+	# house configuration
+	with profiler.phase('model'):
+		house = samples.b_house()
+	for issue in spatial.check_house(house):
+		print(issue)
+	print('openings: %s' % ', '.join('%s %i' % kv for kv in sorted(openings.counts(house).items())))
+	
+	
+	#render ground
+	bpy_add_tray('ground', (27,54,2.5), (0,0,1.25), (26.9,53.9,2.5), (0,0,1.26))
+	
+	#render cars
+	bpy_add_tray('cars', (7, 10, 3.5), (8, -15, 1.75), (6.8, 9.8, 3.3), (8, -16, 1.7), get_material('m_exwalls'))
+	
+	# render house
+	if args.jobs:
+		objects = workers.render_here({'sample': 'b', 'merged': args.merged}, args.jobs)
+		print('appended %i objects rendered by floor' % len(objects))
+	else:
+		hb = BlenderHouse(house, merged=args.merged)
+		hb.render()
+		print('rebuilt %i of %i objects, purged %i meshes: %s' % (len(hb.rebuilt), len(hb.rendered), hb.purged, ' '.join(hb.rebuilt)))
+	
+	# blender -P b.py -- N also lays out N copies of the house as a district
+	if args.copies:
+		copies = district.grid([house]*args.copies, 6, (house.width+5, house.depth+5), (100,0,0))
+		db = BlenderDistrict(copies, merged=args.merged, packed=args.packed)
+		db.render()
+		print('district: %(placements)i houses of %(houses)i designs, %(floors)i floors of %(floor_designs)i designs' % copies.stats())
+	
+	if diskcache.cache is not None:
+		print(diskcache.cache.report())
+	profiler.finish()
 
-# render house
-hb = BlenderHouse(house)
-hb.render()
 
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,169 @@
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from genhouse import fakebpy
+
+fakebpy.install()
+
+from genhouse import blender
+from genhouse import diskcache
+from genhouse import district
+from genhouse import incremental
+from genhouse import shapes
+
+import a
+import b
+import c
+from benchmarks import synthetic
+
+SIZES = (10, 100, 1000, 10000)
+# the boolean and join baselines are quadratic enough that larger runs only
+# show that they are slow
+LEGACY_LIMIT = 1000
+
+# every run starts cold: no meshes from an earlier run or from $GMH_CACHE
+diskcache.cache = incremental.wall_meshes.disk = None
+
+
+def world_walls(floor):
+	for name, wall in floor.walls.items():
+		yield name, wall, (wall.location[0], wall.location[1], floor.altitude + wall.size[2]/2)
+
+
+def boolean_walls(floor):
+	# baseline, the original b.py: a cube per wall and per hole, one boolean
+	# per hole
+	objects = []
+	for name, wall, location in world_walls(floor):
+		ob = blender.bpy_add_box(wall.size, location, name=name)
+		for size, l in shapes.holes(wall):
+			cutter_ob = blender.bpy_add_box(
+				(size[0]+0.001, size[1]+0.001, size[2]+0.001),
+				(location[0]+l[0], location[1]+l[1], location[2]+l[2]))
+			blender.bpy_boolean_difference(ob, cutter_ob)
+		objects.append(ob)
+	return objects
+
+
+def render_boolean(h):
+	for floor in h.floors:
+		boolean_walls(floor)
+
+
+def render_join(h):
+	# baseline, the original a.py: boolean walls joined one by one into
+	# their floor
+	for floor in h.floors:
+		objects = boolean_walls(floor)
+		for ob in objects[1:]:
+			blender.bpy_join([objects[0], ob])
+
+
+def render_b(h):
+	b.BlenderHouse(h).render()
+
+
+def render_b_merged(h):
+	b.BlenderHouse(h, merged=True).render()
+
+
+def render_b_packed(h):
+	d = district.District()
+	d.add(h)
+	b.BlenderDistrict(d, packed=True).render()
+
+
+def render_a(h):
+	a.HouseBlender(h).render()
+
+
+def render_c(h):
+	c.BlenderHouse(h).render_batched()
+
+
+# path: (model, renderer), the models come from benchmarks.synthetic
+PATHS = {
+	'b': ('b', render_b),
+	'b-merged': ('b', render_b_merged),
+	'b-packed': ('b', render_b_packed),
+	'a': ('a', render_a),
+	'c': ('c', render_c),
+	'baseline-boolean': ('b', render_boolean),
+	'baseline-join': ('b', render_join),
+	}
+LEGACY = ('baseline-boolean', 'baseline-join')
+
+
+def model(kind, walls, holes_per_wall):
+	if kind == 'a':
+		return synthetic.synthetic_parametric(walls, holes_per_wall)
+	if kind == 'c':
+		# c.py renders the compiled plan
+		return synthetic.synthetic_plan(walls).compile()
+	return synthetic.synthetic_house(walls, holes_per_wall)
+
+
+def run(path, walls, holes_per_wall, memory=False):
+	fakebpy.reset()
+	incremental.wall_meshes.meshes.clear()
+	gc.collect()
+	if memory:
+		tracemalloc.start()
+	kind, render = PATHS[path]
+	start = time.perf_counter()
+	h = model(kind, walls, holes_per_wall)
+	built = time.perf_counter()
+	render(h)
+	done = time.perf_counter()
+	result = {
+		'path': path,
+		'walls': synthetic.counts(h)[0],
+		'holes': synthetic.counts(h)[1],
+		'build_seconds': built - start,
+		'render_seconds': done - built,
+		'objects': len(fakebpy.data.objects),
+		'calls': dict(fakebpy.calls),
+		'ops': sum(c for name, c in fakebpy.calls.items() if name.startswith('ops.')),
+		}
+	if memory:
+		result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+	return result
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m benchmarks.bench', description='the a.py, b.py and c.py renderers on the fake bpy')
+	parser.add_argument('-n', '--walls', type=int, action='append', help='wall counts, default %s' % ' '.join(map(str, SIZES)))
+	parser.add_argument('-p', '--path', action='append', choices=sorted(PATHS), help='render paths, default all')
+	parser.add_argument('--holes', type=int, default=2, help='holes per wall')
+	parser.add_argument('--legacy-limit', type=int, default=LEGACY_LIMIT, help='largest run for the boolean and join baselines')
+	parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+	parser.add_argument('-o', '--output', help='write the results as JSON')
+	args = parser.parse_args(argv)
+
+	results = []
+	print('%-16s %6s %6s %9s %9s %7s %7s %9s' % ('path', 'walls', 'holes', 'build s', 'render s', 'ops', 'objects', 'peak MiB'))
+	for walls in args.walls or SIZES:
+		for path in args.path or list(PATHS):
+			if path in LEGACY and walls > args.legacy_limit:
+				continue
+			r = run(path, walls, args.holes)
+			if not args.no_memory:
+				r['peak_bytes'] = run(path, walls, args.holes, memory=True)['peak_bytes']
+			results.append(r)
+			print('%-16s %6i %6i %9.4f %9.4f %7i %7i %9s' % (
+				path, r['walls'], r['holes'], r['build_seconds'], r['render_seconds'], r['ops'], r['objects'],
+				'%.1f' % (r['peak_bytes']/2**20) if 'peak_bytes' in r else '-'))
+			sys.stdout.flush()
+
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump(results, f, indent=1)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
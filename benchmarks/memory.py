@@ -0,0 +1,58 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from genhouse import parametric
+
+from benchmarks import synthetic
+
+# 10000 walls with 2 holes each, dict backed classes before slots and
+# packed arrays: a 986 -> 785, b 967 -> 725 bytes per wall
+WALLS = 10000
+HOLES = 2
+
+
+def b_model(walls, holes):
+	return synthetic.synthetic_house(walls, holes)
+
+
+def a_model(walls, holes):
+	h = parametric.House(floors=1)
+	floor = h.the_floors[1].floor
+	for i in range(walls):
+		w = floor.add_l_wall(-1 + 2*(i+1)/(walls+1))
+		for k in range(holes):
+			w.add_l_hole(-1 + 2*(k+1)/(holes+1), 0.8, 1.2)
+	return h
+
+
+MODELS = {
+	'a': a_model,
+	'b': b_model,
+	}
+
+
+def measure(model, walls, holes):
+	# bytes the finished model holds on to, per wall with its holes
+	gc.collect()
+	tracemalloc.start()
+	h = MODELS[model](walls, holes)
+	gc.collect()
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del h
+	return size / walls
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m benchmarks.memory', description='model memory per wall')
+	parser.add_argument('-n', '--walls', type=int, default=WALLS)
+	parser.add_argument('--holes', type=int, default=HOLES, help='holes per wall')
+	args = parser.parse_args(argv)
+	for model in sorted(MODELS):
+		print('%s: %.0f bytes per wall with %i holes' % (model, measure(model, args.walls, args.holes), args.holes))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
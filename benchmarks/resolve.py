@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+import time
+
+from genhouse import spec
+
+from benchmarks import synthetic
+
+SIZES = (10, 100, 1000)
+
+
+def run(walls, holes_per_wall):
+	data = synthetic.synthetic_spec(walls, holes_per_wall)
+	start = time.perf_counter()
+	s = spec.Spec(data)
+	resolved = time.perf_counter()
+	# moving the left wall reaches every opening placed from it
+	moved = s.set('floor1.left', 'at', -0.95)
+	edited = time.perf_counter()
+	# one inner wall only reaches its own openings
+	inner = [id for id in s.openings if id.startswith('floor1.w')]
+	local = s.set(inner[0], 'at', 0) if inner else []
+	done = time.perf_counter()
+	counts = [len(w.holes) for floor in s.house.floors for w in floor.walls.values()]
+	return {
+		'walls': len(counts),
+		'holes': sum(counts),
+		'nodes': len(s.nodes),
+		'resolve_seconds': resolved - start,
+		'set_wide_seconds': edited - resolved,
+		'set_wide_nodes': len(moved),
+		'set_local_seconds': done - edited,
+		'set_local_nodes': len(local),
+		}
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m benchmarks.resolve', description='spec resolve and edit times on synthetic specs')
+	parser.add_argument('-n', '--walls', type=int, action='append', help='wall counts, default %s' % ' '.join(map(str, SIZES)))
+	parser.add_argument('--holes', type=int, default=2, help='openings per wall')
+	parser.add_argument('-o', '--output', help='write the results as JSON')
+	args = parser.parse_args(argv)
+
+	results = []
+	print('%6s %6s %6s %10s %10s %6s %10s %6s' % ('walls', 'holes', 'nodes', 'resolve ms', 'wide ms', 'nodes', 'local ms', 'nodes'))
+	for walls in args.walls or SIZES:
+		r = run(walls, args.holes)
+		results.append(r)
+		print('%6i %6i %6i %10.2f %10.2f %6i %10.2f %6i' % (
+			r['walls'], r['holes'], r['nodes'], r['resolve_seconds']*1000,
+			r['set_wide_seconds']*1000, r['set_wide_nodes'], r['set_local_seconds']*1000, r['set_local_nodes']))
+		sys.stdout.flush()
+
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump(results, f, indent=1)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
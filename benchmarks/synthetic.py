@@ -0,0 +1,131 @@
+import math
+
+from genhouse import house
+from genhouse import parametric
+from genhouse import plan
+
+FLOOR_WALLS = 100
+SPACING = 1.2
+HOLE = (0.8, 1.2)
+
+
+def synthetic_house(walls, holes_per_wall=2, floor_walls=FLOOR_WALLS):
+	# b.py style house of about `walls` walls: four outer walls and a row of
+	# parallel inner walls per floor, holes spread along every wall
+	floors = max(1, math.ceil(walls / floor_walls))
+	per_floor = max(4, math.ceil(walls / floors))
+	inner = per_floor - 4
+	width = max(10, (holes_per_wall + 1) * (HOLE[0] + 0.4))
+	depth = max(12, (inner + 1) * SPACING)
+	h = house.House(width=width, depth=depth)
+	h.add_foundation(height=0.3, shift=0.1)
+	for n in range(floors):
+		if n:
+			h.add_overlap(height=0.3, shift=0.1)
+		floor = h.add_floor(height=3, thickness=0.3)
+		for i in range(inner):
+			floor.add_w2_wall('left', 'right', -1 + 2*(i+1)/(inner+1), 0.1, 'w%i' % i)
+		for wall in floor.walls.values():
+			add_holes(wall, holes_per_wall)
+	return h
+
+
+def add_holes(wall, count):
+	along = 0 if wall.size[0] >= wall.size[1] else 1
+	length = wall.size[along]
+	for i in range(count):
+		offset = length * ((i+1)/(count+1) - 0.5)
+		if along == 0:
+			wall.add_hole((HOLE[0], wall.size[1], HOLE[1]), (offset, 0, 0))
+		else:
+			wall.add_hole((wall.size[0], HOLE[0], HOLE[1]), (0, offset, 0))
+
+
+def synthetic_parametric(walls, holes_per_wall=2, floor_walls=FLOOR_WALLS):
+	# the same layout as an a.py house: outer walls with windows on every
+	# floor and a row of inner walls across the length
+	floors = max(1, math.ceil(walls / floor_walls))
+	# every parametric.Floor starts with a unit wall of its own
+	inner = max(5, math.ceil(walls / floors)) - 5
+	h = parametric.House(
+		length=max(9, (holes_per_wall + 1) * (HOLE[0] + 0.4)),
+		width=max(6, (inner + 1) * SPACING),
+		floors=floors)
+	for the_floor in h.the_floors.values():
+		floor = the_floor.floor
+		for i in range(inner):
+			floor.add_l_wall(-1 + 2*(i+1)/(inner+1), wall_type=parametric.Floor.WallType.thin)
+		for the_wall in floor.walls[1:]:
+			wall = the_wall.wall
+			for k in range(holes_per_wall):
+				relative = -1 + 2*(k+1)/(holes_per_wall+1)
+				if wall.size[0] >= wall.size[1]:
+					wall.add_l_hole(relative, HOLE[0], HOLE[1])
+				else:
+					wall.add_w_hole(relative, HOLE[0], HOLE[1])
+	return h
+
+
+def synthetic_plan(walls):
+	# a c.py plan of about `walls` walls: a frame and a row of parallel
+	# walls across it, c.py has no holes
+	inner = max(0, walls - 4)
+	p = plan.Plan()
+	for i in range(inner + 2):
+		p.v['v%i' % i] = i * SPACING
+	p.h['front'] = 0
+	p.h['back'] = 10
+	h = plan.House(p)
+	last = 'v%i' % (inner + 1)
+	h.add_wall('v0:front', 'v0:back')
+	h.add_wall('%s:front' % last, '%s:back' % last)
+	for i in range(inner):
+		h.add_wall('v%i:front' % (i+1), 'v%i:back' % (i+1))
+	h.add_wall('v0:front', '%s:front' % last)
+	h.add_wall('v0:back', '%s:back' % last)
+	return h
+
+
+def counts(h):
+	if isinstance(h, plan.House):
+		return len(h.walls), 0
+	if isinstance(h, parametric.House):
+		walls = [the_wall.wall for the_floor in h.the_floors.values() for the_wall in the_floor.floor.walls]
+	else:
+		walls = [w for floor in h.floors for w in floor.walls.values()]
+	return len(walls), sum(len(w.holes) for w in walls)
+
+
+def synthetic_spec(walls, holes_per_wall=2, floor_walls=FLOOR_WALLS):
+	# the same layout as synthetic_house as spec data, every opening placed
+	# from the left or front wall so the graph has real dependencies
+	floors = max(1, math.ceil(walls / floor_walls))
+	per_floor = max(4, math.ceil(walls / floors))
+	inner = per_floor - 4
+	step = HOLE[0] + 0.4
+	levels = []
+	for n in range(floors):
+		if n:
+			levels.append({'type': 'overlap', 'height': 0.3, 'shift': 0.1})
+		names = ['w%i' % i for i in range(inner)]
+		openings = []
+		for name in ['front', 'back'] + names:
+			for i in range(holes_per_wall):
+				openings.append({'wall': name, 'type': 'w3', 'from': 'left', 'gap': 0.2 + i*step, 'pos': -1, 'opening': 'H_WND_M'})
+		for name in ('left', 'right'):
+			for i in range(holes_per_wall):
+				openings.append({'wall': name, 'type': 'd3', 'from': 'front', 'gap': 0.2 + i*step, 'pos': -1, 'opening': 'H_WND_M'})
+		levels.append({
+			'type': 'floor', 'height': 3, 'thickness': 0.3,
+			'walls': [
+				{'name': name, 'type': 'w2', 'between': ['left', 'right'], 'at': -1 + 2*(i+1)/(inner+1), 'thickness': 0.1}
+				for i, name in enumerate(names)
+				],
+			'openings': openings,
+			})
+	return {
+		'width': max(10, (holes_per_wall + 1) * step),
+		'depth': max(12, (inner + 1) * SPACING),
+		'foundation': {'height': 0.3, 'shift': 0.1},
+		'levels': levels,
+		}
@@ -0,0 +1,63 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# command -> module with a main(argv), imported only when it runs
+COMMANDS = {
+	'cache': 'genhouse.diskcache',
+	'export': 'genhouse.export',
+	'sweep': 'genhouse.sweep',
+	'takeoff': 'genhouse.takeoff',
+	'preview': 'genhouse.preview',
+	'spec': 'genhouse.spec',
+	'server': 'genhouse.server',
+	'workers': 'genhouse.workers',
+	'fake': 'genhouse.fakebpy',
+	}
+
+SCRIPTS = {
+	'a': 'a.py',
+	'b': 'b.py',
+	'c': 'c.py',
+	}
+
+
+def render(argv):
+	parser = argparse.ArgumentParser(prog='python -m genhouse render', description='run a sample script in Blender')
+	parser.add_argument('sample', choices=sorted(SCRIPTS))
+	parser.add_argument('args', nargs='*', help='passed to the script after --')
+	parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'), help='Blender binary, default $BLENDER or blender')
+	parser.add_argument('--fake', action='store_true', help='run on the recording fake bpy instead')
+	parser.add_argument('-o', '--output', help='save the .blend file')
+	args = parser.parse_intermixed_args(argv)
+
+	script = os.path.join(ROOT, SCRIPTS[args.sample])
+	if args.fake:
+		from genhouse import fakebpy
+		return fakebpy.main([script, '--'] + args.args)
+	cmd = [args.blender, '-b', '--python-exit-code', '1', '-P', script]
+	if args.output:
+		cmd += ['--python-expr', 'import bpy; bpy.ops.wm.save_as_mainfile(filepath=%r)' % os.path.abspath(args.output)]
+	try:
+		return subprocess.call(cmd + ['--'] + args.args)
+	except FileNotFoundError:
+		parser.error('%s not found, pass --blender or set $BLENDER' % args.blender)
+
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	commands = sorted(list(COMMANDS) + ['render'])
+	if not argv or argv[0] not in commands:
+		print('usage: python -m genhouse {%s} ...' % ','.join(commands))
+		return 2
+	if argv[0] == 'render':
+		return render(argv[1:])
+	return importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+
+if __name__ == '__main__':
+	sys.exit(main())
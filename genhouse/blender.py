@@ -0,0 +1,381 @@
+import importlib
+import sys
+
+from genhouse import diskcache
+from genhouse import mesh
+
+
+class LazyModule:
+	# imported on first use, so the library loads where bpy is missing and
+	# workers that never touch Blender data do not pay for it
+	def __init__(self, name):
+		self.name = name
+	
+	def __getattr__(self, attr):
+		return getattr(importlib.import_module(self.name), attr)
+
+
+bpy = LazyModule('bpy')
+
+
+def script_args(argv=None):
+	# blender ... -P script.py -- ARGS: what comes after -- is for the script
+	argv = sys.argv if argv is None else argv
+	return argv[argv.index('--')+1:] if '--' in argv else []
+
+
+def bpy_reset_scene(template=None):
+	# start over from template, or an empty file without the default cube,
+	# camera and light
+	if template is not None:
+		bpy.ops.wm.open_mainfile(filepath=template)
+		return
+	try:
+		bpy.ops.wm.read_homefile(use_empty=True)
+	except TypeError:
+		# 2.7x has no use_empty
+		bpy.ops.wm.read_homefile()
+		for ob in list(bpy.data.objects):
+			bpy_remove_object(ob)
+
+
+def bpy_save(path):
+	# copy keeps the session on its own untitled file
+	bpy.ops.wm.save_as_mainfile(filepath=path, copy=True)
+
+
+def bpy_collection():
+	# 2.8x links objects into collections, 2.7x straight into the scene
+	collection = getattr(bpy.context, 'collection', None)
+	if collection is None:
+		return bpy.context.scene
+	return collection
+
+
+def bpy_child_collection(name, parent=None):
+	collection = bpy.data.collections.get(name)
+	if collection is None:
+		collection = bpy.data.collections.new(name)
+		(parent or bpy.context.scene.collection).children.link(collection)
+	return collection
+
+
+def bpy_design_collection(name):
+	# kept out of the scene, only drawn where an instance points at it;
+	# 2.7x calls these groups
+	collections = getattr(bpy.data, 'collections', None)
+	if collections is None:
+		collections = bpy.data.groups
+	collection = collections.get(name)
+	if collection is None:
+		collection = collections.new(name)
+	return collection
+
+
+def bpy_move_object(ob, collection):
+	# objects kept from an earlier run may sit in another collection
+	if collection.objects.get(ob.name) is None:
+		for c in ob.users_collection:
+			c.objects.unlink(ob)
+		collection.objects.link(ob)
+	return ob
+
+
+def bpy_show_collection(collections, shown):
+	# the others stay in the file but cost nothing in the viewport or render
+	for collection in collections:
+		collection.hide_viewport = collection.hide_render = collection is not shown
+
+
+def bpy_new_mesh(name, m):
+	me = bpy.data.meshes.new(name)
+	me.from_pydata(m.verts, [], m.faces)
+	me.update()
+	return me
+
+
+def bpy_new_object(name, m, location=(0,0,0), rotation=None):
+	ob = bpy.data.objects.new(name, bpy_new_mesh(name, m))
+	ob.location = location
+	if rotation is not None:
+		ob.rotation_euler = rotation
+	return ob
+
+
+def bpy_link_objects(objects, collection=None):
+	link = (collection or bpy_collection()).objects.link
+	for ob in objects:
+		link(ob)
+	return objects
+
+
+def bpy_add_boxes(sizes, locations, rotations=None, names=None):
+	rotations = rotations or [None]*len(sizes)
+	names = names or [None]*len(sizes)
+	objects = [
+		bpy_new_object(name or 'Cube', mesh.box(size), location, rotation)
+		for size, location, rotation, name in zip(sizes, locations, rotations, names)
+		]
+	return bpy_link_objects(objects)
+
+
+def bpy_add_box(size, location, rotation=None, name=None):
+	return bpy_add_boxes([size], [location], [rotation], [name])[0]
+
+
+def bpy_remove_object(ob, keyed=False):
+	# the mesh goes too unless something still uses it or it is kept by key
+	# for a later build; keyed lets a keyed one go as well. The mesh is only
+	# looked at here, once it is removed it must not be touched again
+	me = ob.data if ob.type == 'MESH' else None
+	bpy.data.objects.remove(ob, do_unlink=True)
+	if me is not None and me.users == 0 and (keyed or KEY not in me):
+		bpy.data.meshes.remove(me)
+
+
+def bpy_material(name, color):
+	# looked up by name, so re-runs do not pile up name.001 copies
+	m = bpy.data.materials.get(name)
+	if m is None:
+		m = bpy.data.materials.new(name=name)
+	m.diffuse_color = color
+	return m
+
+
+def bpy_mesh_names():
+	return set(me.name for me in bpy.data.meshes)
+
+
+def bpy_purge_meshes(before=()):
+	# meshes left without users that a render made, or that carry a key
+	orphans = [me for me in bpy.data.meshes if me.users == 0 and (me.name not in before or KEY in me)]
+	for me in orphans:
+		bpy.data.meshes.remove(me)
+	return len(orphans)
+
+
+def bpy_set_active(ob):
+	# 2.8x keeps the active object on the view layer
+	view_layer = getattr(bpy.context, 'view_layer', None)
+	if view_layer is None:
+		bpy.context.scene.objects.active = ob
+	else:
+		view_layer.objects.active = ob
+
+
+def bpy_boolean_difference(ob, cutter, remove_cutter=True):
+	mod_bool = ob.modifiers.new('modifier', 'BOOLEAN')
+	mod_bool.operation = 'DIFFERENCE'
+	mod_bool.object = cutter
+	bpy_set_active(ob)
+	bpy.ops.object.modifier_apply(modifier=mod_bool.name)
+	if remove_cutter:
+		bpy_remove_object(cutter)
+	return ob
+
+
+def bpy_join(objects):
+	# the first object takes in the others
+	c = bpy.context.copy()
+	c['object'] = c['active_object'] = objects[0]
+	c['selected_objects'] = c['selected_editable_objects'] = objects
+	if getattr(bpy.context, 'view_layer', None) is None:
+		c['selected_editable_bases'] = [bpy.context.scene.object_bases[ob.name] for ob in objects]
+	# 4.0 dropped the override argument in favour of temp_override
+	if hasattr(bpy.context, 'temp_override'):
+		with bpy.context.temp_override(**c):
+			bpy.ops.object.join()
+	else:
+		bpy.ops.object.join(c)
+	return objects[0]
+
+
+def bpy_mesh_data(me):
+	co = [0.0]*(len(me.vertices)*3)
+	me.vertices.foreach_get('co', co)
+	verts = list(zip(co[0::3], co[1::3], co[2::3]))
+	faces = [tuple(p.vertices) for p in me.polygons]
+	return mesh.Mesh(verts, faces)
+
+
+def bpy_new_packed_mesh(name, co, vertex_index, loop_start, loop_total):
+	me = bpy.data.meshes.new(name)
+	me.vertices.add(len(co)//3)
+	me.vertices.foreach_set('co', co)
+	me.loops.add(len(vertex_index))
+	me.loops.foreach_set('vertex_index', vertex_index)
+	me.polygons.add(len(loop_start))
+	me.polygons.foreach_set('loop_start', loop_start)
+	# 4.0 derives loop_total from loop_start and made it read-only
+	if bpy.app.version < (4, 0, 0):
+		me.polygons.foreach_set('loop_total', loop_total)
+	me.update(calc_edges=True)
+	return me
+
+
+def bpy_add_packed_object(name, packed, location=(0,0,0), collection=None):
+	ob = bpy_object_mesh(name, bpy_new_packed_mesh(name, *packed), collection)
+	ob.location = location
+	return ob
+
+
+KEY = 'gmh_key'
+OWNER = 'gmh_owner'
+
+
+def bpy_object_mesh(name, me, collection=None):
+	# the object called name shows me, the mesh it showed before goes if unused
+	ob = bpy.data.objects.get(name)
+	if ob is not None and ob.type != 'MESH':
+		bpy_remove_object(ob)
+		ob = None
+	if ob is None:
+		return bpy_link_objects([bpy.data.objects.new(name, me)], collection)[0]
+	if ob.data is not me:
+		old = ob.data
+		ob.data = me
+		if old.users == 0:
+			bpy.data.meshes.remove(old)
+	return ob
+
+
+def bpy_cached_mesh(name, key, build):
+	# a mesh in the disk cache goes from the mapped file into foreach_set
+	cache = diskcache.cache
+	packed = cache.get(key) if cache is not None else None
+	if packed is not None:
+		return bpy_new_packed_mesh(name, *packed)
+	m = build()
+	if cache is not None:
+		cache.put(key, m)
+	return bpy_new_mesh(name, m)
+
+
+def bpy_keyed_object(name, key, build, location=(0,0,0), owner=None, collection=None):
+	# reuse the object and its mesh when it was last built from the same key
+	ob = bpy.data.objects.get(name)
+	if ob is not None and ob.type == 'MESH' and ob.get(KEY) == key:
+		ob.location = location
+		return ob, False
+	
+	me = bpy_cached_mesh(name, key, build)
+	me[KEY] = key
+	ob = bpy_object_mesh(name, me, collection)
+	ob[KEY] = key
+	if owner is not None:
+		ob[OWNER] = owner
+	ob.location = location
+	return ob, True
+
+
+def bpy_layout():
+	# where every object sits, for bpy_append to put it back the same way in
+	# another file: None stands for the scene collection
+	scene = getattr(bpy.context.scene, 'collection', None)
+	objects = []
+	for ob in bpy.data.objects:
+		collections = getattr(ob, 'users_collection', None)
+		if collections is None:
+			names = [None]
+		else:
+			names = [None if c == scene else c.name for c in collections]
+		objects.append([ob.name, names])
+	collections = dict((c.name, c.hide_viewport) for c in getattr(bpy.data, 'collections', ()))
+	return {'objects': objects, 'collections': collections}
+
+
+def bpy_appended(datablocks, item):
+	# an append calls the copy of a datablock that is here already name.001
+	base, dot, suffix = item.name.rpartition('.')
+	existing = datablocks.get(base) if dot and suffix.isdigit() else None
+	if existing is None or existing.get(KEY) != item.get(KEY):
+		return item
+	item.user_remap(existing)
+	datablocks.remove(item)
+	return existing
+
+
+def bpy_append(path, layout):
+	# the objects of another .blend in the collections they had there; they
+	# replace objects of the same names, materials and keyed meshes that are
+	# here already are used instead of the appended copies
+	names = [name for name, collections in layout['objects']]
+	for name in names:
+		ob = bpy.data.objects.get(name)
+		if ob is not None:
+			bpy_remove_object(ob, keyed=True)
+	
+	with bpy.data.libraries.load(path) as (data_from, data_to):
+		data_to.objects = names
+	
+	for name, hidden in sorted(layout['collections'].items()):
+		c = bpy_child_collection(name)
+		c.hide_viewport = c.hide_render = hidden
+	for (name, collections), ob in zip(layout['objects'], data_to.objects):
+		if ob.type == 'MESH':
+			for material in list(ob.data.materials):
+				bpy_appended(bpy.data.materials, material)
+			if KEY in ob.data:
+				bpy_appended(bpy.data.meshes, ob.data)
+		for c in collections:
+			bpy_link_objects([ob], None if c is None else bpy_child_collection(c))
+	return data_to.objects
+
+
+def bpy_remove_stale(owner, keep):
+	for ob in [ob for ob in bpy.data.objects if ob.get(OWNER) == owner and ob.name not in keep]:
+		bpy_remove_object(ob, keyed=True)
+
+
+def bpy_shared_mesh(name, key, build):
+	# one datablock per key, linked by every object that shows it
+	me = bpy.data.meshes.get(name)
+	if me is not None and me.get(KEY) == key:
+		return me
+	if me is not None and me.users == 0:
+		# an old build nothing shows any more, the new one takes its name
+		bpy.data.meshes.remove(me)
+	me = bpy_cached_mesh(name, key, build)
+	me[KEY] = key
+	return me
+
+
+def bpy_instance(name, me, location, rotation=None, owner=None, collection=None):
+	ob = bpy_object_mesh(name, me, collection)
+	if owner is not None:
+		ob[OWNER] = owner
+	ob.location = location
+	if rotation is not None:
+		ob.rotation_euler = rotation
+	return ob
+
+
+def bpy_collection_instance(name, collection, location, rotation=None, owner=None, parent=None):
+	# an empty that draws every object of collection at its own transform
+	ob = bpy.data.objects.get(name)
+	if ob is None or ob.type != 'EMPTY':
+		if ob is not None:
+			bpy_remove_object(ob)
+		ob = bpy_link_objects([bpy.data.objects.new(name, None)], parent)[0]
+	if hasattr(ob, 'instance_collection'):
+		ob.instance_type = 'COLLECTION'
+		ob.instance_collection = collection
+	else:
+		ob.dupli_type = 'GROUP'
+		ob.dupli_group = collection
+	if owner is not None:
+		ob[OWNER] = owner
+	ob.location = location
+	if rotation is not None:
+		ob.rotation_euler = rotation
+	return ob
+
+
+def bpy_face_ints(me, name, values):
+	# generic attributes arrived in 2.91, older builds only have int layers
+	if hasattr(me, 'attributes'):
+		layer = me.attributes.new(name, 'INT', 'FACE')
+	else:
+		layer = me.polygon_layers_int.new(name=name)
+	layer.data.foreach_set('value', values)
+	return layer
@@ -0,0 +1,103 @@
+from bisect import bisect_left
+
+from genhouse.mesh import Mesh
+
+EPS = 1e-9
+
+
+def through_axis(size):
+	# openings go across the thinner horizontal side of a wall
+	return 0 if size[0] <= size[1] else 1
+
+
+def breaks(values):
+	result = []
+	for value in sorted(values):
+		if not result or value - result[-1] > EPS:
+			result.append(value)
+	return result
+
+
+def break_index(values, value):
+	return bisect_left(values, value - EPS)
+
+
+def openings(size, holes):
+	t = through_axis(size)
+	u = 1 - t
+	hu, hv, ht = size[u]/2, size[2]/2, size[t]/2
+	
+	rects = []
+	for hole_size, hole_location in holes:
+		if hole_location[t] - hole_size[t]/2 > -ht + EPS or hole_location[t] + hole_size[t]/2 < ht - EPS:
+			return None
+		u0 = max(hole_location[u] - hole_size[u]/2, -hu)
+		u1 = min(hole_location[u] + hole_size[u]/2, hu)
+		v0 = max(hole_location[2] - hole_size[2]/2, -hv)
+		v1 = min(hole_location[2] + hole_size[2]/2, hv)
+		if u1 - u0 > EPS and v1 - v0 > EPS:
+			rects.append((u0, u1, v0, v1))
+	return rects
+
+
+def wall_mesh(size, holes, location=(0,0,0)):
+	rects = openings(size, holes)
+	if rects is None:
+		return None
+	
+	t = through_axis(size)
+	u = 1 - t
+	hu, hv, ht = size[u]/2, size[2]/2, size[t]/2
+	# (u, v, t) is left-handed when the wall is cut across y
+	flip = t == 1
+	
+	us = breaks([-hu, hu] + [r[0] for r in rects] + [r[1] for r in rects])
+	vs = breaks([-hv, hv] + [r[2] for r in rects] + [r[3] for r in rects])
+	nu = len(us) - 1
+	nv = len(vs) - 1
+	
+	cut = [[False]*nv for i in range(nu)]
+	for u0, u1, v0, v1 in rects:
+		for i in range(break_index(us, u0), break_index(us, u1)):
+			row = cut[i]
+			for j in range(break_index(vs, v0), break_index(vs, v1)):
+				row[j] = True
+	
+	def solid(i, j):
+		return 0 <= i < nu and 0 <= j < nv and not cut[i][j]
+	
+	verts = []
+	faces = []
+	index = {}
+	
+	def vert(i, j, k):
+		n = index.get((i, j, k))
+		if n is None:
+			p = [0, 0, 0]
+			p[u] = us[i]
+			p[2] = vs[j]
+			p[t] = ht if k else -ht
+			n = index[(i, j, k)] = len(verts)
+			verts.append((p[0]+location[0], p[1]+location[1], p[2]+location[2]))
+		return n
+	
+	def face(*corners):
+		f = tuple(vert(*c) for c in corners)
+		faces.append(f[::-1] if flip else f)
+	
+	for i in range(nu):
+		for j in range(nv):
+			if cut[i][j]:
+				continue
+			face((i, j, 0), (i, j+1, 0), (i+1, j+1, 0), (i+1, j, 0))
+			face((i, j, 1), (i+1, j, 1), (i+1, j+1, 1), (i, j+1, 1))
+			if not solid(i-1, j):
+				face((i, j, 0), (i, j, 1), (i, j+1, 1), (i, j+1, 0))
+			if not solid(i+1, j):
+				face((i+1, j, 0), (i+1, j+1, 0), (i+1, j+1, 1), (i+1, j, 1))
+			if not solid(i, j-1):
+				face((i, j, 0), (i+1, j, 0), (i+1, j, 1), (i, j, 1))
+			if not solid(i, j+1):
+				face((i, j+1, 0), (i, j+1, 1), (i+1, j+1, 1), (i+1, j+1, 0))
+	
+	return Mesh(verts, faces)
@@ -0,0 +1,221 @@
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from genhouse import mesh
+
+# GMH_CACHE=dir keeps generated meshes in dir, shared by every run, sweep
+# variant and worker pointed at it; GMH_CACHE_LIMIT caps it in bytes
+ENV = 'GMH_CACHE'
+LIMIT_ENV = 'GMH_CACHE_LIMIT'
+LIMIT = 256 << 20
+
+# a file holds the buffers of blender.bpy_new_packed_mesh: co as floats,
+# vertex_index, loop_start and loop_total as ints, in native byte order
+# after a header with the vertex, loop and polygon counts
+MAGIC = ('gmhmsh1' + sys.byteorder[0]).encode('ascii')
+HEADER = struct.Struct('=8sIII4x')
+
+# .tmp files older than this were left by a killed writer
+STALE = 3600
+
+
+def pack(m):
+	co = array('f', [c for v in m.verts for c in v])
+	vertex_index = array('i')
+	loop_start = array('i')
+	loop_total = array('i')
+	for f in m.faces:
+		loop_start.append(len(vertex_index))
+		loop_total.append(len(f))
+		vertex_index.extend(f)
+	return co, vertex_index, loop_start, loop_total
+
+
+def unpack(buffer):
+	# memoryviews straight into buffer, None when it is no cached mesh
+	if len(buffer) < HEADER.size:
+		return None
+	magic, verts, loops, polygons = HEADER.unpack_from(buffer)
+	sizes = (verts*3, loops, polygons, polygons)
+	if magic != MAGIC or len(buffer) != HEADER.size + 4*sum(sizes):
+		return None
+	view = memoryview(buffer)
+	packed = []
+	start = HEADER.size
+	for typecode, n in zip('fiii', sizes):
+		packed.append(view[start:start + 4*n].cast(typecode))
+		start += 4*n
+	return tuple(packed)
+
+
+def unpacked(packed):
+	co, vertex_index, loop_start, loop_total = [b.tolist() for b in packed]
+	verts = list(zip(co[0::3], co[1::3], co[2::3]))
+	faces = [tuple(vertex_index[s:s+n]) for s, n in zip(loop_start, loop_total)]
+	return mesh.Mesh(verts, faces)
+
+
+class DiskCache:
+	def __init__(self, directory, limit=LIMIT):
+		self.directory = directory
+		self.limit = limit
+		self.hits = 0
+		self.misses = 0
+		self.stores = 0
+		self.evicted = 0
+		self.bytes_saved = 0
+		self.bytes_written = 0
+		self.since_trim = 0
+
+	def path(self, key):
+		return os.path.join(self.directory, key[:2], key + '.mesh')
+
+	def get(self, key):
+		# -> packed buffers mapped from the file, or None
+		path = self.path(key)
+		try:
+			with open(path, 'rb') as f:
+				buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		except (OSError, ValueError):
+			buffer = None
+		packed = unpack(buffer) if buffer is not None else None
+		if packed is None:
+			self.misses += 1
+			return None
+		try:
+			# the newest files are the ones used last
+			os.utime(path)
+		except OSError:
+			pass
+		self.hits += 1
+		self.bytes_saved += len(buffer)
+		return packed
+
+	def put(self, key, m):
+		path = self.path(key)
+		directory = os.path.dirname(path)
+		os.makedirs(directory, exist_ok=True)
+		packed = pack(m)
+		# written aside and renamed over, so a reader in another process sees
+		# the whole file or none
+		fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=directory)
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				f.write(HEADER.pack(MAGIC, len(packed[0])//3, len(packed[1]), len(packed[2])))
+				for b in packed:
+					b.tofile(f)
+				size = f.tell()
+			os.replace(tmp, path)
+		except OSError:
+			# Windows will not replace a file someone has mapped, the same
+			# key holds the same mesh so that one is as good
+			try:
+				os.remove(tmp)
+			except OSError:
+				pass
+			return False
+		self.stores += 1
+		self.bytes_written += size
+		self.since_trim += size
+		if self.since_trim > self.limit // 16:
+			self.trim()
+		return True
+
+	def mesh(self, key, build):
+		packed = self.get(key)
+		if packed is not None:
+			return unpacked(packed)
+		m = build()
+		self.put(key, m)
+		return m
+
+	def files(self):
+		# (mtime, size, path) of every cached mesh, and the stale .tmp files
+		files = []
+		stale = []
+		now = time.time()
+		for root, dirs, names in os.walk(self.directory):
+			for name in names:
+				path = os.path.join(root, name)
+				try:
+					st = os.stat(path)
+				except OSError:
+					continue
+				if name.endswith('.mesh'):
+					files.append((st.st_mtime, st.st_size, path))
+				elif name.endswith('.tmp') and now - st.st_mtime > STALE:
+					stale.append(path)
+		return files, stale
+
+	def trim(self, limit=None):
+		# least recently used go first until the rest fits in the limit
+		limit = self.limit if limit is None else limit
+		self.since_trim = 0
+		files, stale = self.files()
+		total = sum(size for mtime, size, path in files)
+		removed = 0
+		for path in stale:
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+		for mtime, size, path in sorted(files):
+			if total <= limit:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				# gone already, or mapped on Windows
+				continue
+			total -= size
+			removed += 1
+		self.evicted += removed
+		return removed
+
+	def stats(self):
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'stores': self.stores,
+			'evicted': self.evicted,
+			'bytes_saved': self.bytes_saved,
+			'bytes_written': self.bytes_written,
+			}
+
+	def report(self):
+		lookups = self.hits + self.misses
+		return 'mesh cache: %i hits of %i (%.0f%%), %.1f KiB saved, %i stored, %i evicted' % (
+			self.hits, lookups, 100.0*self.hits/lookups if lookups else 0, self.bytes_saved/1024, self.stores, self.evicted)
+
+
+path = os.environ.get(ENV)
+cache = DiskCache(path, int(os.environ.get(LIMIT_ENV, LIMIT))) if path else None
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m genhouse.diskcache', description='show, trim or clear the mesh cache')
+	parser.add_argument('directory', nargs='?', default=path, help='cache directory, default $%s' % ENV)
+	parser.add_argument('--trim', type=int, metavar='BYTES', help='drop the least recently used meshes down to BYTES')
+	parser.add_argument('--clear', action='store_true', help='drop every cached mesh')
+	args = parser.parse_args(argv)
+	if not args.directory:
+		parser.error('no cache directory, pass one or set $%s' % ENV)
+
+	c = DiskCache(args.directory)
+	if args.clear:
+		shutil.rmtree(args.directory, ignore_errors=True)
+	elif args.trim is not None:
+		print('evicted %i meshes' % c.trim(args.trim))
+	files, stale = c.files()
+	print('%s: %i meshes, %.1f KiB' % (args.directory, len(files), sum(size for mtime, size, p in files)/1024))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
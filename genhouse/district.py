@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+from genhouse import incremental
+from genhouse import shapes
+
+
+def floor_fingerprint(floor):
+	# everything the floor meshes depend on, but not the altitude of the floor
+	# nor the names of its walls, so stacked copies of a layout match
+	walls = sorted(
+		(shapes.wall_material(name), l, incremental.wall_hash(wall), [hole.kind or '' for hole in wall.holes])
+		for name, wall, l in shapes.floor_walls(floor)
+		)
+	return incremental.digest(floor.height, walls)
+
+
+def house_fingerprint(h):
+	foundation = (h.foundation.height, h.foundation.shift) if h.foundation else None
+	return incremental.digest(
+		h.width, h.depth, foundation,
+		[(overlap.height, overlap.shift, overlap.altitude) for overlap in h.overlaps],
+		[(floor.altitude, floor_fingerprint(floor)) for floor in h.floors],
+		)
+
+
+class Placement:
+	def __init__(self, house, location=(0,0,0), rotation=0, name=None):
+		self.house = house
+		self.location = location
+		self.rotation = rotation
+		self.name = name
+
+
+class District:
+	def __init__(self):
+		self.placements = []
+		self.fingerprints = {}
+
+	def add(self, house, location=(0,0,0), rotation=0, name=None):
+		p = Placement(house, location, rotation, name)
+		self.placements.append(p)
+		return p
+
+	def fingerprint(self, h):
+		# copies of one House object are only hashed once
+		key = self.fingerprints.get(id(h))
+		if key is None or key[0] is not h:
+			key = self.fingerprints[id(h)] = (h, house_fingerprint(h))
+		return key[1]
+
+	def designs(self):
+		# fingerprint -> first house built that way
+		result = OrderedDict()
+		for p in self.placements:
+			result.setdefault(self.fingerprint(p.house), p.house)
+		return result
+
+	def floor_designs(self):
+		result = OrderedDict()
+		for h in self.designs().values():
+			for floor in h.floors:
+				result.setdefault(floor_fingerprint(floor), floor)
+		return result
+
+	def stats(self):
+		designs = self.designs()
+		return {
+			'placements': len(self.placements),
+			'houses': len(designs),
+			'floors': sum(len(p.house.floors) for p in self.placements),
+			'floor_designs': len(self.floor_designs()),
+			}
+
+
+def grid(houses, columns, spacing, origin=(0,0,0)):
+	# houses in rows of columns, spacing (x, y) apart, centred on origin
+	district = District()
+	rows = (len(houses) + columns - 1) // columns
+	for i, h in enumerate(houses):
+		row, column = divmod(i, columns)
+		district.add(h, (
+			origin[0] + (column - (columns-1)/2) * spacing[0],
+			origin[1] + (row - (rows-1)/2) * spacing[1],
+			origin[2],
+			))
+	return district
@@ -0,0 +1,239 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+from genhouse import footprint
+from genhouse import lod
+from genhouse import samples
+from genhouse import shapes
+
+BUFFER = 1 << 20
+
+
+def triangles(faces):
+	for f in faces:
+		for i in range(1, len(f)-1):
+			yield f[0], f[i], f[i+1]
+
+
+def packed(typecode, values):
+	a = array(typecode, values)
+	if sys.byteorder != 'little':
+		a.byteswap()
+	return a.tobytes()
+
+
+class ObjWriter:
+	def __init__(self, path):
+		self.path = path
+		self.file = open(path, 'w', buffering=BUFFER)
+		self.offset = 1
+		self.materials = []
+	
+	@property
+	def mtl_path(self):
+		return os.path.splitext(self.path)[0] + '.mtl'
+	
+	def write(self, name, material, m):
+		f = self.file
+		f.write('o %s\n' % name)
+		if material is not None:
+			if not self.materials:
+				f.write('mtllib %s\n' % os.path.basename(self.mtl_path))
+			if material not in self.materials:
+				self.materials.append(material)
+			f.write('usemtl %s\n' % material)
+		f.writelines(['v %.6f %.6f %.6f\n' % v for v in m.verts])
+		o = self.offset
+		f.writelines(['f %s\n' % ' '.join([str(i+o) for i in face]) for face in m.faces])
+		self.offset += len(m.verts)
+	
+	def close(self):
+		self.file.close()
+		if not self.materials:
+			return
+		with open(self.mtl_path, 'w') as f:
+			for material in self.materials:
+				color = shapes.MATERIALS.get(material, (0.8, 0.8, 0.8, 1.0))
+				f.write('newmtl %s\nKd %.3f %.3f %.3f\nd %.3f\n\n' % ((material,) + tuple(color)))
+
+
+class StlWriter:
+	def __init__(self, path):
+		self.file = open(path, 'wb', buffering=BUFFER)
+		self.count = 0
+		
+		self.file.write(b'gen-my-house'.ljust(80, b' '))
+		# the triangle count is patched in on close
+		self.file.write(struct.pack('<I', 0))
+	
+	def write(self, name, material, m):
+		verts = m.verts
+		pack = struct.Struct('<12fH').pack
+		records = []
+		for a, b, c in triangles(m.faces):
+			p0, p1, p2 = verts[a], verts[b], verts[c]
+			u = (p1[0]-p0[0], p1[1]-p0[1], p1[2]-p0[2])
+			v = (p2[0]-p0[0], p2[1]-p0[1], p2[2]-p0[2])
+			n = (u[1]*v[2]-u[2]*v[1], u[2]*v[0]-u[0]*v[2], u[0]*v[1]-u[1]*v[0])
+			l = math.sqrt(n[0]*n[0]+n[1]*n[1]+n[2]*n[2]) or 1
+			records.append(pack(n[0]/l, n[1]/l, n[2]/l, *(p0+p1+p2), 0))
+		self.file.writelines(records)
+		self.count += len(records)
+	
+	def close(self):
+		self.file.seek(80)
+		self.file.write(struct.pack('<I', self.count))
+		self.file.close()
+
+
+class GlbWriter:
+	def __init__(self, path):
+		self.path = path
+		# the binary chunk goes to a scratch file, the header needs its length
+		self.bin = tempfile.TemporaryFile(buffering=BUFFER)
+		self.length = 0
+		self.gltf = {
+			'asset': {'version': '2.0', 'generator': 'gen-my-house'},
+			'scene': 0,
+			'scenes': [{'nodes': []}],
+			'nodes': [],
+			'meshes': [],
+			'materials': [],
+			'accessors': [],
+			'bufferViews': [],
+			'buffers': [],
+			}
+		self.materials = {}
+	
+	def view(self, data, target):
+		g = self.gltf
+		g['bufferViews'].append({'buffer': 0, 'byteOffset': self.length, 'byteLength': len(data), 'target': target})
+		self.bin.write(data)
+		self.length += len(data)
+		return len(g['bufferViews']) - 1
+	
+	def accessor(self, **kwargs):
+		self.gltf['accessors'].append(kwargs)
+		return len(self.gltf['accessors']) - 1
+	
+	def material(self, material):
+		if material not in self.materials:
+			color = shapes.MATERIALS.get(material, (0.8, 0.8, 0.8, 1.0))
+			self.gltf['materials'].append({
+				'name': material,
+				'pbrMetallicRoughness': {'baseColorFactor': list(color), 'metallicFactor': 0},
+				})
+			self.materials[material] = len(self.gltf['materials']) - 1
+		return self.materials[material]
+	
+	def write(self, name, material, m):
+		g = self.gltf
+		# glTF is Y-up
+		verts = [(x, z, -y) for x, y, z in m.verts]
+		indices = [i for t in triangles(m.faces) for i in t]
+		
+		position = self.accessor(
+			bufferView=self.view(packed('f', [c for v in verts for c in v]), 34962),
+			componentType=5126,
+			count=len(verts),
+			type='VEC3',
+			min=[min(v[i] for v in verts) for i in range(3)],
+			max=[max(v[i] for v in verts) for i in range(3)],
+			)
+		index = self.accessor(
+			bufferView=self.view(packed('I', indices), 34963),
+			componentType=5125,
+			count=len(indices),
+			type='SCALAR',
+			)
+		
+		primitive = {'attributes': {'POSITION': position}, 'indices': index}
+		if material is not None:
+			primitive['material'] = self.material(material)
+		g['meshes'].append({'name': name, 'primitives': [primitive]})
+		g['nodes'].append({'name': name, 'mesh': len(g['meshes']) - 1})
+		g['scenes'][0]['nodes'].append(len(g['nodes']) - 1)
+	
+	def close(self):
+		g = self.gltf
+		g['buffers'].append({'byteLength': self.length})
+		if not g['materials']:
+			del g['materials']
+		
+		head = json.dumps(g, separators=(',', ':')).encode('utf-8')
+		head += b' ' * (-len(head) % 4)
+		pad = b'\0' * (-self.length % 4)
+		
+		with open(self.path, 'wb', buffering=BUFFER) as f:
+			f.write(struct.pack('<4sII', b'glTF', 2, 12 + 8 + len(head) + 8 + self.length + len(pad)))
+			f.write(struct.pack('<I4s', len(head), b'JSON'))
+			f.write(head)
+			f.write(struct.pack('<I4s', self.length + len(pad), b'BIN\0'))
+			self.bin.seek(0)
+			shutil.copyfileobj(self.bin, f, BUFFER)
+			f.write(pad)
+		self.bin.close()
+
+
+WRITERS = {
+	'.obj': ObjWriter,
+	'.stl': StlWriter,
+	'.glb': GlbWriter,
+	}
+
+
+def export(model, paths, level=0, merged=False):
+	stats = {'parts': 0, 'verts': 0, 'faces': 0}
+	parts = footprint.parts(model) if merged else lod.parts(model, level)
+	writers = [WRITERS[os.path.splitext(path)[1].lower()](path) for path in paths]
+	try:
+		for name, material, m in parts:
+			if not m.faces:
+				continue
+			for writer in writers:
+				writer.write(name, material, m)
+			stats['parts'] += 1
+			stats['verts'] += len(m.verts)
+			stats['faces'] += len(m.faces)
+	finally:
+		for writer in writers:
+			writer.close()
+	return stats
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Export a sample house without Blender.')
+	parser.add_argument('sample', choices=sorted(samples.SAMPLES))
+	parser.add_argument('output', nargs='+', help='.obj, .stl or .glb files')
+	parser.add_argument('--lod', type=int, default=0, choices=lod.LODS, dest='level',
+		help='level of detail: 0 every wall, 1 floor shells, 2 one block')
+	parser.add_argument('--merged', action='store_true',
+		help='the walls of each floor as one union without faces inside junctions')
+	args = parser.parse_args(argv)
+	if args.merged and args.level:
+		parser.error('--merged is only built at LOD0')
+	
+	for path in args.output:
+		if os.path.splitext(path)[1].lower() not in WRITERS:
+			parser.error('unknown format: %s' % path)
+	
+	model = samples.SAMPLES[args.sample]()
+	try:
+		if args.merged:
+			footprint.parts(model)
+		else:
+			lod.parts(model, args.level)
+	except ValueError as e:
+		parser.error(str(e))
+	export(model, args.output, args.level, args.merged)
+
+
+if __name__ == '__main__':
+	main()
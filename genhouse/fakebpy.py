@@ -0,0 +1,466 @@
+# a recording stand-in for the part of bpy the genhouse scripts use, so they
+# and the benchmarks run in plain Python:
+#   python -m genhouse.fakebpy b.py
+import importlib
+import pickle
+import runpy
+import sys
+import types
+from collections import Counter
+
+from genhouse import mesh
+
+calls = Counter()
+
+
+def record(name):
+	calls[name] += 1
+
+
+class ID:
+	def __init__(self, name):
+		self.name = name
+		self.props = {}
+		self.use_fake_user = False
+	
+	def __getitem__(self, key):
+		return self.props[key]
+	
+	def __setitem__(self, key, value):
+		self.props[key] = value
+	
+	def __contains__(self, key):
+		return key in self.props
+	
+	def get(self, key, default=None):
+		return self.props.get(key, default)
+	
+	def user_remap(self, new):
+		record('user_remap')
+		for ob in data.objects.values():
+			if ob.data is self:
+				ob.data = new
+		for me in data.meshes.values():
+			me.materials = [new if m is self else m for m in me.materials]
+
+
+class Collection(dict):
+	# bpy.data.* style collection keyed by unique name
+	def __init__(self, factory):
+		super().__init__()
+		self.factory = factory
+		self.suffix = Counter()
+	
+	def unique(self, name):
+		if name not in self:
+			return name
+		n = self.suffix[name]
+		while True:
+			n += 1
+			if '%s.%03i' % (name, n) not in self:
+				self.suffix[name] = n
+				return '%s.%03i' % (name, n)
+	
+	def new(self, name, *args):
+		record('data.%s.new' % self.factory.__name__.lower())
+		item = self.factory(self.unique(name), *args)
+		self[item.name] = item
+		return item
+	
+	def remove(self, item, do_unlink=True):
+		record('data.%s.remove' % self.factory.__name__.lower())
+		del self[item.name]
+		if isinstance(item, Object):
+			for c in list(scene_collections()):
+				if item in c.objects:
+					c.objects.unlink(item)
+	
+	def __iter__(self):
+		return iter(list(self.values()))
+
+
+class PropArray(list):
+	def __init__(self, owner, factory):
+		super().__init__()
+		self.owner = owner
+		self.factory = factory
+	
+	def add(self, count):
+		self.extend(self.factory() for i in range(count))
+	
+	def foreach_set(self, attr, seq):
+		record('foreach_set')
+		seq = list(seq)
+		width = len(seq) // max(len(self), 1)
+		for i, item in enumerate(self):
+			value = seq[i*width:(i+1)*width]
+			setattr(item, attr, value if width > 1 else value[0])
+	
+	def foreach_get(self, attr, seq):
+		record('foreach_get')
+		i = 0
+		for item in self:
+			value = getattr(item, attr)
+			for v in (value if isinstance(value, (list, tuple)) else [value]):
+				seq[i] = v
+				i += 1
+
+
+class Vertex:
+	def __init__(self):
+		self.co = [0.0, 0.0, 0.0]
+
+
+class Loop:
+	def __init__(self):
+		self.vertex_index = 0
+
+
+class Polygon:
+	def __init__(self):
+		self.loop_start = 0
+		self.loop_total = 0
+		self.vertices = ()
+		self.material_index = 0
+
+
+class AttributeValue:
+	def __init__(self):
+		self.value = 0
+
+
+class Attribute:
+	def __init__(self, name, type, domain, mesh):
+		self.name = name
+		self.data_type = type
+		self.domain = domain
+		self.data = PropArray(self, AttributeValue)
+		self.data.add(len(mesh.polygons if domain == 'FACE' else mesh.vertices))
+
+
+class Attributes(dict):
+	def __init__(self, mesh):
+		super().__init__()
+		self.mesh = mesh
+	
+	def new(self, name, type, domain):
+		record('mesh.attributes.new')
+		self[name] = Attribute(name, type, domain, self.mesh)
+		return self[name]
+
+
+class Mesh(ID):
+	def __init__(self, name):
+		ID.__init__(self, name)
+		self.vertices = PropArray(self, Vertex)
+		self.loops = PropArray(self, Loop)
+		self.polygons = PropArray(self, Polygon)
+		self.materials = []
+		self.attributes = Attributes(self)
+	
+	@property
+	def users(self):
+		return sum(1 for ob in data.objects.values() if ob.data is self) + self.use_fake_user
+	
+	def from_pydata(self, verts, edges, faces):
+		record('mesh.from_pydata')
+		self.vertices.add(len(verts))
+		for v, co in zip(self.vertices, verts):
+			v.co = list(co)
+		self.polygons.add(len(faces))
+		for p, f in zip(self.polygons, faces):
+			p.vertices = tuple(f)
+			p.loop_start = len(self.loops)
+			p.loop_total = len(f)
+			self.loops.add(len(f))
+	
+	def update(self, calc_edges=False):
+		record('mesh.update')
+		for p in self.polygons:
+			if not p.vertices and self.loops:
+				p.vertices = tuple(self.loops[i].vertex_index for i in range(p.loop_start, p.loop_start + (p.loop_total or 4)))
+	
+	def validate(self):
+		return False
+
+
+class Material(ID):
+	def __init__(self, name):
+		ID.__init__(self, name)
+		self.diffuse_color = (0.8, 0.8, 0.8, 1.0)
+	
+	@property
+	def users(self):
+		return sum(m.materials.count(self) for m in data.meshes.values()) + self.use_fake_user
+
+
+class Modifier:
+	def __init__(self, name, type):
+		self.name = name
+		self.type = type
+		self.operation = None
+		self.object = None
+
+
+class Modifiers(list):
+	def new(self, name, type):
+		record('modifiers.new')
+		m = Modifier(name, type)
+		self.append(m)
+		return m
+
+
+class Object(ID):
+	def __init__(self, name, data=None):
+		ID.__init__(self, name)
+		self.data = data
+		self.type = 'MESH' if isinstance(data, Mesh) else 'EMPTY'
+		self.location = (0, 0, 0)
+		self.rotation_euler = (0, 0, 0)
+		self.scale = (1, 1, 1)
+		self.modifiers = Modifiers()
+		self.select = False
+		self.hide_viewport = False
+		self.hide_render = False
+		self.instance_type = 'NONE'
+		self.instance_collection = None
+	
+	@property
+	def users(self):
+		return len(self.users_collection)
+	
+	@property
+	def users_collection(self):
+		return [c for c in scene_collections() if self in c.objects]
+
+
+class CollectionObjects(list):
+	def link(self, ob):
+		record('objects.link')
+		if ob in self:
+			raise RuntimeError('Object %r already in collection' % ob.name)
+		self.append(ob)
+	
+	def unlink(self, ob):
+		record('objects.unlink')
+		self.remove(ob)
+	
+	def get(self, name, default=None):
+		for ob in self:
+			if ob.name == name:
+				return ob
+		return default
+
+
+class Children(list):
+	def link(self, c):
+		self.append(c)
+	
+	def unlink(self, c):
+		self.remove(c)
+
+
+class SceneCollection(ID):
+	def __init__(self, name):
+		ID.__init__(self, name)
+		self.objects = CollectionObjects()
+		self.children = Children()
+		self.hide_viewport = False
+		self.hide_render = False
+	
+	@property
+	def all_objects(self):
+		result = list(self.objects)
+		for c in self.children:
+			result += c.all_objects
+		return result
+
+
+def scene_collections():
+	yield context.scene.collection
+	for c in data.collections.values():
+		yield c
+
+
+class Scene:
+	def __init__(self):
+		self.collection = SceneCollection('Scene Collection')
+		self.objects = self.collection.objects
+
+
+class ViewLayerObjects:
+	active = None
+
+
+class ViewLayer:
+	def __init__(self):
+		self.objects = ViewLayerObjects()
+
+
+class Context:
+	def __init__(self):
+		self.scene = Scene()
+		self.view_layer = ViewLayer()
+		self.collection = self.scene.collection
+	
+	@property
+	def object(self):
+		return self.view_layer.objects.active
+	
+	def copy(self):
+		return {}
+
+
+def op(name, func=None):
+	def call(*args, **kwargs):
+		record('ops.' + name)
+		if func is not None:
+			return func(*args, **kwargs)
+		return {'FINISHED'}
+	return call
+
+
+def primitive_cube_add(location=(0,0,0), rotation=(0,0,0), **kwargs):
+	me = data.meshes.new('Cube')
+	cube = mesh.box((2, 2, 2))
+	me.from_pydata(cube.verts, [], cube.faces)
+	ob = data.objects.new('Cube', me)
+	ob.location = location
+	ob.rotation_euler = rotation
+	context.collection.objects.link(ob)
+	context.view_layer.objects.active = ob
+	return {'FINISHED'}
+
+
+def modifier_apply(modifier=None, **kwargs):
+	ob = context.view_layer.objects.active or getattr(context.scene.objects, 'active', None)
+	for m in list(ob.modifiers):
+		if m.name == modifier:
+			ob.modifiers.remove(m)
+	return {'FINISHED'}
+
+
+def join(override=None, **kwargs):
+	# like Blender, every join rebuilds the active mesh from all its parts
+	override = override or {}
+	active = override.get('active_object')
+	verts = [tuple(v.co) for v in active.data.vertices]
+	faces = [p.vertices for p in active.data.polygons]
+	for ob in override.get('selected_objects', []):
+		if ob is active:
+			continue
+		base = len(verts)
+		verts += [tuple(v.co) for v in ob.data.vertices]
+		faces += [tuple(i + base for i in p.vertices) for p in ob.data.polygons]
+		data.objects.remove(ob)
+	me = Mesh(active.data.name)
+	me.from_pydata(verts, [], faces)
+	me.materials = active.data.materials
+	data.meshes[me.name] = me
+	active.data = me
+	return {'FINISHED'}
+
+
+def install():
+	module = sys.modules[__name__]
+	sys.modules['bpy'] = module
+	return module
+
+
+def read_homefile(**kwargs):
+	new_file()
+	return {'FINISHED'}
+
+
+def save_as_mainfile(filepath, **kwargs):
+	# no .blend writer here, the fake file is the pickled objects with their
+	# meshes and materials
+	with open(filepath, 'wb') as f:
+		pickle.dump(list(data.objects), f)
+	return {'FINISHED'}
+
+
+class Library:
+	# with bpy.data.libraries.load(path) as (data_from, data_to): appends
+	# the objects named in data_to.objects
+	def __init__(self, path, link=False):
+		self.path = path
+	
+	def __enter__(self):
+		with open(self.path, 'rb') as f:
+			self.objects = dict((ob.name, ob) for ob in pickle.load(f))
+		self.data_to = types.SimpleNamespace(objects=[])
+		return types.SimpleNamespace(objects=list(self.objects)), self.data_to
+	
+	def __exit__(self, *exc):
+		record('libraries.load')
+		added = set()
+		def add(collection, item):
+			if id(item) not in added:
+				added.add(id(item))
+				item.name = collection.unique(item.name)
+				collection[item.name] = item
+		
+		objects = []
+		for name in self.data_to.objects:
+			ob = self.objects.get(name)
+			if ob is not None:
+				add(data.objects, ob)
+				if isinstance(ob.data, Mesh):
+					add(data.meshes, ob.data)
+					for m in ob.data.materials:
+						add(data.materials, m)
+			objects.append(ob)
+		self.data_to.objects = objects
+
+
+def reset():
+	calls.clear()
+	new_file()
+
+
+def new_file():
+	global data, context
+	data = types.SimpleNamespace(
+		meshes=Collection(Mesh),
+		objects=Collection(Object),
+		materials=Collection(Material),
+		collections=Collection(SceneCollection),
+		libraries=types.SimpleNamespace(load=Library),
+		)
+	context = Context()
+
+
+# no binary to start workers from, they run on the fake too
+app = types.SimpleNamespace(version=(2, 80, 0), binary_path='')
+ops = types.SimpleNamespace(
+	mesh=types.SimpleNamespace(primitive_cube_add=op('mesh.primitive_cube_add', primitive_cube_add)),
+	object=types.SimpleNamespace(
+		modifier_apply=op('object.modifier_apply', modifier_apply),
+		delete=op('object.delete'),
+		join=op('object.join', join),
+		),
+	wm=types.SimpleNamespace(
+		read_homefile=op('wm.read_homefile', read_homefile),
+		open_mainfile=op('wm.open_mainfile', read_homefile),
+		save_as_mainfile=op('wm.save_as_mainfile', save_as_mainfile),
+		),
+	)
+reset()
+
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	if not argv:
+		print('usage: python -m genhouse.fakebpy SCRIPT [ARGS...]')
+		return 2
+	# as python -m genhouse.fakebpy this is __main__, the scripts get the
+	# module itself so fake files pickled by workers load here too
+	module = importlib.import_module('genhouse.fakebpy').install()
+	sys.argv = argv
+	runpy.run_path(argv[0], run_name='__main__')
+	print('bpy calls: %s' % ', '.join('%s %i' % kv for kv in sorted(module.calls.items())))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
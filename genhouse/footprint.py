@@ -0,0 +1,155 @@
+from collections import OrderedDict
+
+from genhouse import cutter
+from genhouse import house
+from genhouse import parametric
+from genhouse import shapes
+from genhouse import spatial
+from genhouse import takeoff
+from genhouse.mesh import Mesh
+
+# for each axis the other two, in the order that makes their corners turn
+# counter-clockwise seen from the positive side
+PLANES = ((1, 2), (2, 0), (0, 1))
+
+# walls that meet are shared by the one listed first
+MATERIALS = ('m_exwalls', 'm_inwalls', None)
+
+
+def rank(material):
+	return MATERIALS.index(material) if material in MATERIALS else len(MATERIALS)
+
+
+def wall_solid(material, wall, location):
+	# (material, box, boxes cut out of it) in the frame of location
+	cuts = [spatial.box(size, (location[0]+l[0], location[1]+l[1], location[2]+l[2])) for size, l in shapes.holes(wall)]
+	return material, spatial.box(wall.size, location), cuts
+
+
+def cell_range(values, lo, hi):
+	return range(cutter.break_index(values, lo), cutter.break_index(values, hi))
+
+
+def union_cells(solids):
+	# the walls on one grid of every wall and opening bound: z breaks are the
+	# floor, sill and lintel levels, so each z slab is one height band
+	grid = [cutter.breaks([b[s][a] for material, box, cuts in solids for b in [box] + cuts for s in (0, 1)]) for a in range(3)]
+	cells = {}
+	for material, box, cuts in sorted(solids, key=lambda s: rank(s[0])):
+		ranges = [cell_range(grid[a], box[0][a], box[1][a]) for a in range(3)]
+		cut = set()
+		for b in cuts:
+			xs, ys, zs = [cell_range(grid[a], max(b[0][a], box[0][a]), min(b[1][a], box[1][a])) for a in range(3)]
+			cut.update((i, j, k) for i in xs for j in ys for k in zs)
+		for i in ranges[0]:
+			for j in ranges[1]:
+				for k in ranges[2]:
+					if (i, j, k) not in cut:
+						cells.setdefault((i, j, k), material)
+	return grid, cells
+
+
+def rectangles(squares):
+	# greedy: run along q first, then grow across p while the whole run is there
+	left = set(squares)
+	for p, q in sorted(squares):
+		if (p, q) not in left:
+			continue
+		q1 = q + 1
+		while (p, q1) in left:
+			q1 += 1
+		p1 = p + 1
+		while all((p1, x) in left for x in range(q, q1)):
+			p1 += 1
+		for a in range(p, p1):
+			for b in range(q, q1):
+				left.discard((a, b))
+		yield p, q, p1, q1
+
+
+def point(axis, plane, p, q):
+	c = [0, 0, 0]
+	c[axis] = plane
+	c[PLANES[axis][0]] = p
+	c[PLANES[axis][1]] = q
+	return tuple(c)
+
+
+def union_meshes(solids, location=(0,0,0)):
+	# one mesh per material, together a closed surface: faces between cells
+	# of two materials are inside the union and left out
+	grid, cells = union_cells(solids)
+	masks = {}
+	for c, material in cells.items():
+		for axis in range(3):
+			for side in (0, 1):
+				n = list(c)
+				n[axis] += 1 if side else -1
+				if tuple(n) in cells:
+					continue
+				key = (material, axis, side, c[axis] + side)
+				masks.setdefault(key, []).append((c[PLANES[axis][0]], c[PLANES[axis][1]]))
+
+	faces = []
+	for (material, axis, side, plane), squares in sorted(masks.items(), key=lambda item: (rank(item[0][0]), item[0][1:])):
+		for p0, q0, p1, q1 in rectangles(squares):
+			faces.append((material, axis, side, plane, p0, q0, p1, q1))
+
+	# corners of one face can sit on the edge of a bigger neighbour, the
+	# neighbour gets them too so every edge is shared by exactly two faces
+	used = set()
+	for material, axis, side, plane, p0, q0, p1, q1 in faces:
+		used.update(point(axis, plane, p, q) for p in (p0, p1) for q in (q0, q1))
+
+	meshes = OrderedDict()
+	index = {}
+	for material, axis, side, plane, p0, q0, p1, q1 in faces:
+		m = meshes.get(material)
+		if m is None:
+			m = meshes[material] = Mesh()
+			index[material] = {}
+		ring = (
+			[point(axis, plane, p, q0) for p in range(p0, p1)] +
+			[point(axis, plane, p1, q) for q in range(q0, q1)] +
+			[point(axis, plane, p, q1) for p in range(p1, p0, -1)] +
+			[point(axis, plane, p0, q) for q in range(q1, q0, -1)]
+			)
+		face = []
+		for c in ring:
+			if c not in used:
+				continue
+			v = index[material].get(c)
+			if v is None:
+				v = index[material][c] = len(m.verts)
+				m.verts.append(tuple(grid[a][c[a]] + location[a] for a in range(3)))
+			face.append(v)
+		m.faces.append(tuple(face) if side else tuple(face[::-1]))
+	return meshes
+
+
+def floor_meshes(walls, location=(0,0,0)):
+	# walls as (material, wall, centre), the meshes are placed at location
+	return union_meshes([wall_solid(*w) for w in walls], location)
+
+
+def parts(model):
+	# checked here and not on the first part, before anything is written
+	if not isinstance(model, (house.House, parametric.House)):
+		raise ValueError('merged floors are only built for a.py and b.py houses')
+	return model_parts(model)
+
+
+def model_parts(model):
+	# takeoff knows the wall materials of both a.py and b.py houses
+	floors = OrderedDict()
+	for n, name, material, wall, location in takeoff.model_walls(model):
+		floors.setdefault(n, []).append((material, wall, location))
+	if isinstance(model, house.House):
+		yield from shapes.foundation_parts(model)
+	else:
+		yield from shapes.plate_parts(model)
+	for n, walls in floors.items():
+		for material, m in floor_meshes(walls).items():
+			yield 'floor%i.%s' % (n, material[2:]), material, m
+	if isinstance(model, house.House):
+		yield from shapes.overlap_parts(model)
@@ -0,0 +1,185 @@
+from array import array
+
+
+def packed(size, location):
+	data = array('d', size)
+	data.extend(location)
+	return data
+
+
+def packed_field(start):
+	# getter and setter of a 3-vector stored at data[start:start+3]
+	def get(self):
+		return tuple(self.data[start:start+3])
+	
+	def set(self, value):
+		self.data[start:start+3] = array('d', value)
+	
+	return get, set
+
+
+class House:
+	# slots and packed doubles keep district sized models small
+	__slots__ = ('width', 'depth', 'foundation', 'floors', 'overlaps', 'altitude')
+	
+	class Foundation:
+		__slots__ = ('height', 'shift')
+		
+		def __init__(self, height, shift):
+			self.height = height
+			self.shift = shift
+
+	class Overlap:
+		__slots__ = ('height', 'shift', 'altitude')
+		
+		def __init__(self, height, shift, altitude):
+			self.height = height
+			self.shift = shift
+			self.altitude = altitude
+			
+	class Floor:
+		__slots__ = ('height', 'thickness', 'altitude', 'width', 'depth', 'walls')
+		
+		class Wall:
+			__slots__ = ('data', 'holes')
+			
+			class Hole:
+				__slots__ = ('data', 'kind')
+				
+				def __init__(self, size, location, kind=None):
+					self.data = packed(size, location)
+					self.kind = kind
+				
+				size = property(*packed_field(0))
+				location = property(*packed_field(3))
+
+			def __init__(self, size, location):
+				self.data = packed(size, location)
+				self.holes = []
+			
+			size = property(*packed_field(0))
+			location = property(*packed_field(3))
+				
+			@property
+			def bound_left(self):
+				return self.data[3]-self.data[0]/2
+			
+			@property
+			def bound_right(self):
+				return self.data[3]+self.data[0]/2
+			
+			@property
+			def bound_back(self):
+				return self.data[4]+self.data[1]/2
+			
+			@property
+			def bound_front(self):
+				return self.data[4]-self.data[1]/2
+			
+			def add_hole(self, size, location, kind=None):
+				hole = House.Floor.Wall.Hole(size, location, kind)
+				self.holes.append(hole)
+				return hole
+			
+			def w3_hole(self, gap_wall, gap, pos, width, height, base_height):
+				size = (width, self.size[1], height)
+				if pos > 0:
+					location_0 = gap_wall.bound_left - self.location[0] - gap - width/2
+				else:
+					location_0 = gap_wall.bound_right - self.location[0] + gap + width/2
+				location = (location_0, 0, base_height+(height-self.size[2])/2)
+				return size, location
+			
+			def d3_hole(self, gap_wall, gap, pos, depth, height, base_height):
+				size = (self.size[0], depth, height)
+				if pos > 0:
+					location_1 = gap_wall.bound_front - self.location[1] - gap - depth/2
+				else:
+					location_1 = gap_wall.bound_back - self.location[1] + gap + depth/2
+				location = (0, location_1, base_height+(height-self.size[2])/2)
+				return size, location
+			
+			def add_w3_hole(self, gap_wall, gap, pos, width, height, base_height, kind=None):
+				return self.add_hole(*self.w3_hole(gap_wall, gap, pos, width, height, base_height), kind)
+			
+			def add_d3_hole(self, gap_wall, gap, pos, depth, height, base_height, kind=None):
+				return self.add_hole(*self.d3_hole(gap_wall, gap, pos, depth, height, base_height), kind)
+			
+	
+		def __init__(self, height, thickness, altitude, width, depth):
+			self.height = height
+			self.thickness = thickness
+			self.altitude = altitude
+			self.width = width
+			self.depth = depth
+			self.walls = {}
+			
+			self.add_d_wall((-1,1), -1+thickness/width, thickness, "left")
+			self.add_d_wall((-1,1),  1-thickness/width, thickness, "right")
+			self.add_w2_wall("left", "right",  1-thickness/depth, thickness, "back")
+			self.add_w2_wall("left", "right", -1+thickness/depth, thickness, "front")
+			
+		def add_wall(self, size, location, name):
+			wall = House.Floor.Wall(size, location)
+			self.walls[name] = wall
+			return wall
+			
+		def w_wall(self, relative_width, relative_depth, thickness):
+			size = (self.width*(relative_width[1]-relative_width[0])/2, thickness, self.height)
+			location = (self.width*(relative_width[1]+relative_width[0])/4, self.depth/2*relative_depth, 0)
+			return size, location
+			
+		def d_wall(self, relative_depth, relative_width, thickness):
+			size = (thickness, self.depth*(relative_depth[1]-relative_depth[0])/2, self.height)
+			location = (self.width/2*relative_width, self.depth*(relative_depth[1]+relative_depth[0])/4, 0)
+			return size, location
+			
+		def w2_wall(self, left, right, relative_depth, thickness):
+			left_wall = self.walls[left]
+			right_wall = self.walls[right]
+			size = (right_wall.bound_left-left_wall.bound_right, thickness, self.height)
+			location = ((right_wall.bound_left+left_wall.bound_right)/2, self.depth/2*relative_depth, 0)
+			return size, location
+		
+		def d2_wall(self, front, back, relative_width, thickness):
+			front_wall = self.walls[front]
+			back_wall = self.walls[back]
+			size = (thickness, back_wall.bound_front-front_wall.bound_back, self.height)
+			location = (self.width/2*relative_width, (back_wall.bound_front+front_wall.bound_back)/2, 0)
+			return size, location
+			
+		def add_w_wall(self, relative_width, relative_depth, thickness, name):
+			return self.add_wall(*self.w_wall(relative_width, relative_depth, thickness), name)
+			
+		def add_d_wall(self, relative_depth, relative_width, thickness, name):
+			return self.add_wall(*self.d_wall(relative_depth, relative_width, thickness), name)
+			
+		def add_w2_wall(self, left, right, relative_depth, thickness, name):
+			return self.add_wall(*self.w2_wall(left, right, relative_depth, thickness), name)
+		
+		def add_d2_wall(self, front, back, relative_width, thickness, name):
+			return self.add_wall(*self.d2_wall(front, back, relative_width, thickness), name)
+		
+	def __init__(self, width, depth):
+		self.width = width
+		self.depth = depth
+		self.foundation = None
+		self.floors = []
+		self.overlaps = []
+		self.altitude = 0
+	
+	def add_foundation(self, height, shift):
+		self.foundation = House.Foundation(height, shift)
+		self.altitude += height
+	
+	def add_floor(self, height, thickness):
+		floor = House.Floor(height, thickness, self.altitude, self.width, self.depth)
+		self.floors.append(floor)
+		self.altitude += height
+		return floor
+		
+	def add_overlap(self, height, shift):
+		overlap = House.Overlap(height, shift, self.altitude)
+		self.overlaps.append(overlap)
+		self.altitude += height
+		return overlap
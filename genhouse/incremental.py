@@ -0,0 +1,71 @@
+import hashlib
+import struct
+from collections import OrderedDict
+
+from genhouse import diskcache
+
+# bump when the meshes generated for the same model change
+GENERATOR_VERSION = 1
+
+# floats are rounded so that 0.1+0.2 and 0.3 hash the same
+DIGITS = 9
+
+
+def feed(h, value):
+	if isinstance(value, float):
+		h.update(b'f' + struct.pack('<d', round(value, DIGITS) + 0.0))
+	elif isinstance(value, bool) or value is None:
+		h.update(b'n' + repr(value).encode('ascii'))
+	elif isinstance(value, int):
+		h.update(b'f' + struct.pack('<d', float(value)))
+	elif isinstance(value, str):
+		data = value.encode('utf-8')
+		h.update(b's' + struct.pack('<I', len(data)) + data)
+	elif isinstance(value, (tuple, list)):
+		h.update(b'(' + struct.pack('<I', len(value)))
+		for v in value:
+			feed(h, v)
+	else:
+		raise TypeError('cannot hash %r' % (value,))
+
+
+def digest(*values):
+	h = hashlib.sha1()
+	feed(h, GENERATOR_VERSION)
+	feed(h, values)
+	return h.hexdigest()
+
+
+def wall_hash(wall):
+	# only what shapes the wall mesh itself: where it goes is up to the floor
+	return digest(wall.size, [(hole.size, hole.location) for hole in wall.holes])
+
+
+class MeshMemo:
+	def __init__(self, limit=4096, disk=None):
+		self.limit = limit
+		# a diskcache.DiskCache behind the memo, for the first run too
+		self.disk = disk
+		self.meshes = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+	
+	def get(self, key, build):
+		m = self.meshes.get(key)
+		if m is not None:
+			self.meshes.move_to_end(key)
+			self.hits += 1
+			return m
+		self.misses += 1
+		if self.disk is not None:
+			m = self.meshes[key] = self.disk.mesh(key, build)
+		else:
+			m = self.meshes[key] = build()
+		if len(self.meshes) > self.limit:
+			self.meshes.popitem(last=False)
+		return m
+
+
+# lives as long as the interpreter, so reruns inside one Blender session
+# only regenerate the walls that changed
+wall_meshes = MeshMemo(disk=diskcache.cache)
@@ -0,0 +1,53 @@
+from genhouse import house
+from genhouse import mesh
+from genhouse import shapes
+
+# 0: every wall with its openings, 1: external walls of each floor as one
+# shell, 2: one block per house
+LODS = (0, 1, 2)
+
+
+def shell_walls(floor):
+	for name, wall, l in shapes.floor_walls(floor):
+		if name in shapes.EXTERNAL_WALLS:
+			yield name, wall, l
+
+
+def shell_mesh(floor, location=(0,0,0)):
+	# location is where the centre of the floor goes
+	return mesh.concat([
+		(shapes.wall_mesh(name, wall, (0,0,0)), (l[0]+location[0], l[1]+location[1], l[2]+location[2]))
+		for name, wall, l in shell_walls(floor)
+		])
+
+
+def massing_size(h):
+	return (h.width, h.depth, h.altitude)
+
+
+def massing_mesh(h):
+	# centred on the ground, like the foundation below it
+	return mesh.box(massing_size(h), (0, 0, h.altitude/2))
+
+
+def shell_parts(h):
+	yield from shapes.foundation_parts(h)
+	for n, floor in enumerate(h.floors, 1):
+		yield 'floor%i' % n, 'm_exwalls', shell_mesh(floor, (0, 0, floor.altitude + floor.height/2))
+	yield from shapes.overlap_parts(h)
+
+
+def massing_parts(h):
+	yield 'house', 'm_exwalls', massing_mesh(h)
+
+
+def parts(model, lod=0):
+	if lod == 0:
+		return shapes.parts(model)
+	if not isinstance(model, house.House):
+		raise ValueError('LOD%i is only built for b.py houses' % lod)
+	if lod == 1:
+		return shell_parts(model)
+	if lod == 2:
+		return massing_parts(model)
+	raise ValueError('unknown LOD %r' % lod)
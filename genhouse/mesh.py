@@ -0,0 +1,43 @@
+import math
+
+# corner i of a box has its x, y, z signs in bits 2, 1, 0
+BOX_CORNERS = tuple(
+	(sx, sy, sz) for sx in (-1, 1) for sy in (-1, 1) for sz in (-1, 1)
+	)
+
+BOX_FACES = (
+	(0, 1, 3, 2),
+	(4, 6, 7, 5),
+	(0, 4, 5, 1),
+	(2, 3, 7, 6),
+	(0, 2, 6, 4),
+	(1, 5, 7, 3),
+	)
+
+
+class Mesh:
+	def __init__(self, verts=None, faces=None):
+		self.verts = [] if verts is None else verts
+		self.faces = [] if faces is None else faces
+
+
+def box(size, location=(0,0,0), rotation=0):
+	hx, hy, hz = size[0]/2, size[1]/2, size[2]/2
+	c, s = math.cos(rotation), math.sin(rotation)
+	verts = [
+		(location[0]+sx*hx*c-sy*hy*s, location[1]+sx*hx*s+sy*hy*c, location[2]+sz*hz)
+		for sx, sy, sz in BOX_CORNERS
+		]
+	return Mesh(verts, list(BOX_FACES))
+
+
+def concat(parts):
+	verts = []
+	faces = []
+	for m, offset in parts:
+		base = len(verts)
+		ox, oy, oz = offset
+		verts.extend([(x+ox, y+oy, z+oz) for x, y, z in m.verts])
+		faces.extend([tuple(i+base for i in f) for f in m.faces])
+	return Mesh(verts, faces)
+
@@ -0,0 +1,89 @@
+import math
+from collections import Counter
+
+from genhouse import cutter
+from genhouse import mesh
+
+FRAME = 0.06
+FRAME_DEPTH = 0.08
+GLASS = 0.02
+
+
+class OpeningType:
+	def __init__(self, name, width, height, base_height, glass=True):
+		self.name = name
+		self.width = width
+		self.height = height
+		self.base_height = base_height
+		self.glass = glass
+	
+	@property
+	def dims(self):
+		return (self.width, self.height, self.base_height)
+	
+	def frame_mesh(self, width, height):
+		# built across y; a door frame has no sill
+		f = FRAME
+		parts = [(mesh.box((width, FRAME_DEPTH, f)), (0, 0, height/2 - f/2))]
+		if self.glass:
+			parts.append((mesh.box((width, FRAME_DEPTH, f)), (0, 0, -height/2 + f/2)))
+			side = mesh.box((f, FRAME_DEPTH, height - 2*f))
+			z = 0
+		else:
+			side = mesh.box((f, FRAME_DEPTH, height - f))
+			z = -f/2
+		parts.append((side, (-width/2 + f/2, 0, z)))
+		parts.append((side, (width/2 - f/2, 0, z)))
+		return mesh.concat(parts)
+	
+	def glass_mesh(self, width, height):
+		if not self.glass:
+			return None
+		return mesh.box((width - 2*FRAME, GLASS, height - 2*FRAME))
+
+
+TYPES = [
+	OpeningType('H_WND_S', 0.5, 1.5, 0.9),
+	OpeningType('H_WND_M', 1, 1.5, 0.9),
+	OpeningType('H_WND_L', 1.5, 1.5, 0.9),
+	OpeningType('H_WND_XL', 2, 1.5, 0.9),
+	OpeningType('H_DR_M', 1, 2, 0, glass=False),
+	OpeningType('H_DR_L', 1.5, 2, 0, glass=False),
+	]
+
+CATALOGUE = dict((t.name, t) for t in TYPES)
+
+
+def house_holes(h):
+	for n, floor in enumerate(h.floors, 1):
+		for name, wall in floor.walls.items():
+			for k, hole in enumerate(wall.holes, 1):
+				yield n, floor, name, wall, k, hole
+
+
+def counts(h):
+	return Counter(hole.kind or 'custom' for n, floor, name, wall, k, hole in house_holes(h))
+
+
+def floor_instances(floor, prefix, altitude):
+	# (name, type, width, height, location, rotation) of every catalogued
+	# opening of a floor whose base is at altitude
+	for name, wall in floor.walls.items():
+		for k, hole in enumerate(wall.holes, 1):
+			t = CATALOGUE.get(hole.kind)
+			if t is None:
+				continue
+			across = cutter.through_axis(wall.size)
+			location = (
+				wall.location[0] + hole.location[0],
+				wall.location[1] + hole.location[1],
+				altitude + wall.size[2]/2 + hole.location[2],
+				)
+			# shared meshes are built across y, openings in x-thin walls turn
+			rotation = (0, 0, math.pi/2) if across == 0 else (0, 0, 0)
+			yield '%s.%s.%i' % (prefix, name, k), t, hole.size[1-across], hole.size[2], location, rotation
+
+
+def instances(h):
+	for n, floor in enumerate(h.floors, 1):
+		yield from floor_instances(floor, 'floor%i' % n, floor.altitude)
@@ -0,0 +1,216 @@
+from array import array
+from enum import Enum
+
+from genhouse.house import packed
+from genhouse.house import packed_field
+
+
+class Hole:
+	__slots__ = ('data', 'parent')
+	
+	def __init__(self, size, location, parent):
+		self.data = packed(size, location)
+		self.parent = parent
+	
+	size = property(*packed_field(0))
+	location = property(*packed_field(3))
+
+
+def packed_scalar(index):
+	def get(self):
+		return self.data[index]
+	
+	def set(self, value):
+		self.data[index] = value
+	
+	return get, set
+
+
+class Wall:
+	__slots__ = ('data', 'holes', 'parent')
+	
+	def __init__(self, parent, size=(1,1,1)):
+		self.data = array('d', size)
+		self.holes = []
+		self.parent = parent
+	
+	length = property(*packed_scalar(0))
+	width = property(*packed_scalar(1))
+	height = property(*packed_scalar(2))
+		
+	@property
+	def size(self):
+		return tuple(self.data)
+		
+	def add_hole(self, size, location):
+		self.holes.append(Hole(size=size, location=location, parent=self))
+		
+	def add_l_hole(self, relative, length, height, base_height=0):
+		s = (length, self.width, height)
+		l = (self.length/2*relative, 0, base_height+(height-self.height)/2)	
+		return self.add_hole(size=s, location=l)
+		
+	def add_w_hole(self, relative, width, height, base_height=0):
+		s = (self.length, width, height)
+		l = (0, self.width/2*relative, base_height+(height-self.height)/2)	
+		return self.add_hole(size=s, location=l)
+		
+
+class TheWall:
+	__slots__ = ('wall', 'data', 'parent')
+	
+	def __init__(self, wall, parent, location=(0,0,0)):
+		self.wall = wall
+		self.data = array('d', location)
+		self.parent = parent
+	
+	location = property(*packed_field(0))
+	
+	
+class Floor:
+	__slots__ = ('length', 'width', 'height', 'external_wall', 'internal_wall', 'thin_wall', 'walls')
+	
+	class WallType(Enum):
+		none = 0
+		external = 1
+		internal = 2
+		thin = 3
+		
+
+	def __init__(self, parent, length=None, width=None, height=None, external_wall=None, internal_wall=None, thin_wall=None):
+		self.length = length if length else parent.length
+		self.width = width if width else parent.width
+		self.height = height if height else parent.height
+		self.external_wall = external_wall if external_wall else parent.external_wall
+		self.internal_wall = internal_wall if internal_wall else parent.internal_wall
+		self.thin_wall = thin_wall if thin_wall else parent.thin_wall
+		self.walls = []
+		
+		w = Wall(size=(1,1,1), parent=self)
+		w.add_hole(size=(1,1,1), location=(0,0,0))
+		self.add_wall(wall=w, location=(0,0,0))
+		
+	@property
+	def in_length(self):
+		return self.length-2*self.external_wall
+		
+	@property
+	def in_width(self):
+		return self.width-2*self.external_wall
+		
+	def wall(self, wall_type=WallType.none):
+		if wall_type == Floor.WallType.external:
+			return self.external_wall
+		elif wall_type == Floor.WallType.internal:
+			return self.internal_wall
+		elif wall_type == Floor.WallType.thin:
+			return self.thin_wall
+		else:
+			raise NotImplementedError
+
+		
+	def add_wall(self, wall, location):
+		return self.walls.append(TheWall(wall=wall, location=location, parent=self))
+		
+	def add_l_wall(self, relative, size=(-1,1), wall_type=WallType.internal):
+		wall = self.wall(wall_type)
+
+		if wall_type == Floor.WallType.internal or wall_type == Floor.WallType.thin:
+			s = (self.in_length*(size[1]-size[0])/2, wall, self.height)
+			l = (self.in_length*(size[1]+size[0])/4, self.in_width/2*relative, 0)
+		elif wall_type == Floor.WallType.external:
+			s = (self.length*(size[1]-size[0])/2, wall, self.height)
+			l = (self.length*(size[1]+size[0])/4, (self.width-wall)/2*relative, 0)	
+		else:
+			raise NotImplementedError
+		
+		w = Wall(size=s, parent=self)
+		self.add_wall(wall=w, location=l)
+		return w
+		
+	def add_w_wall(self, relative, size=(-1,1), wall_type=WallType.internal):
+		wall = self.wall(wall_type)
+	
+		if wall_type == Floor.WallType.internal or wall_type == Floor.WallType.thin:
+			s = (wall, self.in_width*(size[1]-size[0])/2, self.height)
+			l = (self.in_length/2*relative, self.in_width*(size[1]+size[0])/4, 0)
+		elif wall_type == Floor.WallType.external:
+			s = (wall, self.width*(size[1]-size[0])/2, self.height)
+			l = ((self.length-wall)/2*relative, self.width*(size[1]+size[0])/4, 0)
+		else:
+			raise NotImplementedError
+		
+		w = Wall(size=s, parent=self)
+		self.add_wall(wall=w, location=l)
+		return w
+		
+	def add_w_walls(self, relative, sizes, wall_type=WallType.internal):
+		for size in sizes:
+			self.add_w_wall(relative, size, wall_type)
+			
+	def add_l_walls(self, relative, sizes, wall_type=WallType.internal):
+		for size in sizes:
+			self.add_l_wall(relative, size, wall_type)
+			
+
+class TheFloor:
+	__slots__ = ('floor', 'location')
+	
+	def __init__(self, floor, parent, location=(0,0,0)):
+		self.floor = floor
+		self.location = location
+	
+
+class House:
+
+	def __init__(self, 
+			length=9, width=6, height=3, plate=0.2, plate_dw=-0.1, floors=1,
+			external_wall=0.4, internal_wall=0.2, thin_wall=0.1,
+			window_length = 2.08, window_height = 1.42, window_base = 0.5,
+			generate=False):
+		self.length = length
+		self.width = width
+		self.plate = plate
+		self.height = height
+		self.external_wall = external_wall
+		self.internal_wall = internal_wall
+		self.thin_wall = thin_wall
+		self.plate_dw = plate_dw
+		self.floors = floors
+		self.window_length = window_length
+		self.window_height = window_height
+		self.window_base = window_base
+		
+		self.the_floors = {}
+		for n_floor in range(1, floors+1):
+			f = Floor(parent=self)
+			
+			l_walls = [
+				f.add_l_wall(-1, wall_type=Floor.WallType.external),
+				f.add_l_wall(1, wall_type=Floor.WallType.external)
+				]
+			r_walls = [
+				f.add_w_wall(-1, wall_type=Floor.WallType.external),
+				f.add_w_wall(1, wall_type=Floor.WallType.external)
+				]
+			
+			if generate:
+				for w in l_walls:
+					for i in (-0.66, 0, 0.66):
+						w.add_l_hole(i, self.window_length, self.window_height, self.window_base)
+				for w in r_walls:
+					for i in (0.66, 0, -0.66):
+						w.add_w_hole(i, self.window_height, self.window_height, self.window_base)
+			
+			self.the_floors[n_floor] = TheFloor(
+				floor=f, 
+				location=(0, 0, self.plate*n_floor+self.height*(n_floor-0.5)),
+				parent=self
+				)
+	
+	@property
+	def plate_scale(self):
+		return (self.length/2+self.plate_dw/2, self.width/2+self.plate_dw/2, self.plate/2)
+	
+	def get_plate_location(self, floor):
+		return (0, 0, self.plate/2 + floor*(self.plate+self.height) )
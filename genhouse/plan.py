@@ -0,0 +1,128 @@
+import math
+
+THICKNESS = 0.1
+HEIGHT = 1
+
+
+class Wall:
+	def __init__(self, fv, fh, tv, th, name, ext=(THICKNESS/2, THICKNESS/2)):
+		self.fv = fv
+		self.fh = fh
+		self.tv = tv
+		self.th = th
+		self.name = name
+		# how far the solid reaches past the from and to points, negative trims it
+		self.ext = ext
+	
+	@property
+	def length(self):
+		return math.sqrt((self.th - self.fh)**2+(self.tv - self.fv)**2)
+
+	@property
+	def size(self):
+		return (self.length+self.ext[0]+self.ext[1], THICKNESS, HEIGHT)
+		
+	@property
+	def rotation(self):
+		return (0, 0, math.atan2(self.tv - self.fv, self.th - self.fh))
+		
+	@property
+	def location(self):
+		shift = (self.ext[1]-self.ext[0])/2
+		length = self.length or 1
+		return (
+			self.th/2 + self.fh/2 + shift*(self.th - self.fh)/length,
+			self.tv/2 + self.fv/2 + shift*(self.tv - self.fv)/length,
+			0)
+
+
+def runs(steps):
+	# consecutive grid steps merged into (first point, last point) index pairs
+	result = []
+	for i in sorted(steps):
+		if result and result[-1][1] == i:
+			result[-1][1] = i+1
+		else:
+			result.append([i, i+1])
+	return [tuple(r) for r in result]
+
+
+class House:
+	def __init__(self, plan):
+		self.plan = plan
+		self.walls = []
+		
+	def add_wall(self, f, t):
+		fv,fh = f.split(':')
+		tv,th = t.split(':')
+		w = Wall(self.plan.v[fv], self.plan.h[fh], self.plan.v[tv], self.plan.h[th], '%s_%s' % (f, t))
+		self.walls.append(w)
+		return w
+
+	def compile(self):
+		# the same plan with duplicate and collinear walls merged and joins
+		# that meet without overlapping: rows own the corners they end on,
+		# columns are trimmed to rows and split where a row crosses them
+		vs = sorted(set(self.plan.v.values()))
+		hs = sorted(set(self.plan.h.values()))
+		vi = dict((v, i) for i, v in enumerate(vs))
+		hi = dict((h, i) for i, h in enumerate(hs))
+		vname = {}
+		hname = {}
+		for name, v in sorted(self.plan.v.items(), key=lambda item: item[1]):
+			vname.setdefault(v, name)
+		for name, h in sorted(self.plan.h.items(), key=lambda item: item[1]):
+			hname.setdefault(h, name)
+
+		rows = {}
+		cols = {}
+		other = []
+		for w in self.walls:
+			if w.fv == w.tv and w.fh != w.th:
+				a, b = sorted((hi[w.fh], hi[w.th]))
+				rows.setdefault(vi[w.fv], set()).update(range(a, b))
+			elif w.fh == w.th and w.fv != w.tv:
+				a, b = sorted((vi[w.fv], vi[w.tv]))
+				cols.setdefault(hi[w.fh], set()).update(range(a, b))
+			elif w.fh != w.th:
+				other.append(w)
+		rows = dict((r, runs(steps)) for r, steps in rows.items())
+		cols = dict((c, runs(steps)) for c, steps in cols.items())
+
+		# grid points (row, col) crossed by a row and by a column, ends included
+		on_row = {}
+		on_col = {}
+		for r, rs in rows.items():
+			for a, b in rs:
+				for c in range(a, b+1):
+					on_row[(r, c)] = 'end' if c in (a, b) else 'pass'
+		for c, cs in cols.items():
+			for a, b in cs:
+				for r in range(a, b+1):
+					on_col[(r, c)] = 'end' if r in (a, b) else 'pass'
+
+		h = House(self.plan)
+		t = THICKNESS/2
+
+		def add(fr, fc, tr, tc, ext):
+			name = '%s:%s_%s:%s' % (vname[vs[fr]], hname[hs[fc]], vname[vs[tr]], hname[hs[tc]])
+			h.walls.append(Wall(vs[fr], hs[fc], vs[tr], hs[tc], name, ext))
+
+		for r in sorted(rows):
+			for a, b in rows[r]:
+				ext = [-t if on_col.get((r, c)) == 'pass' else t for c in (a, b)]
+				add(r, a, r, b, tuple(ext))
+		for c in sorted(cols):
+			for a, b in cols[c]:
+				cuts = [r for r in range(a+1, b) if on_row.get((r, c)) == 'pass']
+				points = [a] + cuts + [b]
+				for f, to in zip(points, points[1:]):
+					ext = [-t if (r, c) in on_row else t for r in (f, to)]
+					add(f, c, to, c, tuple(ext))
+		h.walls.extend(other)
+		return h
+
+class Plan:
+	def __init__(self):
+		self.v = {}
+		self.h = {}
@@ -0,0 +1,347 @@
+import argparse
+import math
+import os
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+from genhouse import cutter
+from genhouse import house
+from genhouse import parametric
+from genhouse import plan
+from genhouse import samples
+from genhouse import shapes
+from genhouse import spec
+from genhouse import takeoff
+
+SCALE = 40
+MARGIN = 40
+GAP = 2
+TITLE = 24
+FONT_SIZE = 10
+# the 3x5 PNG font drawn at this many pixels per dot
+DOT = 2
+
+BACKGROUND = (255, 255, 255)
+INK = (40, 40, 40)
+AXIS = (170, 170, 170)
+OPENINGS = {
+	'window': (153, 204, 230),
+	'door': (196, 150, 100),
+	}
+
+FONT = {
+	'0': '###/#.#/#.#/#.#/###', '1': '.#./##./.#./.#./###', '2': '###/..#/###/#../###',
+	'3': '###/..#/.##/..#/###', '4': '#.#/#.#/###/..#/..#', '5': '###/#../###/..#/###',
+	'6': '###/#../###/#.#/###', '7': '###/..#/..#/.#./.#.', '8': '###/#.#/###/#.#/###',
+	'9': '###/#.#/###/..#/###', 'A': '.#./#.#/###/#.#/#.#', 'B': '##./#.#/##./#.#/##.',
+	'C': '.##/#../#../#../.##', 'D': '##./#.#/#.#/#.#/##.', 'E': '###/#../##./#../###',
+	'F': '###/#../##./#../#..', 'G': '.##/#../#.#/#.#/.##', 'H': '#.#/#.#/###/#.#/#.#',
+	'I': '###/.#./.#./.#./###', 'J': '..#/..#/..#/#.#/.#.', 'K': '#.#/#.#/##./#.#/#.#',
+	'L': '#../#../#../#../###', 'M': '#.#/###/###/#.#/#.#', 'N': '##./#.#/#.#/#.#/#.#',
+	'O': '.#./#.#/#.#/#.#/.#.', 'P': '##./#.#/##./#../#..', 'Q': '.#./#.#/#.#/##./.##',
+	'R': '##./#.#/##./#.#/#.#', 'S': '.##/#../.#./..#/##.', 'T': '###/.#./.#./.#./.#.',
+	'U': '#.#/#.#/#.#/#.#/###', 'V': '#.#/#.#/#.#/#.#/.#.', 'W': '#.#/#.#/###/###/#.#',
+	'X': '#.#/#.#/.#./#.#/#.#', 'Y': '#.#/#.#/.#./.#./.#.', 'Z': '###/..#/.#./#../###',
+	':': '.../.#./.../.#./...', '_': '.../.../.../.../###', '.': '.../.../.../.../.#.',
+	'-': '.../.../###/.../...', ' ': '.../.../.../.../...',
+	}
+
+
+def hex_color(color):
+	return '#%02x%02x%02x' % color
+
+
+def material_color(name):
+	return tuple(int(round(c*255)) for c in shapes.MATERIALS[name][:3])
+
+
+def rect(x0, y0, x1, y1):
+	return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+
+def wall_panels(model):
+	# (title, shapes) per floor, shapes in model coordinates:
+	# ('poly', points, fill), ('line', a, b, color), ('text', point, text, color)
+	floors = {}
+	for n, name, material, wall, location in takeoff.model_walls(model):
+		items = floors.setdefault(n, [])
+		sx, sy = wall.size[0]/2, wall.size[1]/2
+		x, y = location[0], location[1]
+		box = (x-sx, y-sy, x+sx, y+sy)
+		items.append(('poly', rect(*box), material_color(material)))
+		t = cutter.through_axis(wall.size)
+		for hole in wall.holes:
+			hx, hy = x + hole.location[0], y + hole.location[1]
+			hsx, hsy = hole.size[0]/2, hole.size[1]/2
+			h = (max(hx-hsx, box[0]), max(hy-hsy, box[1]), min(hx+hsx, box[2]), min(hy+hsy, box[3]))
+			if h[0] >= h[2] or h[1] >= h[3]:
+				continue
+			kind = 'window' if takeoff.is_glazed(wall, hole) else 'door'
+			items.append(('poly', rect(*h), OPENINGS[kind]))
+			label = getattr(hole, 'kind', None)
+			if label:
+				# outside the wall, on the side away from the middle of the house
+				side = 1 if location[t] >= 0 else -1
+				at = [hx, hy]
+				at[t] += side*(wall.size[t]/2 + 0.25)
+				items.append(('text', tuple(at), label[2:] if label.startswith('H_') else label, INK))
+		items.append(('text', (x, y), name.split('.', 1)[1], INK))
+	return [('floor%i' % n, items) for n, items in sorted(floors.items())]
+
+
+def plan_panels(h):
+	items = []
+	xs = [v for v in h.plan.h.values()]
+	ys = [v for v in h.plan.v.values()]
+	x0, x1 = min(xs) - 1, max(xs) + 1
+	y0, y1 = min(ys) - 1, max(ys) + 1
+	# grid axes: h runs along x, v along y
+	for name, v in sorted(h.plan.v.items()):
+		items.append(('line', (x0, v), (x1, v), AXIS))
+		items.append(('text', (x0 - 0.3, v), name, AXIS))
+	for name, x in sorted(h.plan.h.items()):
+		items.append(('line', (x, y0), (x, y1), AXIS))
+		items.append(('text', (x, y0 - 0.3), name, AXIS))
+	for wall in h.walls:
+		l = wall.location
+		hx, hy = wall.size[0]/2, wall.size[1]/2
+		a = wall.rotation[2]
+		c, s = math.cos(a), math.sin(a)
+		points = [(l[0] + u*c - v*s, l[1] + u*s + v*c) for u, v in ((-hx, -hy), (hx, -hy), (hx, hy), (-hx, hy))]
+		items.append(('poly', points, material_color('m_exwalls')))
+	for wall in h.walls:
+		items.append(('text', (wall.location[0], wall.location[1]), wall.name, INK))
+	return [('plan', items)]
+
+
+def panels(model):
+	if isinstance(model, (house.House, parametric.House)):
+		return wall_panels(model)
+	if isinstance(model, plan.House):
+		return plan_panels(model)
+	raise NotImplementedError
+
+
+class Drawing:
+	# every panel side by side, in pixels with y going down
+	def __init__(self, panels, scale=SCALE):
+		self.items = []
+		left = MARGIN
+		bottom = 0
+		for title, items in panels:
+			points = [p for item in items for p in (item[1] if item[0] == 'poly' else item[1:3] if item[0] == 'line' else [item[1]])]
+			x0 = min(p[0] for p in points)
+			x1 = max(p[0] for p in points)
+			y0 = min(p[1] for p in points)
+			y1 = max(p[1] for p in points)
+
+			def px(p, x0=x0, y1=y1, left=left):
+				return (left + (p[0]-x0)*scale, MARGIN + TITLE + (y1-p[1])*scale)
+
+			self.items.append(('text', (left + (x1-x0)*scale/2, MARGIN + TITLE/2), title, INK))
+			for item in items:
+				if item[0] == 'poly':
+					self.items.append(('poly', [px(p) for p in item[1]], item[2]))
+				elif item[0] == 'line':
+					self.items.append(('line', px(item[1]), px(item[2]), item[3]))
+				else:
+					self.items.append(('text', px(item[1]), item[2], item[3]))
+			left += (x1-x0 + GAP)*scale
+			bottom = max(bottom, MARGIN + TITLE + (y1-y0)*scale)
+		self.width = int(math.ceil(left - GAP*scale + MARGIN))
+		self.height = int(math.ceil(bottom + MARGIN))
+
+	def svg(self):
+		out = ['<svg xmlns="http://www.w3.org/2000/svg" width="%i" height="%i" viewBox="0 0 %i %i">' % (
+			self.width, self.height, self.width, self.height)]
+		out.append('<rect width="100%%" height="100%%" fill="%s"/>' % hex_color(BACKGROUND))
+		for item in self.items:
+			if item[0] == 'poly':
+				out.append('<polygon points="%s" fill="%s" stroke="%s" stroke-width="1"/>' % (
+					' '.join('%.1f,%.1f' % p for p in item[1]), hex_color(item[2]), hex_color(INK)))
+			elif item[0] == 'line':
+				out.append('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" stroke="%s" stroke-dasharray="4 3"/>' % (
+					item[1] + item[2] + (hex_color(item[3]),)))
+			else:
+				out.append('<text x="%.1f" y="%.1f" fill="%s" font-family="monospace" font-size="%i" '
+					'text-anchor="middle" dominant-baseline="central">%s</text>' % (
+					item[1][0], item[1][1], hex_color(item[3]), FONT_SIZE, escape(item[2])))
+		out.append('</svg>')
+		return '\n'.join(out) + '\n'
+
+	def png(self):
+		canvas = Canvas(self.width, self.height, BACKGROUND)
+		for item in self.items:
+			if item[0] == 'poly':
+				canvas.polygon(item[1], item[2])
+				for a, b in zip(item[1], item[1][1:] + item[1][:1]):
+					canvas.line(a, b, INK)
+			elif item[0] == 'line':
+				canvas.line(item[1], item[2], item[3], dashed=True)
+			else:
+				canvas.text(item[1], item[2], item[3])
+		return canvas.png()
+
+
+def escape(text):
+	return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+class Canvas:
+	# just enough of a rasteriser for plans: spans, polygons, lines, a 3x5 font
+	def __init__(self, width, height, background):
+		self.width = width
+		self.height = height
+		self.rows = [bytearray(bytes(background)*width) for y in range(height)]
+
+	def span(self, y, x0, x1, pixel):
+		# pixel is the 3 RGB bytes
+		x0 = max(x0, 0)
+		x1 = min(x1, self.width)
+		if 0 <= y < self.height and x0 < x1:
+			self.rows[y][x0*3:x1*3] = pixel*(x1-x0)
+
+	def polygon(self, points, color):
+		pixel = bytes(color)
+		xs = set(round(p[0]) for p in points)
+		ys = set(round(p[1]) for p in points)
+		if len(points) == 4 and len(xs) == 2 and len(ys) == 2:
+			# upright rectangles are most of a plan, one span per row
+			x0, x1 = sorted(xs)
+			y0, y1 = sorted(ys)
+			for y in range(max(y0, 0), min(y1, self.height)):
+				self.span(y, x0, x1, pixel)
+			return
+		# even-odd scanlines through the pixel centres
+		edges = list(zip(points, points[1:] + points[:1]))
+		top = max(int(math.floor(min(p[1] for p in points))), 0)
+		bottom = min(int(math.ceil(max(p[1] for p in points))), self.height)
+		for y in range(top, bottom):
+			cy = y + 0.5
+			xs = sorted(
+				a[0] + (cy-a[1])*(b[0]-a[0])/(b[1]-a[1])
+				for a, b in edges
+				if (a[1] <= cy) != (b[1] <= cy)
+				)
+			for x0, x1 in zip(xs[0::2], xs[1::2]):
+				self.span(y, int(round(x0)), int(round(x1)), pixel)
+
+	def line(self, a, b, color, dashed=False):
+		pixel = bytes(color)
+		x0, y0, x1, y1 = int(round(a[0])), int(round(a[1])), int(round(b[0])), int(round(b[1]))
+		if y0 == y1:
+			x0, x1 = sorted((x0, x1))
+			step = 7 if dashed else x1 - x0 + 1
+			for x in range(x0, x1 + 1, step):
+				self.span(y0, x, min(x + (4 if dashed else step), x1 + 1), pixel)
+			return
+		n = max(abs(x1-x0), abs(y1-y0)) + 1
+		for i in range(n):
+			if dashed and i % 7 >= 4:
+				continue
+			f = i/(n-1)
+			x = int(round(x0 + (x1-x0)*f))
+			y = int(round(y0 + (y1-y0)*f))
+			if 0 <= y < self.height and 0 <= x < self.width:
+				self.rows[y][x*3:x*3+3] = pixel
+
+	def text(self, centre, text, color):
+		pixel = bytes(color)
+		text = text.upper()
+		width = (len(text)*4 - 1)*DOT
+		left = int(centre[0] - width/2)
+		top = int(centre[1] - 5*DOT/2)
+		for k, char in enumerate(text):
+			rows = FONT.get(char, FONT[' ']).split('/')
+			for j, row in enumerate(rows):
+				for i, dot in enumerate(row):
+					if dot == '#':
+						x = left + (k*4 + i)*DOT
+						for d in range(DOT):
+							self.span(top + j*DOT + d, x, x+DOT, pixel)
+
+	def png(self):
+		def chunk(kind, data):
+			return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+		raw = b''.join(b'\x00' + bytes(row) for row in self.rows)
+		return b''.join([
+			b'\x89PNG\r\n\x1a\n',
+			chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0)),
+			# plans are mostly blank, the fastest level packs them nearly as well
+			chunk(b'IDAT', zlib.compress(raw, 1)),
+			chunk(b'IEND', b''),
+			])
+
+
+def load_model(source, compiled=False):
+	# a sample name or a .json/.toml spec
+	if source in samples.SAMPLES:
+		model = samples.SAMPLES[source]()
+	else:
+		model = spec.load(source).house
+	if compiled and isinstance(model, plan.House):
+		model = model.compile()
+	return model
+
+
+def write(model, paths, scale=SCALE):
+	drawing = Drawing(panels(model), scale)
+	for path in paths:
+		if path.lower().endswith('.png'):
+			with open(path, 'wb') as f:
+				f.write(drawing.png())
+		else:
+			with open(path, 'w') as f:
+				f.write(drawing.svg())
+	return drawing
+
+
+def watched_files(source):
+	# the spec itself, or the sources a sample is built from
+	if os.path.exists(source):
+		return [source]
+	root = os.path.dirname(os.path.abspath(__file__))
+	return [os.path.join(root, name) for name in sorted(os.listdir(root)) if name.endswith('.py')]
+
+
+def watch(argv, source, interval=0.3):
+	# every change redraws in a fresh interpreter, so edited modules are picked up
+	last = None
+	while True:
+		stamp = [os.path.getmtime(path) for path in watched_files(source) if os.path.exists(path)]
+		if stamp != last:
+			last = stamp
+			subprocess.call([sys.executable, '-m', 'genhouse.preview'] + argv)
+		time.sleep(interval)
+
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	parser = argparse.ArgumentParser(prog='python -m genhouse.preview', description='draw the floor plans of a house without Blender')
+	parser.add_argument('source', help='sample name (%s) or .json/.toml spec' % ', '.join(sorted(samples.SAMPLES)))
+	parser.add_argument('output', nargs='+', help='.svg or .png files')
+	parser.add_argument('--scale', type=float, default=SCALE, help='pixels per metre')
+	parser.add_argument('--compiled', action='store_true', help='draw c.py plans after compile()')
+	parser.add_argument('-w', '--watch', action='store_true', help='redraw whenever the spec or the sources change')
+	args = parser.parse_args(argv)
+
+	for path in args.output:
+		if os.path.splitext(path)[1].lower() not in ('.svg', '.png'):
+			parser.error('unknown format: %s' % path)
+	if args.watch:
+		try:
+			watch([a for a in argv if a not in ('-w', '--watch')], args.source)
+		except KeyboardInterrupt:
+			return 0
+
+	start = time.perf_counter()
+	model = load_model(args.source, args.compiled)
+	drawing = write(model, args.output, args.scale)
+	print('%s: %ix%i in %.1fms' % (', '.join(args.output), drawing.width, drawing.height, (time.perf_counter()-start)*1000))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,136 @@
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+# GMH_PROFILE=out.json turns profiling on, the report goes to out.json and
+# out.folded (one "phase;phase;phase microseconds" line per stack)
+ENV = 'GMH_PROFILE'
+
+path = os.environ.get(ENV)
+stack = []
+records = {}
+
+
+def enabled():
+	return bool(path)
+
+
+def geometry(result):
+	# (verts, faces) of a genhouse or bpy mesh, object or list of them
+	if isinstance(result, (list, tuple)):
+		counts = [geometry(r) for r in result]
+		counts = [c for c in counts if c is not None]
+		if not counts:
+			return None
+		return sum(c[0] for c in counts), sum(c[1] for c in counts)
+	if hasattr(result, 'verts') and hasattr(result, 'faces'):
+		return len(result.verts), len(result.faces)
+	data = getattr(result, 'data', None)
+	if hasattr(data, 'vertices'):
+		result = data
+	if hasattr(result, 'vertices') and hasattr(result, 'polygons'):
+		return len(result.vertices), len(result.polygons)
+	return None
+
+
+def record(key):
+	if key not in records:
+		records[key] = {'calls': 0, 'seconds': 0.0, 'verts': 0, 'faces': 0}
+	return records[key]
+
+
+@contextlib.contextmanager
+def measure(name):
+	stack.append(name)
+	key = tuple(stack)
+	start = time.perf_counter()
+	try:
+		yield record(key)
+	finally:
+		r = record(key)
+		r['calls'] += 1
+		r['seconds'] += time.perf_counter() - start
+		stack.pop()
+
+
+def phase(name):
+	if not path:
+		return contextlib.nullcontext()
+	return measure(name)
+
+
+def label(name, args, kwargs, method):
+	if isinstance(kwargs.get('name'), str):
+		return '%s[%s]' % (name, kwargs['name'])
+	for arg in args[1:] if method else args:
+		if isinstance(arg, str):
+			return '%s[%s]' % (name, arg)
+	if method and isinstance(getattr(args[0], 'name', None), str):
+		return '%s[%s]' % (name, args[0].name)
+	return name
+
+
+def wrap(fn, name, method=False):
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		with measure(label(name, args, kwargs, method)) as r:
+			result = fn(*args, **kwargs)
+			counts = geometry(result)
+			if counts is not None:
+				r['verts'] += counts[0]
+				r['faces'] += counts[1]
+			return result
+	wrapper.profiled = True
+	return wrapper
+
+
+def instrument(target, names=None, prefix='render'):
+	# wrap functions of a module or globals() dict, or render_* methods of a class
+	if not path:
+		return target
+	if isinstance(target, type):
+		for name in list(vars(target)):
+			fn = vars(target)[name]
+			if callable(fn) and (name in (names or ()) or names is None and name.startswith(prefix)):
+				if not getattr(fn, 'profiled', False):
+					setattr(target, name, wrap(fn, '%s.%s' % (target.__name__, name), method=True))
+		return target
+	space = target if isinstance(target, dict) else vars(target)
+	for name in names or [n for n in list(space) if n.startswith('bpy_')]:
+		fn = space[name]
+		if callable(fn) and not getattr(fn, 'profiled', False):
+			space[name] = wrap(fn, name)
+	return target
+
+
+def phases():
+	result = []
+	for key in sorted(records):
+		r = records[key]
+		children = sum(c['seconds'] for k, c in records.items() if len(k) == len(key)+1 and k[:-1] == key)
+		result.append(dict(r, path=list(key), self_seconds=r['seconds'] - children))
+	return result
+
+
+def report(out=None):
+	out = out or path
+	if not out:
+		return None
+	data = {'argv': sys.argv, 'phases': phases()}
+	with open(out, 'w') as f:
+		json.dump(data, f, indent=1)
+	with open(os.path.splitext(out)[0] + '.folded', 'w') as f:
+		for p in data['phases']:
+			f.write('%s %i\n' % (';'.join(p['path']), max(0, round(p['self_seconds']*1e6))))
+	return out
+
+
+def finish():
+	out = report()
+	if out:
+		total = sum(r['seconds'] for k, r in records.items() if len(k) == 1)
+		print('profile: %.3fs in %i phases written to %s' % (total, len(records), out))
+
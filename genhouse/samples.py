@@ -0,0 +1,197 @@
+from genhouse import house
+from genhouse import parametric
+from genhouse import plan
+from genhouse.openings import CATALOGUE
+
+H_WND_S = CATALOGUE['H_WND_S'].dims
+H_WND_M = CATALOGUE['H_WND_M'].dims
+H_WND_L = CATALOGUE['H_WND_L'].dims
+H_WND_XL = CATALOGUE['H_WND_XL'].dims
+
+H_DR_M = CATALOGUE['H_DR_M'].dims
+H_DR_L = CATALOGUE['H_DR_L'].dims
+
+
+def a_house(length=10.5, width=12.5, height=3, floors=2):
+	h_params = {
+		'length': length,
+		'width': width,
+		'height': height,
+		'floors': floors,
+	}
+
+	H = parametric.House(generate=True, **h_params)
+
+	w = H.the_floors[1].floor.add_w_wall(0, (-1,1))
+	w.add_w_hole(-0.8, 1, 2)
+	w.add_w_hole(-0.5, 1, 2)
+	w.add_w_hole(0.2, 1, 2)
+
+	w = H.the_floors[1].floor.add_w_wall(-0.5, (-1, 0.33))
+	w.add_w_hole(-0.8, 1, 2)
+	w.add_w_hole(0.8, 1, 2)
+
+	w = H.the_floors[1].floor.add_l_wall(0.33, (-1,1))
+	w.add_l_hole(-0.8, 1, 2)
+	w.add_l_hole(0.2, 1.5, 2)
+	w.add_l_hole(0.7, 2, 2)
+
+	w = H.the_floors[1].floor.add_l_wall(-0.33, (-1,1))
+	w.add_l_hole(-0.25, 2, 2)
+	w.add_l_hole(0.2, 1, 2)
+	
+	if floors < 2:
+		return H
+
+	H.the_floors[2].floor.add_w_walls(0, [(-1,-0.33), (0.33,1)])
+
+	w = H.the_floors[2].floor.add_l_wall(0.33, (-1, 1))
+	w.add_l_hole(-0.2, 1, 2)
+	w.add_l_hole(0.2, 1, 2)
+
+	H.the_floors[2].floor.add_l_wall(-0.33, (-1, -0.5))
+	w = H.the_floors[2].floor.add_l_wall(-0.33, (0, 1))
+	w.add_l_hole(-0.6, 1, 2)
+
+	w = H.the_floors[2].floor.add_w_wall(-0.5, (-0.6, 0.33))
+	w.add_w_hole(-0.7, 1, 2)
+	w.add_w_hole(0.7, 1, 2)
+	
+	return H
+
+
+def b_house(width=10.130, depth=12.340, iwt1=0.38, iwt2=0.25,
+		h_wnd_s=H_WND_S, h_wnd_m=H_WND_M, h_wnd_l=H_WND_L, h_wnd_xl=H_WND_XL,
+		h_dr_m=H_DR_M, h_dr_l=H_DR_L):
+	h = house.House(width=width, depth=depth)
+	h.add_foundation(height=0.3, shift=0.1)
+	f1 = h.add_floor(height=3, thickness=0.38)
+	h.add_overlap(height=0.3, shift=0.1)
+	f2 = h.add_floor(height=3, thickness=0.25)
+
+	#6.17
+	IWT = iwt1
+
+	f1.add_d2_wall("front", "back", 0, IWT, "f1d0")
+	f1.add_w2_wall("f1d0", "right", 0.34, IWT, "f1w1")
+	f1.add_w2_wall("left", "f1d0", 0.34, IWT, "f1w2")
+	f1.add_d2_wall("front", "f1w1", 0.55, IWT, "f1d3")
+	f1.add_w2_wall("left", "f1d0", -0.24, IWT, "f1w4")
+	f1.add_w2_wall("f1d3", "right", -0.24, IWT, "f1w5")
+
+	IWT = iwt2
+
+	f1.walls['front'].add_w3_hole(f1.walls['right'], 0.3, 1, *h_wnd_l, kind='H_WND_L')
+	f1.walls['front'].add_w3_hole(f1.walls['f1d3'], 0.1, 1, *h_wnd_s, kind='H_WND_S')
+	f1.walls['front'].add_w3_hole(f1.walls['f1d0'], 0.5, -1, *h_dr_m, kind='H_DR_M')
+	f1.walls['front'].add_w3_hole(f1.walls['f1d0'], 0.5, 1, *h_wnd_m, kind='H_WND_M')
+
+	f1.walls['right'].add_d3_hole(f1.walls['f1w5'], 0.7, 1, *h_dr_m, kind='H_DR_M')
+	f1.walls['right'].add_d3_hole(f1.walls['f1w5'], 0.2, -1, *h_wnd_m, kind='H_WND_M')
+	f1.walls['right'].add_d3_hole(f1.walls['f1w1'], 0.1, 1, *h_wnd_m, kind='H_WND_M')
+	f1.walls['right'].add_d3_hole(f1.walls['f1w1'], 0.5, -1, *h_wnd_xl, kind='H_WND_XL')
+
+	f1.walls['back'].add_w3_hole(f1.walls['f1d0'], 0.5, 1, *h_wnd_m, kind='H_WND_M')
+	f1.walls['back'].add_w3_hole(f1.walls['f1d0'], 0.5, -1, *h_wnd_m, kind='H_WND_M')
+
+	f1.walls['left'].add_d3_hole(f1.walls['f1w2'], 1, 1, *h_wnd_xl, kind='H_WND_XL')
+	f1.walls['left'].add_d3_hole(f1.walls['f1w2'], 0.5, -1, *h_wnd_xl, kind='H_WND_XL')
+	f1.walls['left'].add_d3_hole(f1.walls['f1w4'], 0.5, 1, *h_wnd_xl, kind='H_WND_XL')
+
+	f1.walls['f1d3'].add_d3_hole(f1.walls['front'], 0.2, -1, *h_dr_m, kind='H_DR_M')
+	f1.walls['f1d3'].add_d3_hole(f1.walls['f1w1'], 0, 1, *h_dr_l, kind='H_DR_L')
+	f1.walls['f1d0'].add_d3_hole(f1.walls['f1w1'], 0, 1, *h_dr_l, kind='H_DR_L')
+	f1.walls['f1d0'].add_d3_hole(f1.walls['f1w4'], 0.2, 1, *h_dr_m, kind='H_DR_M')
+
+	f1.walls['f1w1'].add_w3_hole(f1.walls['right'], 0.2, 1, *h_dr_m, kind='H_DR_M')
+	f1.walls['f1w4'].add_w3_hole(f1.walls['f1d0'], 0.2, 1, *h_dr_m, kind='H_DR_M')
+	f1.walls['f1w2'].add_w3_hole(f1.walls['f1d0'], 0, 1, *h_dr_m, kind='H_DR_M')
+	f1.walls['f1w2'].add_w3_hole(f1.walls['left'], 0.4, -1, 3, 1.5, 0.5)
+
+	f2.add_w2_wall("left", "right", 0.34, IWT, "f2w0")
+	f2.add_d2_wall("f2w0", "back", 0, IWT, "f2d1")
+	f2.add_d2_wall("front", "f2w0", 0.55, IWT, "f2d2")
+
+
+	f2.add_w2_wall("f2d2", "right", 0.1, IWT, "f2w3")
+	f2.add_w2_wall("left", "f2d2", -0.24, IWT, "f2w4")
+	f2.add_w2_wall("f2d2", "right", -0.66, IWT, "f2w5")
+
+	f2.add_d2_wall("front", "f2w4", 0, IWT, "f2d6")
+	f2.add_w2_wall("f2d2", "right", -0.24, IWT, "f2w7")
+
+	f2.walls['front'].add_w3_hole(f2.walls['f2d1'], 0.5, -1, *h_wnd_xl, kind='H_WND_XL')
+	f2.walls['front'].add_w3_hole(f2.walls['f2d1'], 0.5, 1, *h_wnd_m, kind='H_WND_M')
+
+	f2.walls['right'].add_d3_hole(f2.walls['f2w7'], 0.2, -1, *h_wnd_m, kind='H_WND_M')
+	f2.walls['right'].add_d3_hole(f2.walls['f2w7'], 0.7, 1, *h_wnd_m, kind='H_WND_M')
+	f2.walls['right'].add_d3_hole(f2.walls['f2w0'], 0.1, 1, *h_wnd_m, kind='H_WND_M')
+	f2.walls['right'].add_d3_hole(f2.walls['f2w0'], 0.5, -1, *h_wnd_xl, kind='H_WND_XL')
+
+	f2.walls['left'].add_d3_hole(f2.walls['f2w0'], 0.5, -1, *h_wnd_xl, kind='H_WND_XL')
+	f2.walls['left'].add_d3_hole(f2.walls['f2w0'], 1, 1, *h_wnd_xl, kind='H_WND_XL')
+	f2.walls['left'].add_d3_hole(f2.walls['f2w7'], 0.5, 1, *h_wnd_xl, kind='H_WND_XL')
+
+	f2.walls['f2w0'].add_w3_hole(f2.walls['f2d1'], 0.2, -1, *h_dr_m, kind='H_DR_M')
+	f2.walls['f2w0'].add_w3_hole(f2.walls['f2d1'], 0.2, 1, *h_dr_m, kind='H_DR_M')
+	f2.walls['f2w4'].add_w3_hole(f2.walls['f2d6'], 0.2, 1, *h_dr_m, kind='H_DR_M')
+	f2.walls['f2w4'].add_w3_hole(f2.walls['f2d6'], 0, -1, 3, 10, 0)
+	f2.walls['f2d2'].add_d3_hole(f2.walls['f2w0'], 0.1, 1, *h_dr_m, kind='H_DR_M')
+	f2.walls['f2d2'].add_d3_hole(f2.walls['f2w5'], 0.2, -1, *h_dr_m, kind='H_DR_M')
+	f2.walls['f2d2'].add_d3_hole(f2.walls['f2w5'], 0, 1, 3, 10, 0)
+	f2.walls['f2w3'].add_w3_hole(f2.walls['f2d2'], 0.2, -1, *h_dr_m, kind='H_DR_M')
+
+	f2.walls['back'].add_w3_hole(f2.walls['f2d1'], 0.5, 1, *h_wnd_m, kind='H_WND_M')
+	f2.walls['back'].add_w3_hole(f2.walls['f2d1'], 0.5, -1, *h_wnd_m, kind='H_WND_M')
+	
+	return h
+
+
+def c_house():
+	p = plan.Plan()
+
+	p.v['A'] = 0
+	p.v['B'] = p.v['A']+1.590
+	p.v['C'] = p.v['B']+1.500
+	p.v['D'] = p.v['C']+2.800
+	p.v['E'] = p.v['D']+2.100
+	p.v['F'] = p.v['E']+1.400
+	p.v['G'] = p.v['F']+3.600
+
+	p.h['1'] = 0
+	p.h['2'] = p.h['1']+3.050
+	p.h['3'] = p.h['2']+3.290
+	p.h['4'] = p.h['3']+1.520
+	p.h['5'] = p.h['4']+2.450
+	p.h['6'] = p.h['5']+2.360
+			
+	h = plan.House(p)
+
+	walls = [
+		('B:2', 'B:6'),
+		('B:2', 'B:6'),
+		('B:6', 'G:6'),
+		('G:6', 'G:2'),
+		('G:2', 'B:2'),
+		('B:5', 'F:5'),
+		('F:2', 'F:6'),
+		('F:3', 'G:3'),
+		('B:3', 'D:3'),
+		('B:4', 'D:4'),
+		('D:3', 'D:4'),
+		('E:5', 'E:6'),
+		('F:4', 'G:4'),
+		('D:5', 'D:6'),
+	]
+
+	for w in walls:
+		h.add_wall(w[0], w[1])
+	
+	return h
+
+
+SAMPLES = {
+	'a': a_house,
+	'b': b_house,
+	'c': c_house,
+	}
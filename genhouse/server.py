@@ -0,0 +1,305 @@
+import argparse
+import collections
+import importlib
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from genhouse import blender
+from genhouse import diskcache
+from genhouse import export
+from genhouse import house
+from genhouse import parametric
+from genhouse import plan
+from genhouse import samples
+from genhouse import spec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = '127.0.0.1'
+# printed by a worker once it listens, followed by the port
+READY = 'gmh-server ready'
+
+# a worker stays up between requests, each one is a JSON line:
+#   {"sample": "b", "params": {...}} or {"spec": "specs/b.json", "set": {"floor1.f1d0.at": 0.1}}
+# with optional "lod", "merged" (walls of a floor as one union), "template" (.blend to start from) and "output"
+# (.blend, .glb, .obj or .stl paths), answered by one JSON line with "ok"
+# and either the stats or the "error"; with "floors" only those are rendered
+# and the answer carries the "layout" of the objects, so that
+#   {"op": "append", "parts": [[".blend path", layout], ...], "output": ...}
+# can put the parts of several workers together in one file
+
+
+def build_model(request):
+	if 'spec' in request:
+		s = spec.load(request['spec'])
+		for name, value in sorted(request.get('set', {}).items()):
+			id, key = name.rsplit('.', 1)
+			s.set(id, key, value)
+		return s.house
+	return samples.SAMPLES[request['sample']](**request.get('params', {}))
+
+
+def render_model(model, level=0, floors=None, merged=False):
+	# the sample scripts carry the renderers, they import without side effects
+	if isinstance(model, house.House):
+		b = importlib.import_module('b')
+		b.BlenderHouse(model, lod=level, merged=merged).render(floors)
+	elif isinstance(model, parametric.House):
+		importlib.import_module('a').HouseBlender(model, merged).render(floors)
+	elif floors is not None:
+		raise ValueError('%s houses are not rendered by floor' % type(model).__module__)
+	elif isinstance(model, plan.House):
+		importlib.import_module('c').BlenderHouse(model.compile()).render()
+	else:
+		raise TypeError('no renderer for %r' % type(model).__name__)
+
+
+def outputs(request):
+	paths = request.get('output', [])
+	return [paths] if isinstance(paths, str) else paths
+
+
+def reply(start, paths):
+	result = {
+		'ok': True,
+		'objects': len(blender.bpy.data.objects),
+		'meshes': len(blender.bpy.data.meshes),
+		'output': paths,
+		'seconds': time.perf_counter() - start,
+		}
+	if diskcache.cache is not None:
+		# totals of the worker so far, not of this request alone
+		result['cache'] = diskcache.cache.stats()
+	return result
+
+
+def handle(request):
+	if request.get('op') == 'append':
+		return handle_append(request)
+	start = time.perf_counter()
+	model = build_model(request)
+	blender.bpy_reset_scene(request.get('template'))
+	level = request.get('lod', 0)
+	floors = request.get('floors')
+	render_model(model, level, floors, request.get('merged', False))
+
+	paths = outputs(request)
+	files = [path for path in paths if not path.lower().endswith('.blend')]
+	for path in paths:
+		if path.lower().endswith('.blend'):
+			blender.bpy_save(os.path.abspath(path))
+	if files:
+		export.export(model, files, level)
+	result = reply(start, paths)
+	if floors is not None:
+		result['layout'] = blender.bpy_layout()
+	return result
+
+
+def handle_append(request):
+	start = time.perf_counter()
+	blender.bpy_reset_scene(request.get('template'))
+	for path, layout in request['parts']:
+		blender.bpy_append(os.path.abspath(path), layout)
+	paths = outputs(request)
+	for path in paths:
+		if not path.lower().endswith('.blend'):
+			raise ValueError('appended parts are only saved as .blend: %s' % path)
+		blender.bpy_save(os.path.abspath(path))
+	return reply(start, paths)
+
+
+def parse_request(line):
+	request = json.loads(line)
+	if not isinstance(request, dict):
+		raise ValueError('a request is a JSON object, not %s' % type(request).__name__)
+	return request
+
+
+def serve(port=0, host=HOST, out=None):
+	out = out or sys.stdout
+	if ROOT not in sys.path:
+		sys.path.insert(0, ROOT)
+	listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+	listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+	listener.bind((host, port))
+	listener.listen(1)
+	out.write('%s %i\n' % (READY, listener.getsockname()[1]))
+	out.flush()
+
+	served = 0
+	while True:
+		conn, address = listener.accept()
+		with conn, conn.makefile('rwb') as f:
+			for line in f:
+				try:
+					request = parse_request(line.decode('utf-8'))
+				except ValueError as e:
+					# a bad line costs its reply, not the warm session
+					f.write(json.dumps({'ok': False, 'error': 'bad request: %s' % e, 'id': None}).encode('utf-8') + b'\n')
+					f.flush()
+					continue
+				if request.get('op') == 'quit':
+					f.write(b'{"ok": true}\n')
+					f.flush()
+					listener.close()
+					return served
+				if request.get('op') == 'ping':
+					reply = {'ok': True, 'served': served}
+				else:
+					try:
+						reply = handle(request)
+					except Exception:
+						reply = {'ok': False, 'error': traceback.format_exc()}
+					served += 1
+				reply['id'] = request.get('id')
+				f.write(json.dumps(reply).encode('utf-8') + b'\n')
+				f.flush()
+
+
+def worker_command(blender_path='blender', fake=False):
+	expr = 'import sys; sys.path.insert(0, %r); ' % ROOT
+	if fake:
+		return [sys.executable, '-c', expr + 'from genhouse import fakebpy; fakebpy.install(); from genhouse import server; server.serve()']
+	return [blender_path, '-b', '--python-exit-code', '1', '--python-expr', expr + 'from genhouse import server; server.serve()']
+
+
+class Worker:
+	def __init__(self, blender_path='blender', fake=False):
+		self.process = subprocess.Popen(
+			worker_command(blender_path, fake),
+			stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+			universal_newlines=True,
+			)
+		self.log = collections.deque(maxlen=50)
+		self.file = None
+
+	def connect(self):
+		# Blender prints its banner first
+		for line in self.process.stdout:
+			if line.startswith(READY):
+				port = int(line.split()[-1])
+				break
+			self.log.append(line)
+		else:
+			raise RuntimeError('worker exited before it listened:\n%s' % ''.join(self.log))
+		# keep reading so a chatty worker never blocks on a full pipe
+		threading.Thread(target=self.log.extend, args=(self.process.stdout,), daemon=True).start()
+		self.file = socket.create_connection((HOST, port)).makefile('rwb')
+		return self
+
+	def request(self, request):
+		self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+		self.file.flush()
+		line = self.file.readline()
+		if not line:
+			raise RuntimeError('worker died:\n%s' % ''.join(self.log))
+		return json.loads(line.decode('utf-8'))
+
+	def close(self):
+		if self.file is not None:
+			try:
+				self.request({'op': 'quit'})
+			except (OSError, RuntimeError):
+				pass
+			self.file.close()
+		try:
+			self.process.wait(10)
+		except subprocess.TimeoutExpired:
+			self.process.kill()
+
+
+class Pool:
+	def __init__(self, workers=None, blender_path='blender', fake=False):
+		# all start at once, then each is waited for
+		self.workers = [Worker(blender_path, fake) for i in range(workers or os.cpu_count() or 1)]
+		try:
+			for worker in self.workers:
+				worker.connect()
+		except Exception:
+			self.close()
+			raise
+
+	def map(self, requests):
+		# results in request order, every worker takes the next one when idle
+		requests = list(requests)
+		results = [None]*len(requests)
+		todo = queue.Queue()
+		for item in enumerate(requests):
+			todo.put(item)
+
+		def run(worker):
+			while True:
+				try:
+					i, request = todo.get_nowait()
+				except queue.Empty:
+					return
+				try:
+					results[i] = worker.request(request)
+				except Exception as e:
+					results[i] = {'ok': False, 'error': str(e)}
+
+		threads = [threading.Thread(target=run, args=(worker,)) for worker in self.workers]
+		for t in threads:
+			t.start()
+		for t in threads:
+			t.join()
+		return results
+
+	def close(self):
+		for worker in self.workers:
+			worker.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m genhouse.server', description='render house requests on warm Blender workers')
+	parser.add_argument('requests', help='file with one JSON request per line, - for stdin')
+	parser.add_argument('-j', '--jobs', type=int, help='workers, default one per core')
+	parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'), help='Blender binary, default $BLENDER or blender')
+	parser.add_argument('--fake', action='store_true', help='workers on the recording fake bpy')
+	args = parser.parse_args(argv)
+
+	f = sys.stdin if args.requests == '-' else open(args.requests)
+	requests = []
+	results = []
+	with f:
+		for n, line in enumerate(f, 1):
+			if not line.strip():
+				continue
+			try:
+				requests.append((len(results), parse_request(line)))
+				results.append(None)
+			except ValueError as e:
+				results.append({'ok': False, 'error': 'line %i: %s' % (n, e)})
+
+	start = time.perf_counter()
+	try:
+		pool = Pool(args.jobs, args.blender, args.fake)
+	except FileNotFoundError:
+		parser.error('%s not found, pass --blender or set $BLENDER' % args.blender)
+	ready = time.perf_counter()
+	with pool:
+		for (i, request), result in zip(requests, pool.map([request for i, request in requests])):
+			results[i] = result
+	for result in results:
+		json.dump(result, sys.stdout, sort_keys=True)
+		print()
+	sys.stderr.write('%i workers up in %.2fs, %i requests in %.2fs\n' % (
+		len(pool.workers), ready - start, len(results), time.perf_counter() - ready))
+	return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,126 @@
+from genhouse import cutter
+from genhouse import house
+from genhouse import incremental
+from genhouse import mesh
+from genhouse import parametric
+from genhouse import plan
+from genhouse import spatial
+
+MATERIALS = {
+	'm_exwalls': (0.720, 0.800, 0.361, 1.0),
+	'm_inwalls': (0.267, 0.800, 0.484, 1.0),
+	'm_foundation': (0.142, 0.142, 0.142, 1.0),
+	'm_frame': (0.900, 0.900, 0.880, 1.0),
+	'm_glass': (0.600, 0.800, 0.900, 0.3),
+	}
+
+EXTERNAL_WALLS = ('left', 'right', 'front', 'back')
+
+
+def holes(wall):
+	return spatial.resolve_openings(wall.size, [(hole.size, hole.location) for hole in wall.holes])[0]
+
+
+def wall_material(name):
+	return 'm_exwalls' if name in EXTERNAL_WALLS else 'm_inwalls'
+
+
+def model_walls(model):
+	# (floor index, wall, centre of the wall in house coordinates)
+	if isinstance(model, house.House):
+		for n, floor in enumerate(model.floors):
+			for wall in floor.walls.values():
+				yield n, wall, (wall.location[0], wall.location[1], floor.altitude + wall.size[2]/2)
+	elif isinstance(model, parametric.House):
+		for n in range(1, model.floors+1):
+			the_floor = model.the_floors[n]
+			fl = the_floor.location
+			for the_wall in the_floor.floor.walls:
+				wl = the_wall.location
+				yield n-1, the_wall.wall, (fl[0]+wl[0], fl[1]+wl[1], fl[2]+wl[2])
+	else:
+		raise NotImplementedError
+
+
+def floor_walls(floor):
+	# b.py walls with their centre relative to the centre of the floor
+	for name, wall in floor.walls.items():
+		yield name, wall, (wall.location[0], wall.location[1], (wall.size[2]-floor.height)/2)
+
+
+def cut_wall(name, wall, location=(0,0,0)):
+	m = cutter.wall_mesh(wall.size, holes(wall), location)
+	if m is None:
+		raise ValueError('%s: an opening does not go through the wall' % name)
+	return m
+
+
+def wall_mesh(name, wall, location):
+	if incremental.wall_meshes.disk is None:
+		# hashing costs more than cutting a wall once more
+		return cut_wall(name, wall, location)
+	# with the disk cache equal walls are cut once for every run and worker
+	m = incremental.wall_meshes.get(incremental.wall_hash(wall), lambda: cut_wall(name, wall))
+	return mesh.concat([(m, location)])
+
+
+def foundation_parts(h):
+	if h.foundation:
+		f = h.foundation
+		yield 'foundation', 'm_foundation', mesh.box(
+			(h.width - 2*f.shift, h.depth - 2*f.shift, f.height),
+			(0, 0, f.height/2)
+			)
+
+
+def overlap_parts(h):
+	for n, overlap in enumerate(h.overlaps, 1):
+		yield 'overlap%i' % n, 'm_foundation', mesh.box(
+			(h.width - 2*overlap.shift, h.depth - 2*overlap.shift, overlap.height),
+			(0, 0, overlap.altitude + overlap.height/2)
+			)
+
+
+def house_parts(h):
+	yield from foundation_parts(h)
+	
+	for n, floor in enumerate(h.floors, 1):
+		z = floor.altitude + floor.height/2
+		for name, wall, l in floor_walls(floor):
+			yield 'floor%i.%s' % (n, name), wall_material(name), wall_mesh(name, wall, (l[0], l[1], l[2]+z))
+	
+	yield from overlap_parts(h)
+
+
+def plate_parts(h):
+	for floor in range(0, h.floors):
+		s = h.plate_scale
+		yield 'plate%i' % floor, None, mesh.box((s[0]*2, s[1]*2, s[2]*2), h.get_plate_location(floor))
+
+
+def parametric_parts(h):
+	yield from plate_parts(h)
+	
+	for n_floor in range(1, h.floors+1):
+		the_floor = h.the_floors[n_floor]
+		fl = the_floor.location
+		for n, the_wall in enumerate(the_floor.floor.walls):
+			wl = the_wall.location
+			name = 'floor%i.%i' % (n_floor, n)
+			yield name, None, wall_mesh(name, the_wall.wall, (fl[0]+wl[0], fl[1]+wl[1], fl[2]+wl[2]))
+
+
+def plan_parts(h):
+	for wall in h.compile().walls:
+		yield wall.name, None, mesh.box(wall.size, wall.location, wall.rotation[2])
+
+
+def parts(model):
+	if isinstance(model, house.House):
+		return house_parts(model)
+	elif isinstance(model, parametric.House):
+		return parametric_parts(model)
+	elif isinstance(model, plan.House):
+		return plan_parts(model)
+	else:
+		raise NotImplementedError
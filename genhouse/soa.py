@@ -0,0 +1,172 @@
+import numpy as np
+
+from genhouse import mesh
+from genhouse import shapes
+
+CORNERS = np.array(mesh.BOX_CORNERS, dtype=np.float64)
+FACES = np.array(mesh.BOX_FACES, dtype=np.int32)
+
+
+class WallStore:
+	def __init__(self, wall_size, wall_location, wall_floor, wall_house, hole_size, hole_location, hole_wall, wall_angle=None):
+		self.wall_size = wall_size
+		self.wall_location = wall_location
+		self.wall_floor = wall_floor
+		self.wall_house = wall_house
+		self.hole_size = hole_size
+		self.hole_location = hole_location
+		self.hole_wall = hole_wall
+		# turn about z of the house each wall belongs to
+		self.wall_angle = np.zeros(len(wall_size)) if wall_angle is None else wall_angle
+	
+	@classmethod
+	def from_models(cls, models, offsets=None, rotations=None):
+		# houses placed at offsets and turned by rotations about their origin
+		offsets = offsets or [(0, 0, 0)]*len(models)
+		rotations = rotations or [0]*len(models)
+		wall_size = []
+		wall_location = []
+		wall_floor = []
+		wall_house = []
+		hole_size = []
+		hole_location = []
+		hole_wall = []
+		for n_house, (model, offset) in enumerate(zip(models, offsets)):
+			for n_floor, wall, location in shapes.model_walls(model):
+				n_wall = len(wall_size)
+				wall_size.append(wall.size)
+				wall_location.append(location)
+				wall_floor.append(n_floor)
+				wall_house.append(n_house)
+				# clipped to the wall and merged, as the cut walls have them
+				for size, location in shapes.holes(wall):
+					hole_size.append(size)
+					hole_location.append(location)
+					hole_wall.append(n_wall)
+		
+		wall_house = np.array(wall_house, dtype=np.int32)
+		wall_angle = np.array(rotations, dtype=np.float64)[wall_house]
+		wall_location = turned(np.array(wall_location, dtype=np.float64).reshape(-1, 3), wall_angle)
+		wall_location += np.array(offsets, dtype=np.float64).reshape(-1, 3)[wall_house]
+		return cls(
+			np.array(wall_size, dtype=np.float64).reshape(-1, 3),
+			wall_location,
+			np.array(wall_floor, dtype=np.int32),
+			wall_house,
+			np.array(hole_size, dtype=np.float64).reshape(-1, 3),
+			np.array(hole_location, dtype=np.float64).reshape(-1, 3),
+			np.array(hole_wall, dtype=np.int32),
+			wall_angle,
+			)
+	
+	def __len__(self):
+		return len(self.wall_size)
+	
+	@property
+	def half_extent(self):
+		# half the size of every wall along x and y once turned, and z
+		c = np.abs(np.cos(self.wall_angle))
+		s = np.abs(np.sin(self.wall_angle))
+		half = self.wall_size / 2
+		return np.stack((half[:, 0]*c + half[:, 1]*s, half[:, 0]*s + half[:, 1]*c, half[:, 2]), axis=1)
+	
+	@property
+	def bounds(self):
+		# (n, 2, 3): lower and upper corner of every wall
+		half = self.half_extent
+		return np.stack((self.wall_location - half, self.wall_location + half), axis=1)
+	
+	@property
+	def bound_left(self):
+		return self.wall_location[:, 0] - self.half_extent[:, 0]
+	
+	@property
+	def bound_right(self):
+		return self.wall_location[:, 0] + self.half_extent[:, 0]
+	
+	@property
+	def bound_front(self):
+		return self.wall_location[:, 1] - self.half_extent[:, 1]
+	
+	@property
+	def bound_back(self):
+		return self.wall_location[:, 1] + self.half_extent[:, 1]
+	
+	@property
+	def hole_positions(self):
+		return self.wall_location[self.hole_wall] + turned(self.hole_location, self.wall_angle[self.hole_wall])
+	
+	def wall_vertices(self):
+		if not self.wall_angle.any():
+			return box_vertices(self.wall_size, self.wall_location)
+		return rotated_box_vertices(self.wall_size, self.wall_location, self.wall_angle)
+	
+	def hole_vertices(self, grow=0):
+		angle = self.wall_angle[self.hole_wall]
+		if not angle.any():
+			return box_vertices(self.hole_size + grow, self.hole_positions)
+		return rotated_box_vertices(self.hole_size + grow, self.hole_positions, angle)
+
+
+def turned(points, angle):
+	# (n, 3) points turned about z by (n,) angles
+	c = np.cos(angle)
+	s = np.sin(angle)
+	result = points.copy()
+	result[:, 0] = points[:, 0]*c - points[:, 1]*s
+	result[:, 1] = points[:, 0]*s + points[:, 1]*c
+	return result
+
+
+def box_vertices(size, location):
+	# (n, 8, 3) corners of n boxes in one broadcast
+	return location[:, None, :] + CORNERS[None, :, :] * (size[:, None, :] / 2)
+
+
+def packed_boxes(vertices):
+	# flat buffers ready for foreach_set: co, vertex_index, loop_start, loop_total
+	n = len(vertices)
+	vertex_index = FACES[None, :, :] + (8 * np.arange(n, dtype=np.int32))[:, None, None]
+	loop_start = np.arange(0, n*24, 4, dtype=np.int32)
+	loop_total = np.full(n*6, 4, dtype=np.int32)
+	return (
+		np.ascontiguousarray(vertices, dtype=np.float32).ravel(),
+		vertex_index.ravel(),
+		loop_start,
+		loop_total,
+		)
+
+
+def plan_walls(h):
+	# (n, 2) from and to points as (x, y), and (n, 2) end extensions of plan walls
+	ends = np.array([(w.fh, w.fv, w.th, w.tv) for w in h.walls], dtype=np.float64).reshape(-1, 4)
+	ext = np.array([w.ext for w in h.walls], dtype=np.float64).reshape(-1, 2)
+	return ends[:, :2], ends[:, 2:], ext
+
+
+def segment_boxes(start, end, ext, thickness, height):
+	# size, location and angle of every segment's box in one pass
+	delta = end - start
+	length = np.hypot(delta[:, 0], delta[:, 1])
+	angle = np.arctan2(delta[:, 1], delta[:, 0])
+	direction = delta / np.where(length > 0, length, 1)[:, None]
+	n = len(start)
+	size = np.empty((n, 3))
+	size[:, 0] = length + ext[:, 0] + ext[:, 1]
+	size[:, 1] = thickness
+	size[:, 2] = height
+	location = np.zeros((n, 3))
+	location[:, :2] = (start + end)/2 + direction * ((ext[:, 1] - ext[:, 0])/2)[:, None]
+	return size, location, angle
+
+
+def rotated_box_vertices(size, location, angle):
+	# (n, 8, 3) corners of n boxes turned about z
+	local = CORNERS[None, :, :] * (size[:, None, :] / 2)
+	c = np.cos(angle)[:, None]
+	s = np.sin(angle)[:, None]
+	vertices = np.empty_like(local)
+	vertices[:, :, 0] = local[:, :, 0]*c - local[:, :, 1]*s
+	vertices[:, :, 1] = local[:, :, 0]*s + local[:, :, 1]*c
+	vertices[:, :, 2] = local[:, :, 2]
+	return vertices + location[:, None, :]
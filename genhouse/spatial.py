@@ -0,0 +1,188 @@
+import math
+
+from genhouse import cutter
+from genhouse.cutter import EPS
+
+NODE_SIZE = 8
+
+
+def overlaps(a, b):
+	return a[0] < b[2] - EPS and b[0] < a[2] - EPS and a[1] < b[3] - EPS and b[1] < a[3] - EPS
+
+
+def touches(a, b):
+	return a[0] <= b[2] + EPS and b[0] <= a[2] + EPS and a[1] <= b[3] + EPS and b[1] <= a[3] + EPS
+
+
+def bounding(rects):
+	return (
+		min(r[0] for r in rects), min(r[1] for r in rects),
+		max(r[2] for r in rects), max(r[3] for r in rects),
+		)
+
+
+class RTree:
+	# static R-tree over (x0, y0, x1, y1) rects, packed sort-tile-recursive
+	def __init__(self, items):
+		level = list(items)
+		leaf = True
+		while len(level) > NODE_SIZE:
+			level = [(rect, (group, leaf)) for rect, group in self.pack(level)]
+			leaf = False
+		self.root = (level, leaf)
+	
+	@staticmethod
+	def pack(entries):
+		leaves = math.ceil(len(entries) / NODE_SIZE)
+		per_slice = math.ceil(math.sqrt(leaves)) * NODE_SIZE
+		entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+		nodes = []
+		for i in range(0, len(entries), per_slice):
+			tile = sorted(entries[i:i+per_slice], key=lambda e: e[0][1] + e[0][3])
+			for j in range(0, len(tile), NODE_SIZE):
+				group = tile[j:j+NODE_SIZE]
+				nodes.append((bounding([e[0] for e in group]), group))
+		return nodes
+	
+	def query(self, rect):
+		result = []
+		stack = [self.root]
+		while stack:
+			entries, leaf = stack.pop()
+			for r, child in entries:
+				if leaf:
+					if overlaps(r, rect):
+						result.append(child)
+				elif touches(r, rect):
+					stack.append(child)
+		return result
+
+
+def plan_rect(wall, offset=(0,0)):
+	return (
+		offset[0] + wall.bound_left, offset[1] + wall.bound_front,
+		offset[0] + wall.bound_right, offset[1] + wall.bound_back,
+		)
+
+
+class FloorIndex:
+	def __init__(self, floor):
+		self.floor = floor
+		self.tree = RTree([(plan_rect(wall), name) for name, wall in floor.walls.items()])
+	
+	def walls(self, rect):
+		return self.tree.query(rect)
+
+
+def box(size, location):
+	return (
+		tuple(location[i] - size[i]/2 for i in range(3)),
+		tuple(location[i] + size[i]/2 for i in range(3)),
+		)
+
+
+def box_overlaps(a, b):
+	return all(a[0][i] < b[1][i] - EPS and b[0][i] < a[1][i] - EPS for i in range(3))
+
+
+def box_contains(a, b):
+	return all(a[0][i] <= b[0][i] + EPS and b[1][i] <= a[1][i] + EPS for i in range(3))
+
+
+def box_merge(a, b):
+	if box_contains(a, b):
+		return a
+	if box_contains(b, a):
+		return b
+	# two boxes only have a box as their union if they differ along one axis
+	differ = [i for i in range(3) if abs(a[0][i] - b[0][i]) > EPS or abs(a[1][i] - b[1][i]) > EPS]
+	if len(differ) == 1:
+		i = differ[0]
+		if a[0][i] <= b[1][i] + EPS and b[0][i] <= a[1][i] + EPS:
+			lo = list(a[0])
+			hi = list(a[1])
+			lo[i] = min(a[0][i], b[0][i])
+			hi[i] = max(a[1][i], b[1][i])
+			return (tuple(lo), tuple(hi))
+	return None
+
+
+def resolve_openings(size, holes):
+	# clip openings to their wall, drop the ones that miss it and merge
+	# overlapping ones whose union is still a box; returns the openings
+	# as (size, location) pairs and a list of issues found on the way
+	wall = box(size, (0, 0, 0))
+	t = cutter.through_axis(size)
+	u = 1 - t
+	issues = []
+	
+	boxes = []
+	for n, (hole_size, hole_location) in enumerate(holes, 1):
+		b = box(hole_size, hole_location)
+		if not box_overlaps(b, wall):
+			issues.append('opening %i misses the wall' % n)
+			continue
+		if not box_contains(wall, b):
+			clipped = (
+				tuple(max(b[0][i], wall[0][i]) for i in range(3)),
+				tuple(min(b[1][i], wall[1][i]) for i in range(3)),
+				)
+			# sticking out of the wall thickness is what cutters are meant to do
+			if any(abs(clipped[j][i] - b[j][i]) > EPS for i in range(3) if i != t for j in (0, 1)):
+				issues.append('opening %i extends past the wall' % n)
+			b = clipped
+		boxes.append((n, b))
+	
+	# the pass starts over after every merge, each pair is reported once
+	reported = set()
+	merged = True
+	while merged:
+		merged = False
+		boxes.sort(key=lambda nb: nb[1][0][u])
+		for i in range(len(boxes)):
+			n, a = boxes[i]
+			for j in range(i+1, len(boxes)):
+				m, b = boxes[j]
+				if b[0][u] > a[1][u] + EPS:
+					break
+				if not box_overlaps(a, b):
+					continue
+				pair = (min(n, m), max(n, m))
+				if pair not in reported:
+					reported.add(pair)
+					issues.append('openings %i and %i overlap' % pair)
+				union = box_merge(a, b)
+				if union is not None:
+					boxes[i] = (min(n, m), union)
+					del boxes[j]
+					merged = True
+					break
+			if merged:
+				break
+	
+	boxes.sort()
+	openings = [
+		(tuple(b[1][i] - b[0][i] for i in range(3)), tuple((b[1][i] + b[0][i])/2 for i in range(3)))
+		for n, b in boxes
+		]
+	return openings, issues
+
+
+def check_house(h):
+	issues = []
+	for n, floor in enumerate(h.floors, 1):
+		index = FloorIndex(floor)
+		for name, wall in floor.walls.items():
+			holes = [(hole.size, hole.location) for hole in wall.holes]
+			issues += ['floor%i %s: %s' % (n, name, text) for text in resolve_openings(wall.size, holes)[1]]
+			
+			for k, (hole_size, hole_location) in enumerate(holes, 1):
+				b = box(hole_size, hole_location)
+				rect = (
+					wall.location[0] + b[0][0], wall.location[1] + b[0][1],
+					wall.location[0] + b[1][0], wall.location[1] + b[1][1],
+					)
+				for other in index.walls(rect):
+					if other != name:
+						issues.append('floor%i %s: opening %i runs into %s' % (n, name, k, other))
+	return issues
@@ -0,0 +1,256 @@
+import argparse
+import heapq
+import json
+import sys
+import time
+
+from genhouse import house
+from genhouse import spatial
+from genhouse.openings import CATALOGUE
+
+OUTER_WALLS = ('left', 'right', 'back', 'front')
+
+
+def read(path):
+	if path.endswith('.toml'):
+		try:
+			import tomllib
+		except ImportError:
+			import tomli as tomllib
+		with open(path, 'rb') as f:
+			return tomllib.load(f)
+	with open(path) as f:
+		return json.load(f)
+
+
+def outer_walls(width, depth, thickness):
+	# the walls House.Floor puts around every floor
+	return [
+		{'name': 'left', 'type': 'd', 'span': [-1, 1], 'at': -1+thickness/width, 'thickness': thickness},
+		{'name': 'right', 'type': 'd', 'span': [-1, 1], 'at': 1-thickness/width, 'thickness': thickness},
+		{'name': 'back', 'type': 'w2', 'between': ['left', 'right'], 'at': 1-thickness/depth, 'thickness': thickness},
+		{'name': 'front', 'type': 'w2', 'between': ['left', 'right'], 'at': -1+thickness/depth, 'thickness': thickness},
+		]
+
+
+class Node:
+	def __init__(self, id, floor, params):
+		self.id = id
+		self.floor = floor
+		self.params = params
+		self.deps = []
+		self.wall = None
+
+
+class Spec:
+	def __init__(self, data):
+		self.data = data
+		self.house = house.House(width=data['width'], depth=data['depth'])
+		self.nodes = {}
+		self.openings = {}
+		self.values = {}
+		# resolved bounds per wall, dropped for whatever a change reaches
+		self.resolved = {}
+		self.order = []
+		self.position = {}
+		self.dependents = {}
+
+		if data.get('foundation'):
+			self.house.add_foundation(**data['foundation'])
+		n = 0
+		for level in data.get('levels', []):
+			if level['type'] == 'overlap':
+				self.house.add_overlap(height=level['height'], shift=level['shift'])
+				continue
+			n += 1
+			floor = self.house.add_floor(height=level['height'], thickness=level['thickness'])
+			self.add_floor(n, floor, level)
+
+		self.link()
+		self.evaluate(self.order)
+
+	def add_floor(self, n, floor, level):
+		prefix = 'floor%i.' % n
+		for params in outer_walls(floor.width, floor.depth, floor.thickness) + list(level.get('walls', [])):
+			id = prefix + params['name']
+			if id in self.nodes:
+				raise ValueError('%s: wall declared twice' % id)
+			self.nodes[id] = Node(id, floor, params)
+			self.openings[id] = []
+		for params in level.get('openings', []):
+			wall = prefix + params['wall']
+			if wall not in self.openings:
+				raise ValueError('%sopening: unknown wall %r' % (prefix, params['wall']))
+			id = '%s.%i' % (wall, len(self.openings[wall])+1)
+			self.nodes[id] = Node(id, floor, params)
+			self.openings[wall].append(id)
+
+	def link(self):
+		for node in self.nodes.values():
+			prefix = node.id[:node.id.index('.')+1]
+			p = node.params
+			if 'wall' in p:
+				names = [p['wall'], p['from']]
+			else:
+				names = p.get('between', [])
+			node.deps = []
+			for name in names:
+				if prefix + name not in self.openings:
+					raise ValueError('%s: unknown wall %r' % (node.id, name))
+				node.deps.append(prefix + name)
+		self.dependents = self.users()
+		self.order = self.sort()
+		self.position = dict((id, i) for i, id in enumerate(self.order))
+
+	def sort(self):
+		# Kahn's algorithm, ties broken by declaration order so output is stable
+		index = dict((id, i) for i, id in enumerate(self.nodes))
+		pending = dict((id, len(set(node.deps))) for id, node in self.nodes.items())
+		users = self.dependents
+		ready = [(index[id], id) for id, count in pending.items() if count == 0]
+		heapq.heapify(ready)
+		order = []
+		while ready:
+			i, id = heapq.heappop(ready)
+			order.append(id)
+			for user in users[id]:
+				pending[user] -= 1
+				if pending[user] == 0:
+					heapq.heappush(ready, (index[user], user))
+		if len(order) < len(self.nodes):
+			stuck = sorted(id for id in self.nodes if pending[id] > 0)
+			raise ValueError('dependency cycle through %s' % ', '.join(stuck))
+		return order
+
+	def users(self):
+		users = dict((id, set()) for id in self.nodes)
+		for node in self.nodes.values():
+			for dep in node.deps:
+				users[dep].add(node.id)
+		return users
+
+	def downstream(self, id):
+		users = self.dependents
+		seen = set([id])
+		stack = [id]
+		while stack:
+			for user in users[stack.pop()]:
+				if user not in seen:
+					seen.add(user)
+					stack.append(user)
+		for i in seen:
+			self.resolved.pop(i, None)
+		return seen
+
+	def evaluate(self, ids, walls=()):
+		# walls: also gather the holes of these again
+		walls = set(walls)
+		for id in ids:
+			node = self.nodes[id]
+			if id in self.openings:
+				self.values[id] = self.evaluate_wall(node)
+				walls.add(id)
+			else:
+				self.values[id] = self.evaluate_opening(node)
+				walls.add(node.deps[0])
+		for id in walls:
+			self.values[id].holes = [self.values[o] for o in self.openings[id]]
+		return ids
+
+	def evaluate_wall(self, node):
+		p = node.params
+		floor = node.floor
+		if p['type'] in ('w', 'd'):
+			size, location = getattr(floor, p['type'] + '_wall')(p['span'], p['at'], p['thickness'])
+			ref = 'span'
+		elif p['type'] == 'w2':
+			# House.Floor.w2_wall on the memoized bounds of the walls between
+			left = self.bounds(node.deps[0])
+			right = self.bounds(node.deps[1])
+			size = (right[0]-left[1], p['thickness'], floor.height)
+			location = ((right[0]+left[1])/2, floor.depth/2*p['at'], 0)
+			ref = 'between'
+		elif p['type'] == 'd2':
+			front = self.bounds(node.deps[0])
+			back = self.bounds(node.deps[1])
+			size = (p['thickness'], back[2]-front[3], floor.height)
+			location = (floor.width/2*p['at'], (back[2]+front[3])/2, 0)
+			ref = 'between'
+		else:
+			raise ValueError('%s: unknown wall type %r' % (node.id, p['type']))
+		if min(size) <= 0:
+			raise ValueError('%s: size %s is not positive, %s %r the wrong way round?' % (
+				node.id, ' x '.join('%g' % v for v in size), ref, p[ref]))
+		wall = house.House.Floor.Wall(size, location)
+		floor.walls[p['name']] = wall
+		return wall
+
+	def evaluate_opening(self, node):
+		p = node.params
+		if p['type'] not in ('w3', 'd3'):
+			raise ValueError('%s: unknown opening type %r' % (node.id, p['type']))
+		if 'opening' in p:
+			dims = CATALOGUE[p['opening']].dims
+			kind = p['opening']
+		else:
+			dims = p['size']
+			kind = p.get('kind')
+		wall = self.values[node.deps[0]]
+		gap_wall = self.values[node.deps[1]]
+		size, location = getattr(wall, p['type'] + '_hole')(gap_wall, p['gap'], p['pos'], *dims)
+		return house.House.Floor.Wall.Hole(size, location, kind)
+
+	def bounds(self, id):
+		b = self.resolved.get(id)
+		if b is None:
+			wall = self.values[id]
+			b = self.resolved[id] = (wall.bound_left, wall.bound_right, wall.bound_front, wall.bound_back)
+		return b
+
+	def set(self, id, key, value):
+		# change one value and re-evaluate only what depends on it
+		node = self.nodes[id]
+		walls = []
+		if key == 'wall' and id not in self.openings:
+			# the opening moves over, the wall it leaves loses its hole
+			old = node.deps[0]
+			new = old[:old.index('.')+1] + value
+			if new not in self.openings:
+				raise ValueError('%s: unknown wall %r' % (id, value))
+			self.openings[old].remove(id)
+			self.openings[new].append(id)
+			walls = [old, new]
+		node.params[key] = value
+		if key in ('between', 'wall', 'from'):
+			self.link()
+		affected = self.downstream(id)
+		return self.evaluate(sorted(affected, key=self.position.get), walls)
+
+
+def load(path):
+	return Spec(read(path))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m genhouse.spec', description='resolve a house spec')
+	parser.add_argument('spec', help='.json or .toml house spec')
+	parser.add_argument('-s', '--set', action='append', default=[], metavar='NODE.KEY=JSON',
+		help='change one value after loading, e.g. floor1.f1d0.at=0.1')
+	args = parser.parse_args(argv)
+
+	data = read(args.spec)
+	start = time.perf_counter()
+	spec = Spec(data)
+	print('resolved %i nodes in %.2fms' % (len(spec.nodes), (time.perf_counter()-start)*1000))
+	for item in args.set:
+		name, value = item.split('=', 1)
+		id, key = name.rsplit('.', 1)
+		start = time.perf_counter()
+		ids = spec.set(id, key, json.loads(value))
+		print('%s: re-evaluated %i nodes in %.2fms' % (name, len(ids), (time.perf_counter()-start)*1000))
+	for issue in spatial.check_house(spec.house):
+		print(issue)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
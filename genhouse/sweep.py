@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+from genhouse import export
+from genhouse import house
+from genhouse import openings
+from genhouse import parametric
+from genhouse import samples
+from genhouse import takeoff
+
+
+def variants(grid):
+	names = sorted(grid)
+	for values in itertools.product(*[grid[name] for name in names]):
+		yield dict(zip(names, values))
+
+
+def variant_count(grid):
+	n = 1
+	for values in grid.values():
+		n *= len(values)
+	return n
+
+
+def variant_name(sample, params):
+	digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+	return '%s-%s' % (sample, digest[:12])
+
+
+def model_counts(model):
+	if isinstance(model, house.House):
+		walls = [w for floor in model.floors for w in floor.walls.values()]
+	elif isinstance(model, parametric.House):
+		walls = [tw.wall for tf in model.the_floors.values() for tw in tf.floor.walls]
+	else:
+		return {'walls': len(model.walls), 'holes': 0}
+	counts = {'walls': len(walls), 'holes': sum(len(w.holes) for w in walls)}
+	if isinstance(model, house.House):
+		counts['openings'] = dict(openings.counts(model))
+	return counts
+
+
+def write_json(path, data):
+	tmp = '%s.%i.tmp' % (path, os.getpid())
+	with open(tmp, 'w') as f:
+		json.dump(data, f, indent=1, sort_keys=True)
+	os.replace(tmp, path)
+
+
+def build(task):
+	# -> (name, seconds, None) or (name, seconds, traceback) when the variant
+	# failed; nothing of a failed one is written, so a restart tries again
+	sample, params, out, formats = task
+	name = variant_name(sample, params)
+	start = time.perf_counter()
+	try:
+		return build_variant(name, sample, params, out, formats, start)
+	except Exception:
+		return name, time.perf_counter() - start, traceback.format_exc()
+
+
+def build_variant(name, sample, params, out, formats, start):
+	model = samples.SAMPLES[sample](**params)
+	metrics = {'name': name, 'sample': sample, 'params': params}
+	metrics.update(model_counts(model))
+	if isinstance(model, (house.House, parametric.House)):
+		metrics['takeoff'] = takeoff.takeoff(model)['totals']
+	
+	# geometry goes to a scratch directory first so a killed worker
+	# never leaves half-written files under the final names
+	scratch = tempfile.mkdtemp(prefix='.%s-' % name, dir=out)
+	try:
+		metrics.update(export.export(model, [os.path.join(scratch, name + ext) for ext in formats]))
+		for filename in os.listdir(scratch):
+			os.replace(os.path.join(scratch, filename), os.path.join(out, filename))
+	finally:
+		shutil.rmtree(scratch, ignore_errors=True)
+	
+	metrics['seconds'] = time.perf_counter() - start
+	# the metrics file is written last and marks the variant as done
+	write_json(os.path.join(out, name + '.json'), metrics)
+	return name, metrics['seconds'], None
+
+
+def is_done(out, name, formats):
+	return all(os.path.exists(os.path.join(out, name + ext)) for ext in formats + ['.json'])
+
+
+def batches(iterable, size):
+	iterator = iter(iterable)
+	while True:
+		batch = list(itertools.islice(iterator, size))
+		if not batch:
+			return
+		yield batch
+
+
+def sweep(sample, grid, out, formats=('.glb',), jobs=None, log=sys.stderr):
+	formats = list(formats)
+	jobs = jobs or os.cpu_count() or 1
+	os.makedirs(out, exist_ok=True)
+	
+	total = variant_count(grid)
+	done = skipped = 0
+	failed = []
+	start = time.perf_counter()
+	
+	with multiprocessing.Pool(jobs, maxtasksperchild=64) as pool:
+		# feed the pool a window at a time so huge grids stay out of memory
+		for batch in batches(variants(grid), jobs*8):
+			tasks = []
+			for params in batch:
+				name = variant_name(sample, params)
+				if is_done(out, name, formats):
+					skipped += 1
+					log.write('[%i/%i] %s skipped\n' % (done+len(failed)+skipped, total, name))
+				else:
+					tasks.append((sample, params, out, formats))
+			
+			for name, seconds, error in pool.imap_unordered(build, tasks):
+				if error is None:
+					done += 1
+					log.write('[%i/%i] %s %.3fs\n' % (done+len(failed)+skipped, total, name, seconds))
+				else:
+					failed.append(name)
+					log.write('[%i/%i] %s failed after %.3fs\n%s' % (done+len(failed)+skipped, total, name, seconds, error))
+	
+	log.write('%i built, %i skipped, %i failed in %.1fs\n' % (done, skipped, len(failed), time.perf_counter() - start))
+	return done, skipped, failed
+
+
+def parse_param(text):
+	name, _, values = text.partition('=')
+	values = json.loads(values)
+	if not isinstance(values, list):
+		values = [values]
+	return name, values
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Build and export every house in a parameter grid.')
+	parser.add_argument('sample', choices=sorted(samples.SAMPLES))
+	parser.add_argument('grid', nargs='?', help='JSON file mapping parameter names to lists of values')
+	parser.add_argument('-p', '--param', action='append', default=[], type=parse_param,
+		metavar='NAME=JSON', help='add a parameter axis, e.g. width=[9,10,11]')
+	parser.add_argument('-o', '--out', default='sweep')
+	parser.add_argument('-f', '--format', action='append', choices=sorted(export.WRITERS),
+		help='geometry formats to write (default .glb)')
+	parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: all cores)')
+	args = parser.parse_args(argv)
+	
+	grid = {}
+	if args.grid:
+		with open(args.grid) as f:
+			grid.update(json.load(f))
+	grid.update(args.param)
+	
+	# a misspelt name would fail every variant the same way
+	known = inspect.signature(samples.SAMPLES[args.sample]).parameters
+	unknown = sorted(name for name in grid if name not in known)
+	if unknown:
+		parser.error('unknown %s parameter%s: %s (known: %s)' % (
+			args.sample, 's' if len(unknown) > 1 else '', ', '.join(unknown), ', '.join(known) or 'none'))
+	
+	done, skipped, failed = sweep(args.sample, grid, args.out, args.format or ['.glb'], args.jobs)
+	return 1 if failed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,305 @@
+import argparse
+import json
+import sys
+import time
+
+from genhouse import cutter
+from genhouse import house
+from genhouse import parametric
+from genhouse import samples
+from genhouse import shapes
+from genhouse import spatial
+from genhouse.cutter import EPS
+from genhouse.openings import CATALOGUE
+
+FIELDS = (
+	'gross_volume', 'opening_volume', 'junction_volume', 'net_volume',
+	'face_area', 'reveal_area', 'hidden_area', 'opening_area',
+	)
+
+
+def model_walls(model):
+	# (floor number, name, material, wall, centre in house coordinates)
+	if isinstance(model, house.House):
+		for n, floor in enumerate(model.floors, 1):
+			z = floor.altitude + floor.height/2
+			for name, wall, l in shapes.floor_walls(floor):
+				yield n, 'floor%i.%s' % (n, name), shapes.wall_material(name), wall, (l[0], l[1], l[2]+z)
+	elif isinstance(model, parametric.House):
+		# a.py walls carry no type, the ones on the floor outline are external
+		floors = {}
+		for n_floor, wall, location in shapes.model_walls(model):
+			floors.setdefault(n_floor+1, []).append((wall, location))
+		for n, walls in sorted(floors.items()):
+			rects = [
+				(l[0] - wall.size[0]/2, l[1] - wall.size[1]/2, l[0] + wall.size[0]/2, l[1] + wall.size[1]/2)
+				for wall, l in walls
+				]
+			outline = spatial.bounding(rects)
+			for k, ((wall, location), r) in enumerate(zip(walls, rects)):
+				external = any(abs(r[i] - outline[i]) < EPS for i in range(4))
+				material = 'm_exwalls' if external else 'm_inwalls'
+				yield n, 'floor%i.%i' % (n, k), material, wall, location
+	else:
+		raise NotImplementedError
+
+
+def cut_grid(size, rects):
+	# area of the union of the opening rects and the length of their edges
+	# that face solid wall, on the grid cutter.wall_mesh builds
+	t = cutter.through_axis(size)
+	hu, hv = size[1-t]/2, size[2]/2
+	us = cutter.breaks([-hu, hu] + [r[0] for r in rects] + [r[1] for r in rects])
+	vs = cutter.breaks([-hv, hv] + [r[2] for r in rects] + [r[3] for r in rects])
+	nu = len(us) - 1
+	nv = len(vs) - 1
+	cut = set()
+	for u0, u1, v0, v1 in rects:
+		for i in range(cutter.break_index(us, u0), cutter.break_index(us, u1)):
+			for j in range(cutter.break_index(vs, v0), cutter.break_index(vs, v1)):
+				cut.add((i, j))
+
+	def solid(i, j):
+		return 0 <= i < nu and 0 <= j < nv and (i, j) not in cut
+
+	area = 0
+	edges = 0
+	for i, j in cut:
+		du = us[i+1] - us[i]
+		dv = vs[j+1] - vs[j]
+		area += du*dv
+		edges += dv*(solid(i-1, j) + solid(i+1, j)) + du*(solid(i, j-1) + solid(i, j+1))
+	return area, edges
+
+
+def is_glazed(wall, hole):
+	# catalogued types say so, otherwise anything not reaching the floor is a window
+	kind = CATALOGUE.get(getattr(hole, 'kind', None))
+	if kind is not None:
+		return kind.glass
+	return hole.location[2] - hole.size[2]/2 > -wall.size[2]/2 + EPS
+
+
+def hole_rects(wall):
+	# the face rect each opening cuts, clipped to the wall; None for the ones
+	# that do not go through or miss the wall
+	rects = []
+	for hole in wall.holes:
+		r = cutter.openings(wall.size, [(hole.size, hole.location)])
+		rects.append(r[0] if r else None)
+	return rects
+
+
+def hole_areas(wall):
+	# each opening's share of the cut face, where openings overlap the first
+	# one has it, so they add up to the opening area of the wall
+	areas = []
+	cut = []
+	before = 0
+	for r in hole_rects(wall):
+		if r is not None:
+			cut.append(r)
+			area = cut_grid(wall.size, cut)[0]
+			areas.append(area - before)
+			before = area
+		else:
+			areas.append(0)
+	return areas
+
+
+def wall_quantities(wall):
+	size = wall.size
+	t = cutter.through_axis(size)
+	length, thickness, height = size[1-t], size[t], size[2]
+	rects = hole_rects(wall)
+	area, edges = cut_grid(size, [r for r in rects if r is not None])
+	# blind openings only take their part out of the wall box
+	opening_volume = area * thickness + sum(
+		box_intersection(spatial.box(size, (0,0,0)), spatial.box(hole.size, hole.location))
+		for hole, r in zip(wall.holes, rects) if r is None
+		)
+	gross = length * thickness * height
+	return {
+		'gross_volume': gross,
+		'opening_volume': opening_volume,
+		'junction_volume': 0,
+		'net_volume': gross - opening_volume,
+		'face_area': 2*(length*height - area) + 2*thickness*height,
+		'reveal_area': edges * thickness,
+		'hidden_area': 0,
+		'opening_area': area,
+		}
+
+
+def box_intersection(a, b):
+	volume = 1
+	for i in range(3):
+		d = min(a[1][i], b[1][i]) - max(a[0][i], b[0][i])
+		if d <= EPS:
+			return 0
+		volume *= d
+	return volume
+
+
+def wall_solid(wall, location):
+	# the wall box and the boxes its openings take out, in house coordinates
+	cuts = [spatial.box(size, (location[0]+l[0], location[1]+l[1], location[2]+l[2])) for size, l in shapes.holes(wall)]
+	return spatial.box(wall.size, location), cuts
+
+
+def solid_intersection(a, b):
+	# volume both walls fill: their boxes overlap less what either cuts out,
+	# counted on the grid of the overlap and the openings reaching into it
+	box = (
+		tuple(max(a[0][0][i], b[0][0][i]) for i in range(3)),
+		tuple(min(a[0][1][i], b[0][1][i]) for i in range(3)),
+		)
+	if any(box[1][i] - box[0][i] <= EPS for i in range(3)):
+		return 0
+	cuts = [c for c in a[1] + b[1] if box_intersection(box, c)]
+	grid = [
+		cutter.breaks([box[0][i], box[1][i]] + [min(max(c[s][i], box[0][i]), box[1][i]) for c in cuts for s in (0, 1)])
+		for i in range(3)
+		]
+	volume = 0
+	for x0, x1 in zip(grid[0], grid[0][1:]):
+		for y0, y1 in zip(grid[1], grid[1][1:]):
+			for z0, z1 in zip(grid[2], grid[2][1:]):
+				p = ((x0+x1)/2, (y0+y1)/2, (z0+z1)/2)
+				if not any(all(c[0][i] < p[i] < c[1][i] for i in range(3)) for c in cuts):
+					volume += (x1-x0)*(y1-y0)*(z1-z0)
+	return volume
+
+
+def in_solid(solid, p):
+	box, cuts = solid
+	return all(box[0][i] < p[i] < box[1][i] for i in range(3)) and not any(
+		all(c[0][i] < p[i] < c[1][i] for i in range(3)) for c in cuts)
+
+
+def buried_area(a, b, coincident):
+	# area of the side faces of solid a that b covers: where b fills the
+	# space in front of them, and with coincident also where b has a face of
+	# its own in the same place, so only one of the two is counted
+	(lower, upper), cuts = a
+	area = 0
+	for i in (0, 1):
+		j = 1 - i
+		for side, c in ((-1, lower[i]), (1, upper[i])):
+			if not b[0][0][i] - EPS <= c <= b[0][1][i] + EPS:
+				continue
+			rect = (
+				(max(lower[j], b[0][0][j]), min(upper[j], b[0][1][j])),
+				(max(lower[2], b[0][0][2]), min(upper[2], b[0][1][2])),
+				)
+			if any(r[1] - r[0] <= EPS for r in rect):
+				continue
+			grid = [
+				cutter.breaks(list(rect[n]) + [min(max(box[s][m], rect[n][0]), rect[n][1]) for box in cuts + b[1] for s in (0, 1)])
+				for n, m in ((0, j), (1, 2))
+				]
+			for u0, u1 in zip(grid[0], grid[0][1:]):
+				for v0, v1 in zip(grid[1], grid[1][1:]):
+					p = [0, 0, (v0+v1)/2]
+					p[j] = (u0+u1)/2
+					inside = list(p)
+					outside = list(p)
+					inside[i] = c - side*10*EPS
+					outside[i] = c + side*10*EPS
+					if not in_solid(a, inside):
+						# cut out by an opening of a
+						continue
+					if in_solid(b, outside) or (coincident and in_solid(b, inside)):
+						area += (u1-u0)*(v1-v0)
+	return area
+
+
+def add(total, q):
+	for field in FIELDS:
+		total[field] = total.get(field, 0) + q[field]
+	return total
+
+
+def takeoff(model):
+	walls = []
+	quantities = []
+	for n, name, material, wall, location in model_walls(model):
+		q = wall_quantities(wall)
+		# nothing left once cut, like the unit wall every parametric.Floor has
+		if q['net_volume'] > EPS:
+			walls.append((n, name, material, wall, location))
+			quantities.append(q)
+
+	# walls of a floor that meet: count shared volume once, drop the faces
+	# buried in the other wall or lying on one of its faces
+	floors = {}
+	for k, (n, name, material, wall, location) in enumerate(walls):
+		floors.setdefault(n, []).append(k)
+	for n, ks in floors.items():
+		solids = dict((k, wall_solid(walls[k][3], walls[k][4])) for k in ks)
+		boxes = dict((k, solids[k][0]) for k in ks)
+		tree = spatial.RTree([
+			((b[0][0]-2*EPS, b[0][1]-2*EPS, b[1][0]+2*EPS, b[1][1]+2*EPS), k)
+			for k, b in boxes.items()
+			])
+		for k, b in boxes.items():
+			for other in tree.query((b[0][0], b[0][1], b[1][0], b[1][1])):
+				if other <= k:
+					continue
+				# an opening of either wall in the overlap is not taken off twice
+				volume = solid_intersection(solids[k], solids[other])
+				if volume:
+					quantities[other]['junction_volume'] += volume
+					quantities[other]['net_volume'] -= volume
+				for j, area in (
+						(k, buried_area(solids[k], solids[other], False)),
+						(other, buried_area(solids[other], solids[k], True))):
+					quantities[j]['hidden_area'] += area
+					quantities[j]['face_area'] -= area
+
+	result = {'totals': {}, 'floors': {}, 'materials': {}, 'openings': {}}
+	external = {}
+	glazing = {}
+	for (n, name, material, wall, location), q in zip(walls, quantities):
+		add(result['totals'], q)
+		add(result['floors'].setdefault('floor%i' % n, {}), q)
+		add(result['materials'].setdefault(material, {}), q)
+		t = cutter.through_axis(wall.size)
+		if material == 'm_exwalls':
+			external[n] = external.get(n, 0) + wall.size[1-t] * wall.size[2]
+		for hole, area in zip(wall.holes, hole_areas(wall)):
+			kind = getattr(hole, 'kind', None) or 'custom'
+			o = result['openings'].setdefault(kind, {'count': 0, 'area': 0})
+			o['count'] += 1
+			o['area'] += area
+			if is_glazed(wall, hole) and material == 'm_exwalls':
+				glazing[n] = glazing.get(n, 0) + area
+
+	# glazing over the gross outside face of the external walls
+	for n in floors:
+		result['floors']['floor%i' % n]['glazing_ratio'] = glazing.get(n, 0) / external[n] if external.get(n) else 0
+	total = sum(external.values())
+	result['totals']['glazing_ratio'] = sum(glazing.values()) / total if total else 0
+	return result
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m genhouse.takeoff', description='analytic quantity takeoff of a sample house')
+	parser.add_argument('sample', choices=sorted(samples.SAMPLES))
+	parser.add_argument('-p', '--param', action='append', default=[], metavar='NAME=JSON', help='sample parameter')
+	args = parser.parse_args(argv)
+
+	params = dict((name, json.loads(value)) for name, value in (p.split('=', 1) for p in args.param))
+	model = samples.SAMPLES[args.sample](**params)
+	start = time.perf_counter()
+	try:
+		result = takeoff(model)
+	except NotImplementedError:
+		parser.error('no takeoff for the %s sample' % args.sample)
+	result['seconds'] = time.perf_counter() - start
+	json.dump(result, sys.stdout, indent=1, sort_keys=True)
+	print()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from genhouse import blender
+from genhouse import house
+from genhouse import parametric
+from genhouse import samples
+from genhouse import server
+
+# the floors of a house do not depend on each other: each one goes to its own
+# Blender in the background, which saves it to a temporary .blend, and the
+# parts are appended in floor order, so a house takes about as long as its
+# slowest floor. Whole houses of a batch are spread by server.Pool as they are.
+
+
+def split(request, directory):
+	# one server request per floor, a b.py house also gets one (floor 0) for
+	# the foundation, overlaps and massing
+	model = server.build_model(request)
+	if isinstance(model, house.House):
+		numbers = range(0, len(model.floors)+1)
+	elif isinstance(model, parametric.House):
+		numbers = range(1, model.floors+1)
+	else:
+		raise ValueError('%s houses are not split by floor' % type(model).__module__)
+	return [
+		dict(request, floors=[n], output=[os.path.join(directory, 'floor%i.blend' % n)])
+		for n in numbers
+		]
+
+
+def pool(jobs, workers=None, blender_path='blender', fake=False):
+	return server.Pool(min(workers or os.cpu_count() or 1, len(jobs)), blender_path, fake)
+
+
+def run(pool, jobs):
+	# -> [(.blend path, layout)] in the order of jobs
+	results = pool.map(jobs)
+	errors = [r['error'] for r in results if not r['ok']]
+	if errors:
+		raise RuntimeError('%i of %i parts failed:\n%s' % (len(errors), len(jobs), '\n'.join(errors)))
+	return [(job['output'][0], result['layout']) for job, result in zip(jobs, results)]
+
+
+def render_here(request, workers=None):
+	# from a script running in Blender: the parts go into the open file
+	path = blender.bpy.app.binary_path
+	with tempfile.TemporaryDirectory(prefix='gmh-') as directory:
+		jobs = split(request, directory)
+		with pool(jobs, workers, path, fake=not path) as p:
+			parts = run(p, jobs)
+		objects = []
+		for part, layout in parts:
+			objects += blender.bpy_append(part, layout)
+	return objects
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m genhouse.workers', description='render the floors of a house on parallel Blender workers')
+	parser.add_argument('sample', nargs='?', choices=sorted(samples.SAMPLES))
+	parser.add_argument('-o', '--output', required=True, help='.blend file the floors are appended into')
+	parser.add_argument('--spec', help='house spec file instead of a sample')
+	parser.add_argument('--lod', type=int, default=0, help='level of detail shown')
+	parser.add_argument('--merged', action='store_true', help='walls of a floor as one union')
+	parser.add_argument('-j', '--jobs', type=int, help='workers, default one per floor up to one per core')
+	parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'), help='Blender binary, default $BLENDER or blender')
+	parser.add_argument('--fake', action='store_true', help='workers on the recording fake bpy')
+	args = parser.parse_args(argv)
+	if (args.sample is None) == (args.spec is None):
+		parser.error('give a sample or --spec')
+
+	request = {'lod': args.lod, 'merged': args.merged}
+	if args.spec:
+		request['spec'] = args.spec
+	else:
+		request['sample'] = args.sample
+
+	start = time.perf_counter()
+	with tempfile.TemporaryDirectory(prefix='gmh-') as directory:
+		try:
+			jobs = split(request, directory)
+		except ValueError as e:
+			parser.error(str(e))
+		try:
+			p = pool(jobs, args.jobs, args.blender, args.fake)
+		except FileNotFoundError:
+			parser.error('%s not found, pass --blender or set $BLENDER' % args.blender)
+		with p:
+			ready = time.perf_counter()
+			parts = run(p, jobs)
+			rendered = time.perf_counter()
+			# the first worker puts the parts together
+			result = p.workers[0].request({'op': 'append', 'parts': parts, 'output': [args.output]})
+	if not result['ok']:
+		sys.stderr.write(result['error'])
+		return 1
+	sys.stderr.write('%i workers up in %.2fs, %i floors in %.2fs, appended in %.2fs: %i objects\n' % (
+		len(p.workers), ready - start, len(jobs), rendered - ready, time.perf_counter() - rendered, result['objects']))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())